@@ -0,0 +1,288 @@
+"""
+Sequential Markov Model for ProductionAI
+First-order OK/NG/DOWN transitions learned from Telemetry in time order.
+
+Everything is counted by the database in window-function passes (no Python
+loop over rows):
+  - transitions: LAG(outcome) OVER (PARTITION BY sim_run_id ORDER BY
+    timestamp_sim), grouped by (previous, current, shift, coil-life bucket)
+  - run lengths: gaps-and-islands (a running SUM of "outcome changed" flags
+    numbers each run), grouped by (outcome, length)
+Conditioned rows with too little support back off to the global matrix.
+
+update() is incremental: it only runs those queries over rows with id past
+the checkpoint. Each sim run's last outcome and current run length (its
+"tail") are checkpointed too, so the first new row of a run transitions
+from the persisted outcome and a run that continues across fits is counted
+once, at its full length. This assumes new rows of a run come after its
+older ones in (timestamp_sim, id) order, as every writer appends; fit()
+rebuilds everything from scratch.
+
+sample_chain() draws a whole sequence at once: every step is a map
+{previous state -> next state} for its uniform draw, and the maps are
+composed with a log2(n) prefix scan, so the chain is sampled with NumPy
+array ops only.
+"""
+
+import json
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import AIModelState, Telemetry
+
+MODEL_NAME = "production_ai_markov"
+
+OUTCOMES = ('OK', 'NG', 'DOWN')
+SHIFTS = ('Shift_A', 'Shift_B')  # Anything else (None, legacy "Shift A") goes to an extra "other" slot
+COIL_BUCKET_SIZE = 50_000        # Remaining coil life buckets: <50k, <100k, <150k, rest
+COIL_BUCKETS = 4
+MIN_SUPPORT = 30                 # Transitions needed before a conditioned row is trusted
+
+
+def outcome_expression():
+    """0 = OK, 1 = NG, 2 = DOWN (same precedence as the stats counters)."""
+    return case(
+        (Telemetry.downtime_reason.isnot(None), 2),
+        (Telemetry.ng_reason.isnot(None), 1),
+        else_=0,
+    )
+
+
+def sequence_subquery(sim_run_id: Optional[int] = None, after_id: int = 0, upto_id: Optional[int] = None):
+    """
+    Each row with its outcome and the previous outcome of the same run
+    (among rows with after_id < id <= upto_id; NULL for a run's first one).
+    """
+    outcome = outcome_expression()
+    query = select(
+        Telemetry.id,
+        Telemetry.sim_run_id,
+        Telemetry.timestamp_sim,
+        Telemetry.shift_id,
+        (Telemetry.coil_life_counter // COIL_BUCKET_SIZE).label('coil_bucket'),
+        outcome.label('outcome'),
+        func.lag(outcome).over(
+            partition_by=Telemetry.sim_run_id,
+            order_by=(Telemetry.timestamp_sim, Telemetry.id)
+        ).label('prev'),
+    )
+    if sim_run_id is not None:
+        query = query.where(Telemetry.sim_run_id == sim_run_id)
+    if after_id:
+        query = query.where(Telemetry.id > after_id)
+    if upto_id is not None:
+        query = query.where(Telemetry.id <= upto_id)
+    return query.subquery('seq')
+
+
+def transitions_query(seq):
+    # A run's first row is kept apart per run: it may continue a checkpointed tail
+    first_of_run = case((seq.c.prev.is_(None), seq.c.sim_run_id)).label('first_of_run')
+    return (
+        select(seq.c.prev, seq.c.outcome, seq.c.shift_id, seq.c.coil_bucket, first_of_run, func.count())
+        .group_by(seq.c.prev, seq.c.outcome, seq.c.shift_id, seq.c.coil_bucket, first_of_run)
+    )
+
+
+def island_lengths_subquery(seq):
+    """One row per run of equal outcomes: (sim_run_id, island number from 1, outcome, length)."""
+    new_run = case((or_(seq.c.prev.is_(None), seq.c.prev != seq.c.outcome), 1), else_=0)
+    islands = select(
+        seq.c.sim_run_id,
+        seq.c.outcome,
+        func.sum(new_run).over(
+            partition_by=seq.c.sim_run_id,
+            order_by=(seq.c.timestamp_sim, seq.c.id)
+        ).label('island'),
+    ).subquery('islands')
+    return (
+        select(islands.c.sim_run_id, islands.c.island, islands.c.outcome, func.count().label('length'))
+        .group_by(islands.c.sim_run_id, islands.c.island, islands.c.outcome)
+        .subquery('lengths')
+    )
+
+
+def run_lengths_query(lengths):
+    return (
+        select(lengths.c.outcome, lengths.c.length, func.count())
+        .group_by(lengths.c.outcome, lengths.c.length)
+        .order_by(lengths.c.outcome, lengths.c.length)
+    )
+
+
+def run_edges_query(lengths):
+    """First and last island of every sim run: (sim_run_id, island, last island, outcome, length)."""
+    ranked = select(
+        lengths,
+        func.max(lengths.c.island).over(partition_by=lengths.c.sim_run_id).label('last_island'),
+    ).subquery('ranked')
+    return (
+        select(ranked.c.sim_run_id, ranked.c.island, ranked.c.last_island, ranked.c.outcome, ranked.c.length)
+        .where(or_(ranked.c.island == 1, ranked.c.island == ranked.c.last_island))
+    )
+
+
+def shift_index(shift_id: Optional[str]) -> int:
+    return SHIFTS.index(shift_id) if shift_id in SHIFTS else len(SHIFTS)
+
+
+def coil_bucket(coil_life) -> np.ndarray:
+    return np.minimum(np.asarray(coil_life) // COIL_BUCKET_SIZE, COIL_BUCKETS - 1)
+
+
+class MarkovModel:
+    def __init__(self):
+        # [shift slot, coil bucket, previous, current]
+        self.counts = np.zeros((len(SHIFTS) + 1, COIL_BUCKETS, 3, 3), dtype=np.int64)
+        self.initial = np.zeros(3, dtype=np.int64)  # first part of each run
+        self.run_lengths: Dict[str, Dict[int, int]] = {o: {} for o in OUTCOMES}
+        self.tails: Dict[int, Tuple[int, int]] = {}  # sim_run_id -> (last outcome, current run length)
+        self.last_id = 0
+
+    @property
+    def total_transitions(self) -> int:
+        return int(self.counts.sum())
+
+    async def fit(self, session: AsyncSession, sim_run_id: Optional[int] = None):
+        """Recounts everything from Telemetry (full rebuild)."""
+        self.__init__()
+        return await self._count(session, sequence_subquery(sim_run_id))
+
+    async def update(self, session: AsyncSession, upto_id: Optional[int] = None):
+        """
+        Adds the rows with last_id < id <= upto_id (all new rows by default)
+        to the checkpointed counts. Cost follows the new rows only.
+        """
+        if upto_id is None:
+            upto_id = (await session.execute(select(func.max(Telemetry.id)))).scalar() or 0
+        if upto_id <= self.last_id:
+            return self
+        await self._count(session, sequence_subquery(after_id=self.last_id, upto_id=upto_id))
+        self.last_id = upto_id
+        return self
+
+    async def _count(self, session: AsyncSession, seq):
+        """Adds the transitions and run lengths of `seq`, continuing each run's tail."""
+        # 1. Transitions (a run's first row continues from its tail, if it has one)
+        for prev, outcome, shift_id, bucket, run_id, count in (await session.execute(transitions_query(seq))).all():
+            if prev is None:
+                tail = self.tails.get(run_id)
+                if tail is None:
+                    self.initial[outcome] += count
+                    continue
+                prev = tail[0]
+            b = min(int(bucket or 0), COIL_BUCKETS - 1)
+            self.counts[shift_index(shift_id), b, prev, outcome] += count
+
+        # 2. Run lengths; a run's first island may extend its tail island
+        lengths = island_lengths_subquery(seq)
+        for outcome, length, count in (await session.execute(run_lengths_query(lengths))).all():
+            self._add_run(outcome, int(length), int(count))
+
+        edges = (await session.execute(run_edges_query(lengths))).all()
+        for run_id, island, last_island, outcome, length in sorted(edges, key=lambda e: (e[0], e[1])):
+            tail = self.tails.get(run_id)
+            if island == 1 and tail is not None and tail[0] == outcome:
+                # Counted once at the old tail length and once as a new run: merge them
+                self._add_run(outcome, tail[1], -1)
+                self._add_run(outcome, length, -1)
+                length += tail[1]
+                self._add_run(outcome, length, 1)
+            if island == last_island:
+                self.tails[run_id] = (int(outcome), int(length))
+        return self
+
+    def _add_run(self, outcome: int, length: int, count: int):
+        hist = self.run_lengths[OUTCOMES[outcome]]
+        hist[length] = hist.get(length, 0) + count
+        if hist[length] == 0:
+            del hist[length]
+
+    # === Probabilities ===
+
+    def _normalize(self, counts: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+        """Row-normalizes a 3x3 count matrix, backing off row-wise where support is too low."""
+        totals = counts.sum(axis=1, keepdims=True)
+        probs = np.divide(counts, totals, out=np.zeros((3, 3)), where=totals > 0)
+        weak = totals[:, 0] < MIN_SUPPORT
+        probs[weak] = fallback[weak]
+        return probs
+
+    def global_matrix(self, fallback: np.ndarray) -> np.ndarray:
+        return self._normalize(self.counts.sum(axis=(0, 1)), fallback)
+
+    def conditioned_tables(self, fallback: np.ndarray) -> np.ndarray:
+        """[shift slot, coil bucket] -> 3x3 transition matrix, with backoff to the global one."""
+        base = self.global_matrix(fallback)
+        tables = np.empty(self.counts.shape, dtype=float)
+        for s in range(self.counts.shape[0]):
+            for b in range(COIL_BUCKETS):
+                tables[s, b] = self._normalize(self.counts[s, b], base)
+        return tables
+
+    def run_length_summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for outcome, hist in self.run_lengths.items():
+            runs = sum(hist.values())
+            if runs:
+                lengths = np.array(list(hist.keys()))
+                counts = np.array(list(hist.values()))
+                summary[outcome] = {
+                    'runs': runs,
+                    'mean': float((lengths * counts).sum() / runs),
+                    'max': int(lengths.max()),
+                }
+        return summary
+
+    # === Persistence ===
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'counts': self.counts.tolist(),
+            'initial': self.initial.tolist(),
+            'run_lengths': self.run_lengths,
+            'tails': {run_id: list(tail) for run_id, tail in self.tails.items()},
+        })
+
+    @classmethod
+    async def load(cls, session: AsyncSession, name: str = MODEL_NAME) -> "MarkovModel":
+        model = cls()
+        row = await session.get(AIModelState, name)
+        if row:
+            state = json.loads(row.state)
+            model.last_id = row.last_id
+            model.counts = np.array(state['counts'], dtype=np.int64)
+            model.initial = np.array(state['initial'], dtype=np.int64)
+            model.run_lengths = {o: {int(k): v for k, v in h.items()} for o, h in state['run_lengths'].items()}
+            model.tails = {int(k): (v[0], v[1]) for k, v in state.get('tails', {}).items()}
+        return model
+
+    async def save(self, session: AsyncSession, name: str = MODEL_NAME):
+        from datetime import datetime
+        await session.merge(AIModelState(
+            name=name, last_id=self.last_id, state=self.to_json(), updated_at=datetime.now()
+        ))
+
+
+def sample_chain(step_cdf: np.ndarray, u: np.ndarray, start: int) -> np.ndarray:
+    """
+    Samples states x_0..x_{n-1} with x_t drawn from row x_{t-1} of step_cdf[t]
+    (x_{-1} = start).
+
+    step_cdf: (n, 3, 3) cumulative transition probabilities per step.
+    u:        (n,) uniforms.
+    """
+    n = len(u)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    # step[t, s]: next state when leaving s at step t (inverse CDF per previous state)
+    comp = (u[:, None] > step_cdf[:, :, 0]).astype(np.int64) + (u[:, None] > step_cdf[:, :, 1])
+    # Hillis-Steele scan: comp[t] becomes step_t o step_{t-1} o ... o step_0
+    d = 1
+    while d < n:
+        comp[d:] = np.take_along_axis(comp[d:], comp[:-d], axis=1)
+        d *= 2
+    return comp[:, start]
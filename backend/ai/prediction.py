@@ -1,11 +1,15 @@
+import logging
 import random
-import statistics
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models import Telemetry
+from backend.ai.trainer import OnlineTrainer, PARAM_COLUMNS
+from backend.ai.markov import MarkovModel, OUTCOMES, SHIFTS, coil_bucket, sample_chain
 from backend.simulation.fast_forward import (
     simulate_day, 
     get_downtime_reason, 
@@ -14,9 +18,23 @@ from backend.simulation.fast_forward import (
     NG_REASONS,
     PARTS_PER_DAY, 
     CYCLE_TIME_SECONDS,
+    COIL_LIFE_MAX,
     get_shift_operator
 )
 
+logger = logging.getLogger(__name__)
+
+# Upper bound on cycle slots per vectorized chunk (a chunk also ends at every shift change)
+PREDICT_CHUNK_SLOTS = 10_000
+
+# Per FAILURE_TYPES index: repair gap bounds (cycles) and reason strings
+REPAIR_GAPS = (
+    np.array([REPAIR_TIMES[f][0] for f in FAILURE_TYPES]),
+    np.array([REPAIR_TIMES[f][1] for f in FAILURE_TYPES]),
+)
+DOWNTIME_REASONS = np.array([get_downtime_reason(f) for f in FAILURE_TYPES], dtype=object)
+PROCESS_FAILURE_REASONS = np.array([f"PROCESS FAILURE: {r}" for r in DOWNTIME_REASONS], dtype=object)
+
 class ProductionAI:
     """
     AI Module for Digital Twin Simulation.
@@ -24,6 +42,9 @@ class ProductionAI:
     """
     
     def __init__(self):
+        self.trained_rows = 0
+        self.markov: Optional[MarkovModel] = None
+        
         # Learned Parameters (Defaults used if no data)
         self.stats = {
             'power': {'mean': 50.0, 'stdev': 1.0},
@@ -35,79 +56,79 @@ class ProductionAI:
         self.transition_matrix = {
             'OK': {'OK': 0.95, 'NG': 0.04, 'DOWN': 0.01},
             'NG': {'OK': 0.60, 'NG': 0.30, 'DOWN': 0.10}, 
-            # DOWN escapes via repair, so we model probability of *entering* DOWN
+            # DOWN escapes via repair; this row is the first part after the repair
+            'DOWN': {'OK': 0.95, 'NG': 0.04, 'DOWN': 0.01},
         }
     
-    async def train_model(self, session: AsyncSession) -> bool:
+    async def train_model(self, session: AsyncSession, full: bool = False) -> bool:
         """
         Analyzes historical data to update internal statistical models.
         Returns True if enough data was found to train (>100 records).
+        
+        Incremental: resumes the persisted OnlineTrainer checkpoint and only
+        reads Telemetry rows written since then (full=True rescans everything).
         """
-        # Fetch up to 10,000 recent records for training
-        result = await session.execute(
-            select(Telemetry).order_by(Telemetry.timestamp_sim.desc()).limit(10000)
-        )
-        data = result.scalars().all()
+        # 1. Resume from the last checkpoint and fold in the new rows
+        trainer = OnlineTrainer() if full else await OnlineTrainer.load(session)
+        new_rows = await trainer.update(session)
+        await trainer.save(session)
+        await session.commit()
+        self.trained_rows = new_rows
         
-        if len(data) < 100:
-            print("⚠️ AI: Insufficient data to train (<100 records). Using defaults.")
+        if trainer.total < 100:
+            logger.warning("⚠️ AI: Insufficient data to train (<100 records). Using defaults.")
             return False
             
-        print(f"🧠 AI: Training on {len(data)} records...")
-        
-        # 1. Extract Arrays for OK parts only (to learn "Normal" behavior)
-        ok_parts = [r for r in data if not r.is_anomaly and r.state != 'DOWN']
-        
-        if ok_parts:
-            # Helper to safely calc stats
-            def calc_stat(dataset):
-                if not dataset: return 0, 0
-                return statistics.mean(dataset), statistics.stdev(dataset) if len(dataset) > 1 else 0
-                
-            p_mean, p_std = calc_stat([r.induction_power for r in ok_parts])
-            f_mean, f_std = calc_stat([r.quench_water_flow for r in ok_parts])
-            pr_mean, pr_std = calc_stat([r.quench_pressure for r in ok_parts])
-            t_mean, t_std = calc_stat([r.part_temp for r in ok_parts])
-            
-            # Update Knowledge Base
-            self.stats['power'] = {'mean': p_mean, 'stdev': p_std}
-            self.stats['flow'] = {'mean': f_mean, 'stdev': f_std}
-            self.stats['pressure'] = {'mean': pr_mean, 'stdev': pr_std}
-            self.stats['temp'] = {'mean': t_mean, 'stdev': t_std}
-            
-        # 2. Learn State Transitions (Markov Chain)
-        # Count transitions: OK->OK, OK->NG, OK->DOWN
-        transitions = {'OK': 0, 'NG': 0, 'DOWN': 0}
-        total = len(data)
-        
-        for r in data:
-            if r.downtime_reason: transitions['DOWN'] += 1
-            elif r.ng_reason: transitions['NG'] += 1
-            else: transitions['OK'] += 1
-            
-        # Normalize to probabilities
-        if total > 0:
-            p_ok = transitions['OK'] / total
-            p_ng = transitions['NG'] / total
-            p_down = transitions['DOWN'] / total
+        logger.info("🧠 AI: Training on %s records (%s new since last checkpoint)...", trainer.total, new_rows)
+        
+        # 2. Mean / stdev of OK parts only (to learn "Normal" behavior)
+        self.stats.update(trainer.learned_stats())
             
-            # Simple 1st order approximation: Probability of randomly generating this state
-            # (Refining full Markov chain requires sequential analysis, but distribution matching is sufficient for this scope)
-            self.transition_matrix['OK'] = {'OK': p_ok, 'NG': p_ng, 'DOWN': p_down}
+        # 3. Learn State Transitions (Markov Chain) from the time-ordered sequence.
+        # Only the rows the trainer just folded in are counted (full=True recounts everything).
+        markov = MarkovModel() if full else await MarkovModel.load(session)
+        if markov.last_id != trainer.last_id:
+            await markov.update(session, upto_id=trainer.last_id)
+            await markov.save(session)
+            await session.commit()
+        self.markov = markov
+        
+        matrix = markov.global_matrix(self._default_matrix())
+        self.transition_matrix = {
+            prev: {cur: float(matrix[i, j]) for j, cur in enumerate(OUTCOMES)}
+            for i, prev in enumerate(OUTCOMES)
+        }
             
-        print(f"🧠 AI: Learned Stats -> Power: {self.stats['power']['mean']:.1f}±{self.stats['power']['stdev']:.1f}")
+        logger.info("🧠 AI: Learned Stats -> Power: %.1f±%.1f", self.stats['power']['mean'], self.stats['power']['stdev'])
+        logger.info("🧠 AI: Learned Transitions -> P(DOWN|OK)=%.3f, P(NG|NG)=%.3f (%s transitions)",
+                    self.transition_matrix['OK']['DOWN'], self.transition_matrix['NG']['NG'], markov.total_transitions)
         return True
 
+    def _default_matrix(self) -> np.ndarray:
+        """transition_matrix as a 3x3 array (used wherever the learned counts are too thin)."""
+        return np.array([[self.transition_matrix[p][c] for c in OUTCOMES] for p in OUTCOMES])
+
+    def transition_tables(self) -> np.ndarray:
+        """Cumulative P(next | previous) per [shift slot, coil bucket] for the sampler."""
+        fallback = self._default_matrix()
+        if self.markov is None:
+            tables = np.broadcast_to(fallback, (len(SHIFTS) + 1, 4, 3, 3))
+        else:
+            tables = self.markov.conditioned_tables(fallback)
+        return np.cumsum(tables, axis=-1)
+
     def generate_parameter(self, param_name: str, drift_factor: float = 0.0) -> float:
         """Generates a value based on learned normal distribution + drift."""
         stat = self.stats.get(param_name, {'mean': 0, 'stdev': 1})
         val = random.gauss(stat['mean'], stat['stdev'])
         return val + drift_factor
 
-    async def predict_week(self, session: AsyncSession, start_time: datetime, days: int = 7) -> dict:
+    async def predict_week(self, session: AsyncSession, start_time: datetime, days: int = 7,
+                           seed: Optional[int] = None) -> dict:
         """
         Generates N days of data based on learned patterns.
-        Optimized for bulk insertion speed.
+        Vectorized: each chunk of cycle slots is drawn as NumPy arrays and
+        written with a columnar bulk insert (no per-part Python loop).
         """
         # 1. Train first
         await self.train_model(session)
@@ -115,115 +136,27 @@ class ProductionAI:
         # 2. Settings
         days_to_predict = days
         total_parts = PARTS_PER_DAY * days_to_predict
+        rng = np.random.default_rng(seed)
         
-        # 3. Pre-calculate Loop Constants to save CPU cycles
-        current_time = start_time
-        ok_count = 0
-        ng_count = 0
-        down_count = 0
-        coil_life = 200000 
-        repair_cycles_remaining = 0
-        
-        print(f"🔮 AI: Generating {days_to_predict} days (~{total_parts} parts)...")
+        logger.info("🔮 AI: Generating %s days (~%s parts)...", days_to_predict, total_parts)
         
-        probs = self.transition_matrix['OK']
-        prob_down = probs['DOWN']
-        prob_ng = probs['DOWN'] + probs['NG']
-        
-        batch_size = 5000
-        records_batch = []
+        # 3. Carried across chunks
+        state = {
+            'ok': 0, 'ng': 0, 'down': 0,
+            'coil_used': 0,          # active cycles so far (coil life wraps at COIL_LIFE_MAX)
+            'repair_remaining': 0,   # slots of the last breakdown spilling into the next chunk
+            'last_outcome': 0,       # Markov state the next part transitions from
+        }
+        tables = self.transition_tables()
         
-        import uuid
-        from sqlalchemy import insert
+        from backend.simulation.bulk_insert import insert_telemetry_columns
         
-        for i in range(total_parts):
-            # Advance Time roughly (10s per part)
-            current_time += timedelta(seconds=CYCLE_TIME_SECONDS)
-            
-            # Simple Shift Calculation (save function call overhead if possible, but func is cleaner)
-            h = current_time.hour
-            is_shift_a = 8 <= h < 20
-            shift_id = 'Shift_A' if is_shift_a else 'Shift_B'
-            operator_id = 'OP_A' if is_shift_a else 'OP_B'
-            
-            # Handle Repair
-            if repair_cycles_remaining > 0:
-                repair_cycles_remaining -= 1
-                continue
-            
-            coil_life -= 1
-            if coil_life <= 0: coil_life = 200000
-            
-            # Determine Outcome (Fast)
-            roll = random.random()
-            
-            params = {}
-            outcome = 'OK'
-            state = 'COMPLETED'
-            downtime_reason = None
-            ng_reason = None
-            repair_time = 0.0
-            
-            if roll < prob_down:
-                outcome = 'DOWN'
-                state = 'DOWN'
-                fail_type = random.choice(FAILURE_TYPES)
-                downtime_reason = get_downtime_reason(fail_type)
-                ng_reason = f"PROCESS FAILURE: {downtime_reason}"
-                repair_cycles_remaining = random.randint(*REPAIR_TIMES[fail_type])
-                repair_time = float(repair_cycles_remaining * CYCLE_TIME_SECONDS)
-                # Parameters go wild
-                params = {k: self.generate_parameter(k, drift_factor=random.uniform(-10, 10)) for k in self.stats}
-                down_count += 1
-                
-            elif roll < prob_ng:
-                outcome = 'NG'
-                ng_reason = random.choice(NG_REASONS)
-                params = {k: self.generate_parameter(k) for k in self.stats}
-                if ng_reason == 'SOFTNESS': params['power'] *= 0.8
-                elif ng_reason == 'CRACKING': params['pressure'] *= 1.5
-                ng_count += 1
-                
-            else:
-                outcome = 'OK'
-                params = {k: self.generate_parameter(k) for k in self.stats}
-                ok_count += 1
-            
-            # Create Dictionary (dict creation is faster than ORM Object)
-            record_dict = {
-                'sim_run_id': 1,
-                'timestamp_sim': current_time,
-                'induction_power': params['power'],
-                'quench_water_temp': random.uniform(25.0, 30.0), 
-                'quench_water_flow': params['flow'],
-                'quench_pressure': params['pressure'],
-                'coil_scan_speed': params['scan_speed'],
-                'tempering_speed': 5.0,
-                'part_temp': params['temp'],
-                'state': state,
-                'part_id': f"AI-{str(uuid.uuid4())[:8]}",
-                'shift_id': shift_id,
-                'operator_id': operator_id,
-                'coil_life_counter': coil_life,
-                'ok_count': ok_count,
-                'ng_count': ng_count + down_count,
-                'is_anomaly': (outcome != 'OK'),
-                'downtime_reason': downtime_reason,
-                'ng_reason': ng_reason,
-                'repair_time': repair_time
-            }
-            records_batch.append(record_dict)
-            
-            # Flush Batch
-            if len(records_batch) >= batch_size:
-                # Use Core INSERT for massive speedup vs ORM add_all
-                await session.execute(insert(Telemetry), records_batch)
-                records_batch = []
-                # print(f"   ...AI generated {i+1} records") 
-        
-        # Insert remaining
-        if records_batch:
-            await session.execute(insert(Telemetry), records_batch)
+        slot = 0
+        while slot < total_parts:
+            columns, used = self._generate_chunk(rng, tables, start_time, slot, total_parts - slot, state)
+            slot += used
+            # Use Core INSERT for massive speedup vs ORM add_all
+            await insert_telemetry_columns(session, columns)
             
         await session.commit()
         
@@ -232,13 +165,104 @@ class ProductionAI:
         count_verify = await session.execute(select(func.count(Telemetry.id)))
         total_now = count_verify.scalar()
         
-        # Calculate Delta if possible (approximation, or just trust the detailed flow)
-        
         return {
             'total_records': total_parts,
-            'ok_count': ok_count,
-            'ng_count': ng_count,
-            'down_count': down_count,
+            'ok_count': state['ok'],
+            'ng_count': state['ng'],
+            'down_count': state['down'],
             'days': days_to_predict,
             'db_total_now': total_now
         }
+
+    def _generate_chunk(self, rng: np.random.Generator, tables: np.ndarray, start_time: datetime,
+                        first_slot: int, remaining: int, state: Dict):
+        """
+        Draws one chunk of consecutive cycle slots (up to the next shift change)
+        as column arrays. Returns (columns, slots used).
+        
+        Parts follow the learned Markov chain conditioned on shift and coil
+        life; a breakdown blocks the following repair-gap slots.
+        """
+        base = np.datetime64(start_time, 'us')
+        cycle = np.timedelta64(CYCLE_TIME_SECONDS, 's')
+        
+        # 1. Chunk = slots until the shift changes (shift is constant inside)
+        window = min(PREDICT_CHUNK_SLOTS, remaining)
+        stamps = base + (first_slot + np.arange(window) + 1) * cycle
+        hours = (stamps.astype('datetime64[h]') - stamps.astype('datetime64[D]')).astype(int)
+        shift_a = (hours >= 8) & (hours < 20)
+        changes = np.flatnonzero(shift_a != shift_a[0])
+        n = int(changes[0]) if len(changes) else window
+        shift_id = 'Shift_A' if shift_a[0] else 'Shift_B'
+        
+        # 2. Slots still blocked by a repair from the previous chunk
+        blocked = min(state['repair_remaining'], n)
+        state['repair_remaining'] -= blocked
+        parts = n - blocked
+        
+        # 3. Outcome sequence (0 = OK, 1 = NG, 2 = DOWN) for at most `parts` parts
+        coil_life = (COIL_LIFE_MAX - 1 - (state['coil_used'] + np.arange(parts)) % COIL_LIFE_MAX)
+        coil_life[coil_life == 0] = COIL_LIFE_MAX
+        step_cdf = tables[SHIFTS.index(shift_id), coil_bucket(coil_life)]
+        outcome = sample_chain(step_cdf, rng.random(parts), state['last_outcome'])
+        
+        # 4. Place parts on slots: each DOWN part is followed by its repair gap
+        fail_idx = rng.integers(0, len(FAILURE_TYPES), parts)
+        gaps = np.where(outcome == 2, rng.integers(REPAIR_GAPS[0][fail_idx], REPAIR_GAPS[1][fail_idx] + 1), 0)
+        offset = blocked + np.arange(parts) + np.cumsum(gaps) - gaps
+        keep = offset < n
+        rows = int(keep.sum())
+        outcome, fail_idx, gaps, offset, coil_life = (
+            outcome[keep], fail_idx[keep], gaps[keep], offset[keep], coil_life[keep]
+        )
+        if rows:
+            state['last_outcome'] = int(outcome[-1])
+            state['repair_remaining'] += max(0, int(offset[-1] + 1 + gaps[-1]) - n)
+        is_ok, is_ng, is_down = outcome == 0, outcome == 1, outcome == 2
+        timestamps = stamps[offset]
+        
+        # 5. Parameters: learned normal distributions, breakdowns drift wildly
+        params = {}
+        for key, column in PARAM_COLUMNS.items():
+            stat = self.stats.get(key, {'mean': 0, 'stdev': 1})
+            values = rng.normal(stat['mean'], stat['stdev'], rows)
+            values[is_down] += rng.uniform(-10, 10, int(is_down.sum()))
+            params[column] = values
+        
+        ng_choice = rng.integers(0, len(NG_REASONS), rows)
+        ng_reason_text = np.array(NG_REASONS, dtype=object)[ng_choice]
+        params['induction_power'][is_ng & (ng_reason_text == 'SOFTNESS')] *= 0.8
+        params['quench_pressure'][is_ng & (ng_reason_text == 'CRACKING')] *= 1.5
+        
+        downtime_reason = np.where(is_down, DOWNTIME_REASONS[fail_idx], None)
+        ng_reason = np.where(is_down, PROCESS_FAILURE_REASONS[fail_idx], np.where(is_ng, ng_reason_text, None))
+        
+        # 6. Running counters (as of each row, like the live machine)
+        ok_count = state['ok'] + np.cumsum(is_ok)
+        ng_count = state['ng'] + state['down'] + np.cumsum(~is_ok)
+        
+        state['ok'] += int(is_ok.sum())
+        state['ng'] += int(is_ng.sum())
+        state['down'] += int(is_down.sum())
+        state['coil_used'] += rows
+        
+        operator_id = 'OP_A' if shift_id == 'Shift_A' else 'OP_B'
+        columns = {
+            'sim_run_id': 1,
+            'timestamp_sim': timestamps,
+            **params,
+            'quench_water_temp': rng.uniform(25.0, 30.0, rows),
+            'tempering_speed': 5.0,
+            'state': np.where(is_down, 'DOWN', 'COMPLETED').astype(object),
+            'part_id': np.char.mod('AI-%08x', rng.integers(0, 2 ** 32, rows, dtype=np.uint64)).astype(object),
+            'shift_id': shift_id,
+            'operator_id': operator_id,
+            'coil_life_counter': coil_life,
+            'ok_count': ok_count,
+            'ng_count': ng_count,
+            'is_anomaly': ~is_ok,
+            'downtime_reason': downtime_reason,
+            'ng_reason': ng_reason,
+            'repair_time': np.where(is_down, gaps * float(CYCLE_TIME_SECONDS), 0.0),
+        }
+        return columns, n
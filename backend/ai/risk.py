@@ -0,0 +1,191 @@
+"""
+Online Risk Scoring (Early Downtime Detection)
+Streaming drift detector that fills Telemetry.ai_risk_score / ai_status.
+
+Each monitored signal is sampled only in the phase where it is meaningful
+(e.g. quench pressure during QUENCH) and keeps, in O(1) per tick:
+  - a Holt (double exponential) smoother: EWMA level + EWMA slope per tick
+  - a baseline mean / stdev learned over its first samples (Welford)
+  - a two-sided standardized CUSUM against that baseline
+The scorer's tick counts every machine tick (advance() covers the ticks a
+machine samples nothing), so slopes and ticks_to_limit are per real tick
+even though each signal is only sampled in its phase.
+The slope is projected onto FailureManager.SAFETY_LIMITS to get the ticks
+left before a breakdown. A signal's risk is the larger of
+  - trend risk:  exp(-ticks_to_limit / HORIZON_TICKS) while heading for a limit
+  - shift risk:  CUSUM / CUSUM_H, scaled so a CUSUM alarm is exactly WARNING
+and the machine's score is the worst signal. A level already past its limit
+scores 1.0.
+"""
+
+import math
+from typing import Dict, Optional
+
+from backend.simulation.failure_manager import FailureManager
+
+# signal -> (machine state it is sampled in, lower / upper SAFETY_LIMITS key)
+SIGNALS = {
+    'pressure': ('QUENCH', 'pressure_min', 'pressure_max'),
+    'flow': ('QUENCH', 'flow_min', None),
+    'quench_water_temp': ('QUENCH', None, 'temp_max'),
+    'power': ('HEATING', None, 'power_max'),
+    'scan_speed': ('HEATING', 'speed_min', None),
+}
+
+LEVEL_ALPHA = 0.1       # Holt level smoothing
+TREND_BETA = 0.02       # Holt slope smoothing (slow: the slope must be persistent to count)
+BASELINE_SAMPLES = 200  # Samples per signal before CUSUM / trend scoring starts
+CUSUM_K = 0.5           # Allowance (in baseline stdevs)
+CUSUM_H = 8.0           # Decision interval (in baseline stdevs)
+HORIZON_TICKS = 600     # Trend risk is 1/e when the limit is this many ticks away (2 min live)
+MIN_STDEV = 1e-3
+
+WARNING_SCORE = 0.3     # Also the ceiling for shift risk: a shift alone never reaches CRITICAL
+CRITICAL_SCORE = 0.7
+
+
+def risk_status(score: float) -> str:
+    if score >= CRITICAL_SCORE:
+        return 'CRITICAL'
+    if score >= WARNING_SCORE:
+        return 'WARNING'
+    return 'OK'
+
+
+class SignalTracker:
+    __slots__ = ('lower', 'upper', 'n', 'mean', 'm2', 'inv_stdev', 'level', 'slope', 'last_tick',
+                 'cusum_hi', 'cusum_lo', 'risk', 'ticks_to_limit')
+
+    def __init__(self, lower: Optional[float], upper: Optional[float]):
+        self.lower = lower
+        self.upper = upper
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.inv_stdev = 0.0
+        self.reset_trend()
+
+    def reset_trend(self):
+        """Forget the current trend / shift but keep the learned baseline."""
+        self.level = None
+        self.slope = 0.0
+        self.last_tick = 0
+        self.cusum_hi = 0.0
+        self.cusum_lo = 0.0
+        self.risk = 0.0
+        self.ticks_to_limit = None
+
+    def update(self, x: float, tick: int) -> float:
+        # 1. Holt smoother (slope per tick; dt spans the ticks the signal was inactive)
+        if self.level is None:
+            self.level, self.last_tick = x, tick
+        else:
+            dt = max(1, tick - self.last_tick)
+            predicted = self.level + self.slope * dt
+            level = predicted + LEVEL_ALPHA * (x - predicted)
+            self.slope += TREND_BETA * ((level - self.level) / dt - self.slope)
+            self.level, self.last_tick = level, tick
+
+        # 2. Baseline (learned once, while the process is assumed healthy)
+        if self.n < BASELINE_SAMPLES:
+            self.n += 1
+            delta = x - self.mean
+            self.mean += delta / self.n
+            self.m2 += delta * (x - self.mean)
+            if self.n == BASELINE_SAMPLES:
+                self.inv_stdev = 1.0 / max(math.sqrt(self.m2 / (self.n - 1)), MIN_STDEV)
+            return 0.0
+
+        # 3. CUSUM on the standardized sample
+        z = (x - self.mean) * self.inv_stdev
+        self.cusum_hi = max(0.0, self.cusum_hi + z - CUSUM_K)
+        self.cusum_lo = max(0.0, self.cusum_lo - z - CUSUM_K)
+        cusum = 0.0
+        if self.upper is not None:
+            cusum = self.cusum_hi
+        if self.lower is not None and self.cusum_lo > cusum:
+            cusum = self.cusum_lo
+        shift_risk = min(cusum / CUSUM_H, 1.0) * WARNING_SCORE
+
+        # 4. Time to the safety limit along the current slope
+        level, slope, lower, upper = self.level, self.slope, self.lower, self.upper
+        if (lower is not None and level <= lower) or (upper is not None and level >= upper):
+            self.ticks_to_limit = 0.0
+        elif slope < 0 and lower is not None:
+            self.ticks_to_limit = (level - lower) / -slope
+        elif slope > 0 and upper is not None:
+            self.ticks_to_limit = (upper - level) / slope
+        else:
+            self.ticks_to_limit = None
+        trend_risk = math.exp(-self.ticks_to_limit / HORIZON_TICKS) if self.ticks_to_limit is not None else 0.0
+
+        self.risk = max(trend_risk, shift_risk)
+        return self.risk
+
+
+class RiskScorer:
+    """
+    Per-machine scorer. MachineState calls update() with the current
+    (pre-noise) process values on ticks in a sampled phase, and advance() on
+    every other tick.
+    """
+    def __init__(self, tick_seconds: float = 0.2, limits: Optional[Dict[str, float]] = None):
+        self.tick_seconds = tick_seconds  # For reporting time-to-limit in seconds
+        self.tick = 0
+        self.trackers = {name: SignalTracker(None, None) for name in SIGNALS}
+        self.set_limits(limits or FailureManager().SAFETY_LIMITS)
+        self._by_state = {}
+        for name, (state, _, _) in SIGNALS.items():
+            self._by_state.setdefault(state, []).append((name, self.trackers[name]))
+        self.score = 0.0
+        self.status = 'OK'
+        self.signal: Optional[str] = None
+
+    def set_limits(self, limits: Dict[str, float]):
+        """Points every signal at (new) safety limits, e.g. after the rule table is reloaded."""
+        self.limits = limits
+        for name, (_, lo, hi) in SIGNALS.items():
+            tracker = self.trackers[name]
+            tracker.lower = limits.get(lo) if lo else None
+            tracker.upper = limits.get(hi) if hi else None
+
+    def advance(self, ticks: int = 1):
+        """Ticks that pass without a sample (other phases, IDLE / DOWN)."""
+        self.tick += ticks
+
+    def update(self, state: str, values: Dict[str, float]):
+        """One tick with a sample."""
+        self.tick += 1
+        sampled = self._by_state.get(state)
+        if not sampled:
+            return
+        for name, tracker in sampled:
+            tracker.update(values[name], self.tick)
+
+        # Worst signal wins (5 comparisons)
+        best, signal = 0.0, None
+        for name, tracker in self.trackers.items():
+            if tracker.risk > best:
+                best, signal = tracker.risk, name
+        self.score, self.signal = best, signal
+        self.status = risk_status(best)
+
+    def reset_trends(self):
+        """After a repair: the drift is gone but the learned baseline still holds."""
+        for tracker in self.trackers.values():
+            tracker.reset_trend()
+        self.score, self.status, self.signal = 0.0, 'OK', None
+
+    def reset(self):
+        self.__init__(self.tick_seconds, self.limits)
+
+    def snapshot(self) -> Dict:
+        tracker = self.trackers.get(self.signal)
+        ticks = tracker.ticks_to_limit if tracker else None
+        return {
+            'risk_score': round(self.score, 4),
+            'status': self.status,
+            'signal': self.signal,
+            'seconds_to_limit': round(ticks * self.tick_seconds, 1) if ticks is not None else None,
+            'slope_per_second': round(tracker.slope / self.tick_seconds, 5) if tracker else None,
+        }
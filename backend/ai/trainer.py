@@ -0,0 +1,204 @@
+"""
+Online Trainer for ProductionAI
+Streaming, resumable statistics over the whole Telemetry history.
+
+- Welford accumulators (count / mean / M2) per process parameter over OK
+  parts, merged chunk-by-chunk with Chan's parallel update, so mean and stdev
+  are exact without keeping any data around.
+- OK/NG/DOWN outcome counts. (Sequential transitions need time order
+  across the whole history; see backend/ai/markov.py.)
+- A checkpoint (last Telemetry id seen + the accumulators) persisted in the
+  ai_model_state table. Each train() only reads rows with id > checkpoint,
+  in keyset-paginated, column-only chunks; cost is proportional to new data.
+- Late commits: on PostgreSQL a transaction can commit a lower id after a
+  higher one was already read. Ids skipped within LATE_ID_WINDOW below the
+  checkpoint are remembered and looked up again on every train(), and folded
+  in once they show up (rolled-back ids just age out of the window). Rows
+  committed later than that are never counted.
+
+Deleting telemetry (reset) must also call reset_model_state(): ids can be
+reused afterwards, and removed rows can't be subtracted from the accumulators.
+"""
+
+import json
+import math
+from datetime import datetime
+from typing import Dict, Optional, Union
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from backend.models import AIModelState, Telemetry
+
+MODEL_NAME = "production_ai"
+TRAIN_CHUNK = 50_000
+LATE_ID_WINDOW = 10_000  # How far below the checkpoint a skipped id is still retried
+GAP_LOOKUP_CHUNK = 1_000
+
+# ProductionAI.stats key -> Telemetry column
+PARAM_COLUMNS = {
+    'power': 'induction_power',
+    'flow': 'quench_water_flow',
+    'pressure': 'quench_pressure',
+    'temp': 'part_temp',
+    'scan_speed': 'coil_scan_speed',
+}
+
+_COLUMNS = ('id', 'downtime_reason', 'ng_reason', *PARAM_COLUMNS.values())
+
+
+class Welford:
+    """Running count / mean / sum of squared deviations (M2)."""
+    __slots__ = ('n', 'mean', 'm2')
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, values: np.ndarray):
+        """Merges a batch (Chan et al. parallel variant of Welford's update)."""
+        k = len(values)
+        if k == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        n = self.n + k
+        delta = batch_mean - self.mean
+        self.mean += delta * k / n
+        self.m2 += batch_m2 + delta * delta * self.n * k / n
+        self.n = n
+
+    @property
+    def stdev(self) -> float:
+        """Sample standard deviation (same as statistics.stdev)."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+class OnlineTrainer:
+    def __init__(self):
+        self.last_id = 0
+        self.gaps = []  # Ids below last_id not seen yet (see LATE_ID_WINDOW)
+        self.params = {key: Welford() for key in PARAM_COLUMNS}
+        self.outcomes = [0, 0, 0]
+        self.updated_at: Optional[datetime] = None
+
+    # === Persistence ===
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'params': {k: [w.n, w.mean, w.m2] for k, w in self.params.items()},
+            'outcomes': self.outcomes,
+            'gaps': self.gaps,
+        })
+
+    @classmethod
+    def from_row(cls, row: AIModelState) -> "OnlineTrainer":
+        trainer = cls()
+        trainer.last_id = row.last_id
+        trainer.updated_at = row.updated_at
+        state = json.loads(row.state)
+        for key, (n, mean, m2) in state['params'].items():
+            if key in trainer.params:
+                trainer.params[key] = Welford(n, mean, m2)
+        trainer.outcomes = state['outcomes']
+        trainer.gaps = state.get('gaps', [])
+        return trainer
+
+    @classmethod
+    async def load(cls, session: AsyncSession, name: str = MODEL_NAME) -> "OnlineTrainer":
+        row = await session.get(AIModelState, name)
+        return cls.from_row(row) if row else cls()
+
+    async def save(self, session: AsyncSession, name: str = MODEL_NAME):
+        self.updated_at = datetime.now()
+        await session.merge(AIModelState(
+            name=name, last_id=self.last_id, state=self.to_json(), updated_at=self.updated_at
+        ))
+
+    # === Training ===
+
+    async def update(self, session: AsyncSession, chunk_size: int = TRAIN_CHUNK) -> int:
+        """
+        Folds every Telemetry row with id > last_id (and any late-committed
+        gap id) into the model. Returns rows read.
+        """
+        table = Telemetry.__table__
+        columns = [table.c[c] for c in _COLUMNS]
+
+        # 1. Skipped ids that have committed since
+        read = 0
+        gaps = self.gaps
+        for start in range(0, len(gaps), GAP_LOOKUP_CHUNK):
+            result = await session.execute(
+                select(*columns).where(Telemetry.id.in_(gaps[start:start + GAP_LOOKUP_CHUNK]))
+            )
+            rows = result.all()
+            if rows:
+                self._fold(rows)
+                read += len(rows)
+                found = {r[0] for r in rows}
+                self.gaps = [i for i in self.gaps if i not in found]
+
+        # 2. New rows
+        while True:
+            result = await session.execute(
+                select(*columns)
+                .where(Telemetry.id > self.last_id)
+                .order_by(Telemetry.id)
+                .limit(chunk_size)
+            )
+            rows = result.all()
+            if rows:
+                self._fold(rows)
+                self._track_gaps(rows)
+                self.last_id = rows[-1][0]
+                read += len(rows)
+            if len(rows) < chunk_size:
+                break
+
+        # 3. Give up on ids that fell out of the window
+        floor = self.last_id - LATE_ID_WINDOW
+        self.gaps = [i for i in self.gaps if i > floor]
+        return read
+
+    def _track_gaps(self, rows):
+        """Remembers the ids between last_id and this chunk's end that weren't returned."""
+        end = rows[-1][0]
+        if end - self.last_id == len(rows):
+            return  # Contiguous (the usual case)
+        start = max(self.last_id, end - LATE_ID_WINDOW) + 1
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        self.gaps.extend(int(i) for i in np.setdiff1d(np.arange(start, end + 1), ids))
+
+    def _fold(self, rows):
+        # Same classification as the counters: DOWN wins over NG
+        outcome = np.fromiter(
+            (2 if r[1] is not None else 1 if r[2] is not None else 0 for r in rows),
+            dtype=np.int64, count=len(rows)
+        )
+
+        # 1. Parameter distributions (OK parts only)
+        ok = outcome == 0
+        for i, key in enumerate(PARAM_COLUMNS):
+            values = np.array([r[3 + i] for r in rows], dtype=float)[ok]
+            self.params[key].update(values[~np.isnan(values)])
+
+        # 2. Outcome counts
+        for code, count in enumerate(np.bincount(outcome, minlength=3)):
+            self.outcomes[code] += int(count)
+
+    # === Model Outputs ===
+
+    @property
+    def total(self) -> int:
+        return sum(self.outcomes)
+
+    def learned_stats(self) -> Dict[str, Dict[str, float]]:
+        return {k: {'mean': w.mean, 'stdev': w.stdev} for k, w in self.params.items() if w.n > 0}
+
+
+async def reset_model_state(target: Union[AsyncConnection, AsyncSession]):
+    """Drops the trainer checkpoints; the next train rescans the whole history."""
+    await target.execute(delete(AIModelState))
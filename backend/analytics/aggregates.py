@@ -0,0 +1,212 @@
+"""
+Telemetry Aggregates
+Per-minute and per-shift rollups of Telemetry, maintained on write.
+
+Every bulk Telemetry insert (see bulk_insert.insert_telemetry_rows) folds its
+rows into three tables in the same transaction, next to TelemetryCounters:
+  - telemetry_minute:        OK/NG/DOWN counts + sum/sum-of-squares per metric
+  - telemetry_shift:         the same, per (shift_date, shift_id)
+  - telemetry_reason_counts: NG/DOWN occurrences per minute and reason
+Analytic reads (per-minute / per-shift stats, reason breakdowns) then cost O(buckets)
+instead of O(rows). rebuild_aggregates() backfills them from existing data by
+streaming Telemetry through the same code path (see backfill_aggregates.py).
+"""
+
+import math
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from backend.analytics.counters import classify, upsert_increment
+from backend.models import Telemetry, TelemetryMinute, TelemetryReasonCount, TelemetryShift
+
+# Aggregate column prefix -> Telemetry column (prefixes match ProductionAI.stats keys)
+METRICS = {
+    'power': 'induction_power',
+    'flow': 'quench_water_flow',
+    'pressure': 'quench_pressure',
+    'temp': 'part_temp',
+}
+COUNT_FIELDS = ('total', 'ok_count', 'ng_count', 'down_count')
+SUM_FIELDS = tuple(f"{m}_{s}" for m in METRICS for s in ('sum', 'sumsq'))
+VALUE_FIELDS = COUNT_FIELDS + SUM_FIELDS
+
+# Telemetry columns read by aggregate_rows() (and counters.classify)
+SOURCE_COLUMNS = ('sim_run_id', 'timestamp_sim', 'shift_id', 'downtime_reason', 'ng_reason', *METRICS.values())
+
+SHIFT_DAY_START_HOUR = 8  # Shift_A starts the production day at 08:00
+
+BACKFILL_CHUNK = 50_000
+
+
+def minute_bucket(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def shift_date(ts: datetime) -> date:
+    """Production day a timestamp belongs to (00:00-08:00 is still the previous day's Shift_B)."""
+    return (ts - timedelta(hours=SHIFT_DAY_START_HOUR)).date()
+
+
+def _empty() -> Dict:
+    return dict.fromkeys(VALUE_FIELDS, 0)
+
+
+def aggregate_rows(rows: Iterable[Dict]) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """
+    Folds a batch of Telemetry column dicts into (minute, shift, reason) delta
+    rows, ready for upsert_increment.
+    """
+    minutes = defaultdict(_empty)
+    shifts = defaultdict(_empty)
+    reasons = defaultdict(int)
+    metric_items = tuple(METRICS.items())
+
+    for row in rows:
+        ts = row['timestamp_sim']
+        run_id = row.get('sim_run_id', 1)
+        minute = minute_bucket(ts)
+        outcome = classify(row)
+        m = minutes[(run_id, minute)]
+        s = shifts[(run_id, shift_date(ts), row.get('shift_id') or 'UNKNOWN')]
+
+        for agg in (m, s):
+            agg['total'] += 1
+            agg[outcome] += 1
+
+        if outcome == 'ok_count':
+            for prefix, column in metric_items:
+                value = row.get(column)
+                if value is None:
+                    continue
+                sq = value * value
+                for agg in (m, s):
+                    agg[f'{prefix}_sum'] += value
+                    agg[f'{prefix}_sumsq'] += sq
+        elif outcome == 'down_count':
+            reasons[(run_id, minute, 'DOWN', row['downtime_reason'])] += 1
+        else:
+            reasons[(run_id, minute, 'NG', row['ng_reason'])] += 1
+
+    minute_rows = [{'sim_run_id': r, 'bucket_start': b, **v} for (r, b), v in minutes.items()]
+    shift_rows = [{'sim_run_id': r, 'shift_date': d, 'shift_id': sh, **v} for (r, d, sh), v in shifts.items()]
+    reason_rows = [
+        {'sim_run_id': r, 'bucket_start': b, 'kind': k, 'reason': reason, 'count': n}
+        for (r, b, k, reason), n in reasons.items()
+    ]
+    return minute_rows, shift_rows, reason_rows
+
+
+async def add_rows_to_aggregates(conn: AsyncConnection, rows: Iterable[Dict]):
+    """Applies a freshly inserted batch of Telemetry rows to the aggregate tables."""
+    minute_rows, shift_rows, reason_rows = aggregate_rows(rows)
+    await upsert_increment(conn, TelemetryMinute.__table__, ('sim_run_id', 'bucket_start'), minute_rows)
+    await upsert_increment(conn, TelemetryShift.__table__, ('sim_run_id', 'shift_date', 'shift_id'), shift_rows)
+    await upsert_increment(conn, TelemetryReasonCount.__table__, ('sim_run_id', 'bucket_start', 'kind', 'reason'), reason_rows)
+
+
+async def reset_aggregates(target: Union[AsyncConnection, AsyncSession], sim_run_id: Optional[int] = None):
+    """Clears aggregates (all runs, or one run) after Telemetry rows are deleted."""
+    for model in (TelemetryMinute, TelemetryShift, TelemetryReasonCount):
+        stmt = delete(model)
+        if sim_run_id is not None:
+            stmt = stmt.where(model.sim_run_id == sim_run_id)
+        await target.execute(stmt)
+
+
+async def rebuild_aggregates(conn: AsyncConnection, sim_run_id: Optional[int] = None,
+                             chunk_size: int = BACKFILL_CHUNK) -> int:
+    """
+    Recomputes the aggregates (all runs, or one run) from Telemetry.
+    Streams the table in chunks through aggregate_rows(), so buckets are
+    identical to the ones maintained on insert. Returns rows processed.
+    """
+    await reset_aggregates(conn, sim_run_id)
+    query = select(*(Telemetry.__table__.c[c] for c in SOURCE_COLUMNS))
+    if sim_run_id is not None:
+        query = query.where(Telemetry.sim_run_id == sim_run_id)
+
+    processed = 0
+    result = await conn.stream(query.execution_options(yield_per=chunk_size))
+    async for chunk in result.partitions(chunk_size):
+        await add_rows_to_aggregates(conn, [dict(zip(SOURCE_COLUMNS, row)) for row in chunk])
+        processed += len(chunk)
+    return processed
+
+
+async def ensure_aggregates(conn: AsyncConnection) -> bool:
+    """
+    Backfills the aggregates if they are empty but Telemetry is not
+    (databases created before the tables existed). Returns True if rebuilt.
+    """
+    has_aggregates = (await conn.execute(select(TelemetryMinute.sim_run_id).limit(1))).first()
+    if has_aggregates:
+        return False
+    has_rows = (await conn.execute(select(Telemetry.id).limit(1))).first()
+    if not has_rows:
+        return False
+    await rebuild_aggregates(conn)
+    return True
+
+
+def metric_stats(totals: Dict) -> Dict[str, Dict[str, float]]:
+    """{metric: {mean, stdev}} over OK parts from summed aggregate columns (sample stdev, like statistics.stdev)."""
+    n = totals.get('ok_count') or 0
+    stats = {}
+    for prefix in METRICS:
+        if n == 0:
+            continue
+        total, total_sq = totals[f'{prefix}_sum'], totals[f'{prefix}_sumsq']
+        mean = total / n
+        var = (total_sq - n * mean * mean) / (n - 1) if n > 1 else 0.0
+        stats[prefix] = {'mean': mean, 'stdev': math.sqrt(max(var, 0.0))}
+    return stats
+
+
+async def read_range_totals(target: Union[AsyncConnection, AsyncSession], grain: str,
+                            sim_run_id: Optional[int] = None,
+                            from_time: Optional[datetime] = None, to_time: Optional[datetime] = None):
+    """Aggregate rows for a range at `grain` ('minute' or 'shift'), oldest first."""
+    if grain == 'minute':
+        model, keys, time_col = TelemetryMinute, ('bucket_start',), TelemetryMinute.bucket_start
+        lo, hi = from_time, to_time
+    else:
+        model, keys, time_col = TelemetryShift, ('shift_date', 'shift_id'), TelemetryShift.shift_date
+        lo = shift_date(from_time) if from_time else None
+        hi = shift_date(to_time) if to_time else None
+
+    table = model.__table__
+    if sim_run_id is None:
+        # Sum across runs
+        query = select(*(table.c[k] for k in keys), *(func.sum(table.c[f]).label(f) for f in VALUE_FIELDS))
+        query = query.group_by(*(table.c[k] for k in keys))
+    else:
+        query = select(*(table.c[k] for k in keys), *(table.c[f] for f in VALUE_FIELDS))
+        query = query.where(model.sim_run_id == sim_run_id)
+    if lo:
+        query = query.where(time_col >= lo)
+    if hi:
+        query = query.where(time_col <= hi if grain == 'shift' else time_col < hi)
+    query = query.order_by(*(table.c[k] for k in keys))
+    return keys, (await target.execute(query)).all()
+
+
+async def read_reason_counts(target: Union[AsyncConnection, AsyncSession], sim_run_id: Optional[int] = None,
+                             from_time: Optional[datetime] = None, to_time: Optional[datetime] = None) -> Dict:
+    """{'NG': {reason: count}, 'DOWN': {reason: count}} over a range."""
+    query = select(TelemetryReasonCount.kind, TelemetryReasonCount.reason, func.sum(TelemetryReasonCount.count))
+    if sim_run_id is not None:
+        query = query.where(TelemetryReasonCount.sim_run_id == sim_run_id)
+    if from_time:
+        query = query.where(TelemetryReasonCount.bucket_start >= from_time)
+    if to_time:
+        query = query.where(TelemetryReasonCount.bucket_start < to_time)
+    query = query.group_by(TelemetryReasonCount.kind, TelemetryReasonCount.reason)
+
+    out = {'NG': {}, 'DOWN': {}}
+    for kind, reason, count in (await target.execute(query)).all():
+        out.setdefault(kind, {})[reason] = int(count)
+    return out
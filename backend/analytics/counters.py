@@ -0,0 +1,132 @@
+"""
+Telemetry Counters
+Incrementally maintained OK/NG/DOWN totals backing /simulation/stats.
+
+Every bulk Telemetry insert (see bulk_insert.insert_telemetry_rows) adds its
+per-run deltas to TelemetryCounters in the same transaction, so reading the
+totals is O(runs) instead of four COUNT(*) scans over the whole table.
+rebuild_counters() recomputes them from scratch in a single conditional
+aggregation pass for databases that pre-date the table.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from sqlalchemy import and_, case, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from backend.models import Telemetry, TelemetryCounters
+
+COUNTER_FIELDS = ('total', 'ok_count', 'ng_count', 'down_count')
+
+
+def classify(row: Dict) -> str:
+    """Same buckets as /simulation/stats: DOWN wins over NG, OK has neither reason."""
+    if row.get('downtime_reason') is not None:
+        return 'down_count'
+    if row.get('ng_reason') is not None:
+        return 'ng_count'
+    return 'ok_count'
+
+
+def count_rows(rows: Iterable[Dict]) -> List[Dict]:
+    """Per-run counter deltas for a batch of Telemetry column dicts."""
+    deltas = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    for row in rows:
+        d = deltas[row.get('sim_run_id', 1)]
+        d['total'] += 1
+        d[classify(row)] += 1
+    return [{'sim_run_id': run_id, **d} for run_id, d in deltas.items()]
+
+
+async def upsert_increment(conn: AsyncConnection, table, key_cols: Sequence[str], rows: List[Dict]):
+    """
+    Adds the non-key values of `rows` onto existing rows of `table` (matched on
+    `key_cols`), inserting rows that don't exist yet. Uses native
+    INSERT ... ON CONFLICT DO UPDATE on SQLite/PostgreSQL.
+    """
+    if not rows:
+        return
+    value_cols = [c for c in rows[0] if c not in key_cols]
+    dialect = conn.dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        ins = (sqlite.insert if dialect == 'sqlite' else postgresql.insert)(table)
+        stmt = ins.on_conflict_do_update(
+            index_elements=list(key_cols),
+            set_={c: table.c[c] + ins.excluded[c] for c in value_cols},
+        )
+        await conn.execute(stmt, rows)
+        return
+
+    # Portable fallback: UPDATE, then INSERT whatever didn't exist
+    for row in rows:
+        where = and_(*(table.c[k] == row[k] for k in key_cols))
+        result = await conn.execute(
+            update(table).where(where).values({c: table.c[c] + row[c] for c in value_cols})
+        )
+        if result.rowcount == 0:
+            await conn.execute(insert(table).values(row))
+
+
+async def add_rows_to_counters(conn: AsyncConnection, rows: Iterable[Dict]):
+    """Applies a freshly inserted batch of Telemetry rows to the counters."""
+    await upsert_increment(conn, TelemetryCounters.__table__, ('sim_run_id',), count_rows(rows))
+
+
+def counters_aggregate_query():
+    """Single-pass conditional aggregation over Telemetry, grouped by run."""
+    has_down = Telemetry.downtime_reason.isnot(None)
+    no_down = Telemetry.downtime_reason.is_(None)
+    return (
+        select(
+            Telemetry.sim_run_id,
+            func.count(Telemetry.id).label('total'),
+            func.sum(case((and_(Telemetry.ng_reason.is_(None), no_down), 1), else_=0)).label('ok_count'),
+            func.sum(case((and_(Telemetry.ng_reason.isnot(None), no_down), 1), else_=0)).label('ng_count'),
+            func.sum(case((has_down, 1), else_=0)).label('down_count'),
+        )
+        .group_by(Telemetry.sim_run_id)
+    )
+
+
+async def rebuild_counters(conn: AsyncConnection):
+    """Recomputes every run's counters from Telemetry (one table scan)."""
+    await conn.execute(delete(TelemetryCounters))
+    await conn.execute(
+        insert(TelemetryCounters).from_select(
+            ['sim_run_id', *COUNTER_FIELDS], counters_aggregate_query()
+        )
+    )
+
+
+async def ensure_counters(conn: AsyncConnection) -> bool:
+    """
+    Backfills the counters table if it is empty but Telemetry is not
+    (databases created before the table existed). Returns True if rebuilt.
+    """
+    has_counters = (await conn.execute(select(TelemetryCounters.sim_run_id).limit(1))).first()
+    if has_counters:
+        return False
+    has_rows = (await conn.execute(select(Telemetry.id).limit(1))).first()
+    if not has_rows:
+        return False
+    await rebuild_counters(conn)
+    return True
+
+
+async def reset_counters(target: Union[AsyncConnection, AsyncSession], sim_run_id: Optional[int] = None):
+    """Clears counters (all runs, or one run) after Telemetry rows are deleted."""
+    stmt = delete(TelemetryCounters)
+    if sim_run_id is not None:
+        stmt = stmt.where(TelemetryCounters.sim_run_id == sim_run_id)
+    await target.execute(stmt)
+
+
+async def read_totals(target: Union[AsyncConnection, AsyncSession]) -> Dict[str, int]:
+    """Totals across all runs, in the shape returned by /simulation/stats."""
+    row = (await target.execute(
+        select(*(func.coalesce(func.sum(getattr(TelemetryCounters, f)), 0) for f in COUNTER_FIELDS))
+    )).first()
+    return {f: int(v or 0) for f, v in zip(COUNTER_FIELDS, row)}
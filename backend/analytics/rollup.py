@@ -0,0 +1,168 @@
+"""
+Telemetry Rollups
+Server-side reduction of long Telemetry ranges for charting.
+
+- rollup_query(): one GROUP BY over time buckets (1m/5m/1h) returning
+  count + min/max/mean per metric, so a week of data comes back as a few
+  thousand buckets instead of millions of rows.
+- lttb(): Largest-Triangle-Three-Buckets downsampling of a raw series to N
+  points while keeping its visual shape (peaks/dips survive, unlike averaging).
+- RollupCache: small TTL cache keyed by (run, bucket, range, metrics).
+  Closed ranges in the past are cached longer than ranges ending "now".
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Integer, cast, extract, func, literal_column, select
+
+from backend.models import Telemetry
+
+BUCKET_SECONDS = {"1m": 60, "5m": 300, "1h": 3600}
+
+# Numeric columns that can be rolled up / downsampled
+ROLLUP_METRICS = (
+    "induction_power", "quench_water_temp", "quench_water_flow", "quench_pressure",
+    "coil_scan_speed", "tempering_speed", "part_temp", "coil_life_counter",
+    "repair_time", "ai_risk_score",
+)
+DEFAULT_METRICS = ("part_temp", "induction_power", "quench_water_flow", "quench_pressure")
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def bucket_expression(dialect: str, seconds: int):
+    """Bucket start as integer epoch seconds (naive timestamps are treated as UTC on both dialects)."""
+    if dialect == "sqlite":
+        epoch = cast(func.strftime("%s", Telemetry.timestamp_sim), Integer)
+        return (epoch // seconds) * seconds  # // renders integer division (plain / is true division in SQLAlchemy 2)
+    # Inline the bucket width so SELECT and GROUP BY render the identical expression
+    width = literal_column(str(int(seconds)))
+    epoch = extract("epoch", Telemetry.timestamp_sim)
+    return cast(func.floor(epoch / width) * width, Integer)
+
+
+def epoch_to_datetime(seconds: int) -> datetime:
+    return EPOCH + timedelta(seconds=int(seconds))
+
+
+def rollup_query(dialect: str, bucket: str, metrics: Sequence[str], run_id: Optional[int] = None,
+                 from_time: Optional[datetime] = None, to_time: Optional[datetime] = None):
+    bucket_col = bucket_expression(dialect, BUCKET_SECONDS[bucket]).label("bucket")
+    columns = [bucket_col, func.count().label("count")]
+    for name in metrics:
+        column = Telemetry.__table__.c[name]
+        columns += [
+            func.min(column).label(f"{name}_min"),
+            func.max(column).label(f"{name}_max"),
+            func.avg(column).label(f"{name}_mean"),
+        ]
+    query = select(*columns)
+    query = apply_range(query, run_id, from_time, to_time)
+    return query.group_by(bucket_col).order_by(bucket_col)
+
+
+def apply_range(query, run_id: Optional[int], from_time: Optional[datetime], to_time: Optional[datetime]):
+    if run_id is not None:
+        query = query.where(Telemetry.sim_run_id == run_id)
+    if from_time:
+        query = query.where(Telemetry.timestamp_sim >= from_time)
+    if to_time:
+        query = query.where(Telemetry.timestamp_sim < to_time)
+    return query
+
+
+def columnar_rollup(rows, metrics: Sequence[str]) -> Dict:
+    """Reshapes GROUP BY rows into chart-ready arrays: t, count, {metric: {min, max, mean}}."""
+    out = {"t": [], "count": [], **{m: {"min": [], "max": [], "mean": []} for m in metrics}}
+    for row in rows:
+        out["t"].append(epoch_to_datetime(row[0]).isoformat())
+        out["count"].append(row[1])
+        for i, name in enumerate(metrics):
+            lo, hi, mean = row[2 + 3 * i: 5 + 3 * i]
+            out[name]["min"].append(lo)
+            out[name]["max"].append(hi)
+            out[name]["mean"].append(None if mean is None else round(float(mean), 4))
+    return out
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int):
+    """
+    Largest-Triangle-Three-Buckets. Keeps the first and last point and, for
+    each of threshold-2 equal buckets, the point forming the largest triangle
+    with the previously kept point and the next bucket's average.
+    Returns the indices of the kept points.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(int)
+    kept = np.empty(threshold, dtype=int)
+    kept[0] = 0
+    prev = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the NEXT bucket (the last bucket's "next" is the final point)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        # Twice the triangle area for every candidate in this bucket
+        area = np.abs(
+            (x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev])
+        )
+        prev = lo + int(np.argmax(area))
+        kept[i + 1] = prev
+    kept[-1] = n - 1
+    return kept
+
+
+class RollupCache:
+    """LRU + TTL cache of rollup responses."""
+    def __init__(self, maxsize: int = 256, open_ttl: float = 5.0, closed_ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.open_ttl = open_ttl
+        self.closed_ttl = closed_ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def ttl_for(self, to_time: Optional[datetime]) -> float:
+        # A range that ends in the past won't gain rows from the live machine
+        return self.closed_ttl if to_time and to_time < datetime.now() else self.open_ttl
+
+    def get(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            if entry is not None:
+                del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+rollup_cache = RollupCache()
+
+
+def parse_metrics(metrics: Optional[str]) -> List[str]:
+    if not metrics:
+        return list(DEFAULT_METRICS)
+    names = list(dict.fromkeys(m.strip() for m in metrics.split(",") if m.strip()))
+    unknown = [m for m in names if m not in ROLLUP_METRICS]
+    if unknown or not names:
+        raise ValueError(f"Unknown metric(s): {', '.join(unknown) or '(none given)'}. Valid: {', '.join(ROLLUP_METRICS)}")
+    return names
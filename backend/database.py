@@ -18,9 +18,12 @@ connect_args = {}
 if "sqlite" in DATABASE_URL:
     connect_args = {"check_same_thread": False}
 
+# SQL echo logs every statement synchronously; opt in with SQL_ECHO=1 when debugging queries
+SQL_ECHO = os.getenv("SQL_ECHO", "0").lower() in ("1", "true", "yes")
+
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True, # Set to False in production
+    echo=SQL_ECHO,
     connect_args=connect_args,
     future=True
 )
@@ -0,0 +1,113 @@
+"""
+Logging Setup
+Level-gated, queued logging for the simulator.
+
+- Root level from LOG_LEVEL (default INFO).
+- Per-module overrides from LOG_LEVELS, e.g.
+  "backend.simulation.machine=DEBUG,backend.simulation.physics=WARNING".
+- Records are handed to a QueueHandler; a background QueueListener thread
+  does the formatting and terminal I/O, so the tick loop never blocks on a flush.
+- DEBUG/INFO chatter can be sampled per message template (LOG_SAMPLE_EVERY).
+  WARNING and above always pass.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import Dict, Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s | %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through the first record of each message template, then one in every
+    `every`. Keyed by (logger name, unformatted msg) so e.g. the per-tick
+    heartbeat is thinned without hiding rarer messages.
+    """
+
+    def __init__(self, every: int = 1, max_level: int = logging.INFO):
+        super().__init__()
+        self.every = max(1, int(every))
+        self.max_level = max_level
+        self._counts: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or record.levelno > self.max_level:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            n = self._counts.get(key, 0)
+            self._counts[key] = n + 1
+        return n % self.every == 0
+
+
+def parse_module_levels(spec: str) -> Dict[str, int]:
+    """Parses "mod.a=DEBUG,mod.b=WARNING" into {name: level}."""
+    levels = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+def setup_logging(level: Optional[str] = None,
+                  module_levels: Optional[Dict[str, int]] = None,
+                  sample_every: Optional[int] = None,
+                  stream=None,
+                  use_queue: bool = True) -> logging.Logger:
+    """
+    Configures the root logger. Safe to call more than once; the previous
+    listener is stopped and handlers are replaced.
+    """
+    global _listener
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    if module_levels is None:
+        module_levels = parse_module_levels(os.getenv("LOG_LEVELS", ""))
+    if sample_every is None:
+        sample_every = int(os.getenv("LOG_SAMPLE_EVERY", "1"))
+
+    root = logging.getLogger()
+    shutdown_logging()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+
+    sink = logging.StreamHandler(stream or sys.stderr)
+    sink.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        handler = logging.handlers.QueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, sink, respect_handler_level=True)
+        _listener.start()
+    else:
+        handler = sink
+
+    # Filter on the producer side so dropped records never hit the queue
+    handler.addFilter(SamplingFilter(sample_every))
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    for name, lvl in module_levels.items():
+        logging.getLogger(name).setLevel(lvl)
+
+    return root
+
+
+def shutdown_logging():
+    """Drains and stops the background listener (flushes pending records)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -1,29 +1,44 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from backend.database import engine, Base
-from backend.routers import simulation, export
+from backend.database import engine
+from backend.routers import simulation, export, machines, telemetry
 from fastapi.middleware.cors import CORSMiddleware
+from backend.logging_config import setup_logging
+import logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        # Create tables, add missing indexes, set up partitions (idempotent)
+        from backend.migrations import migrate
+        await migrate(conn)
+        
+        # Backfill stats counters for databases created before the counters table
+        from backend.analytics.counters import ensure_counters
+        if await ensure_counters(conn):
+            logger.info("🔢 TELEMETRY COUNTERS REBUILT FROM EXISTING DATA")
+        
+        # Same for the per-minute / per-shift aggregates
+        from backend.analytics.aggregates import ensure_aggregates
+        if await ensure_aggregates(conn):
+            logger.info("🔢 TELEMETRY AGGREGATES REBUILT FROM EXISTING DATA")
     
-    # Initialize Default SimRun for Live View
-    from sqlalchemy import select
-    from backend.models import SimRun
+    # Initialize one SimRun per registered machine (ID=1 is the Live View)
     from backend.database import AsyncSessionLocal
+    from backend.state import registry, scheduler
+    from backend.routers.machines import ensure_sim_run
     
     async with AsyncSessionLocal() as session:
         async with session.begin():
-            result = await session.execute(select(SimRun).where(SimRun.id == 1))
-            run = result.scalar()
-            if not run:
-                print("🆕 INITIALIZING DEFAULT SIMULATION RUN (ID=1)")
-                new_run = SimRun(id=1, status="RUNNING", total_rows=0)
-                session.add(new_run)
-                await session.commit()
+            for machine_id in registry.ids():
+                await ensure_sim_run(session, machine_id)
     yield
+    
+    # Stop ticking machines before the loop goes away
+    await scheduler.stop()
 
 app = FastAPI(title="Induction Hardening Machine Simulator", lifespan=lifespan)
 
@@ -46,6 +61,8 @@ app.add_middleware(
 # Include Routers
 app.include_router(simulation.router)
 app.include_router(export.router)
+app.include_router(machines.router)
+app.include_router(telemetry.router)
 
 @app.get("/health")
 async def health_check():
@@ -0,0 +1,124 @@
+"""
+Schema Migrations
+There is no migration framework here: tables come from Base.metadata.create_all,
+which never touches a table that already exists. migrate() brings any database
+up to date in place and is safe to run on every startup.
+
+1. PostgreSQL, fresh database: telemetry is created RANGE-partitioned by
+   timestamp_sim (monthly partitions + a DEFAULT catch-all), so time-bounded
+   queries prune to the months they touch and old months can be dropped
+   wholesale. Existing unpartitioned tables are left as-is (converting means
+   copying every row; do that in a maintenance window).
+2. create_all for any table that doesn't exist yet.
+3. Every index declared on Telemetry is created if missing (older databases
+   only ever got idx_telemetry_timestamp).
+
+SQLite has no partitioning; there the (sim_run_id, timestamp_sim) composite
+index provides the same range narrowing.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import MetaData, PrimaryKeyConstraint, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex
+
+from backend.database import Base
+from backend.models import SimRun, Telemetry
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MONTHS_BACK = 1
+PARTITION_MONTHS_AHEAD = 12
+
+
+async def migrate(conn: AsyncConnection):
+    is_postgres = conn.dialect.name == "postgresql"
+
+    # 1. Partitioned telemetry (PostgreSQL, fresh DB only)
+    if is_postgres and not await conn.run_sync(_has_table, Telemetry.__tablename__):
+        await conn.run_sync(_create_partitioned_telemetry)
+        logger.info("🗂️ CREATED PARTITIONED TELEMETRY TABLE (RANGE timestamp_sim)")
+
+    # 2. Any missing tables
+    await conn.run_sync(Base.metadata.create_all)
+
+    # 3. Any missing indexes
+    created = await conn.run_sync(_create_missing_indexes)
+    if created:
+        logger.info("🗂️ CREATED TELEMETRY INDEXES: %s", ", ".join(created))
+
+    if is_postgres and await is_partitioned(conn):
+        await ensure_partitions(conn)
+
+
+def _has_table(sync_conn, name: str) -> bool:
+    return sync_conn.dialect.has_table(sync_conn, name)
+
+
+def _create_missing_indexes(sync_conn):
+    existing = {ix["name"] for ix in sync_conn.dialect.get_indexes(sync_conn, Telemetry.__tablename__)}
+    created = []
+    for index in sorted(Telemetry.__table__.indexes, key=lambda ix: ix.name):
+        if index.name not in existing:
+            # IF NOT EXISTS as well: reflection can miss indexes on partitioned parents
+            sync_conn.execute(CreateIndex(index, if_not_exists=True))
+            created.append(index.name)
+    return created
+
+
+def _create_partitioned_telemetry(sync_conn):
+    """
+    Builds a copy of the Telemetry table whose primary key includes the
+    partition key (PostgreSQL requires it), then creates it PARTITION BY RANGE.
+    The ORM keeps mapping `id` alone as the identity; ids stay unique (SERIAL).
+    """
+    metadata = MetaData()
+    SimRun.__table__.to_metadata(metadata)  # FK target
+    table = Telemetry.__table__.to_metadata(metadata)
+    table.c.id.autoincrement = True
+    table.c.timestamp_sim.primary_key = True
+    table.append_constraint(PrimaryKeyConstraint(table.c.id, table.c.timestamp_sim))
+    table.dialect_options["postgresql"]["partition_by"] = "RANGE (timestamp_sim)"
+    table.create(sync_conn)  # Indexes on the parent cascade to every partition
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    result = await conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :name"
+    ), {"name": Telemetry.__tablename__})
+    return result.first() is not None
+
+
+def _month_start(year: int, month: int) -> datetime:
+    year += (month - 1) // 12
+    month = (month - 1) % 12 + 1
+    return datetime(year, month, 1)
+
+
+async def ensure_partitions(conn: AsyncConnection, around: datetime = None,
+                            months_back: int = PARTITION_MONTHS_BACK,
+                            months_ahead: int = PARTITION_MONTHS_AHEAD):
+    """
+    Creates the DEFAULT partition and one partition per month around `around`
+    (default: now). Rows outside the range land in DEFAULT; a month whose
+    range already has rows in DEFAULT is skipped rather than failing startup.
+    """
+    around = around or datetime.now()
+    table = Telemetry.__tablename__
+    await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+
+    for offset in range(-months_back, months_ahead + 1):
+        lo = _month_start(around.year, around.month + offset)
+        hi = _month_start(lo.year, lo.month + 1)
+        name = f"{table}_p{lo:%Y_%m}"
+        try:
+            async with conn.begin_nested():
+                await conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{lo:%Y-%m-%d}') TO ('{hi:%Y-%m-%d}')"
+                ))
+        except Exception as e:
+            logger.warning("⚠️ PARTITION %s SKIPPED: %s", name, e)
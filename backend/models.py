@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Boolean, Index
+from sqlalchemy import Column, Integer, Float, String, Text, Date, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from backend.database import Base
 
@@ -57,6 +57,94 @@ class Telemetry(Base):
     
     sim_run = relationship("SimRun", back_populates="telemetry_logs")
 
+class TelemetryCounters(Base):
+    """
+    Running OK/NG/DOWN totals per run, maintained incrementally on every
+    Telemetry insert so /simulation/stats never has to scan the table.
+    """
+    __tablename__ = "telemetry_counters"
+
+    sim_run_id = Column(Integer, ForeignKey("sim_runs.id"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    ok_count = Column(Integer, nullable=False, default=0)  # no ng_reason, no downtime_reason
+    ng_count = Column(Integer, nullable=False, default=0)  # ng_reason, no downtime_reason
+    down_count = Column(Integer, nullable=False, default=0)  # downtime_reason
+
+class AggregateColumns:
+    """
+    Value columns shared by the per-minute and per-shift aggregates.
+    Sums cover OK parts only (the "normal" distribution the AI learns), so
+    mean = sum / ok_count and variance = sumsq / ok_count - mean^2.
+    """
+    total = Column(Integer, nullable=False, default=0)
+    ok_count = Column(Integer, nullable=False, default=0)
+    ng_count = Column(Integer, nullable=False, default=0)
+    down_count = Column(Integer, nullable=False, default=0)
+
+    power_sum = Column(Float, nullable=False, default=0.0)
+    power_sumsq = Column(Float, nullable=False, default=0.0)
+    flow_sum = Column(Float, nullable=False, default=0.0)
+    flow_sumsq = Column(Float, nullable=False, default=0.0)
+    pressure_sum = Column(Float, nullable=False, default=0.0)
+    pressure_sumsq = Column(Float, nullable=False, default=0.0)
+    temp_sum = Column(Float, nullable=False, default=0.0)
+    temp_sumsq = Column(Float, nullable=False, default=0.0)
+
+class TelemetryMinute(AggregateColumns, Base):
+    """Telemetry rolled up per run and minute (timestamp_sim truncated to the minute)."""
+    __tablename__ = "telemetry_minute"
+
+    sim_run_id = Column(Integer, ForeignKey("sim_runs.id"), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+
+class TelemetryShift(AggregateColumns, Base):
+    """Telemetry rolled up per run and shift. shift_date is the day the shift started (Shift_B runs overnight)."""
+    __tablename__ = "telemetry_shift"
+
+    sim_run_id = Column(Integer, ForeignKey("sim_runs.id"), primary_key=True)
+    shift_date = Column(Date, primary_key=True)
+    shift_id = Column(String, primary_key=True)
+
+class TelemetryReasonCount(Base):
+    """NG / DOWN occurrences per run, minute and reason."""
+    __tablename__ = "telemetry_reason_counts"
+
+    sim_run_id = Column(Integer, ForeignKey("sim_runs.id"), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    kind = Column(String, primary_key=True)  # NG, DOWN
+    reason = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class AIModelState(Base):
+    """
+    Checkpoint of an online-trained model (see backend/ai/trainer.py): the last
+    Telemetry id folded in plus its accumulators as JSON.
+    """
+    __tablename__ = "ai_model_state"
+
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    state = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
 # Optimizing for high-frequency time-series queries (Tech Stack Req)
 # Adding Index on timestamp_sim for dashboard polling
 Index("idx_telemetry_timestamp", Telemetry.timestamp_sim)
+
+# Export / per-machine queries: WHERE sim_run_id = ? AND timestamp_sim >= ? ORDER BY timestamp_sim
+Index("idx_telemetry_run_time", Telemetry.sim_run_id, Telemetry.timestamp_sim)
+
+# /telemetry keyset pages within a run: WHERE sim_run_id = ? AND id > ? ORDER BY id
+Index("idx_telemetry_run_id", Telemetry.sim_run_id, Telemetry.id)
+
+# /simulation/events: latest anomalies. Partial, so it only holds the (few) NG/DOWN rows.
+# Queries must use the same predicate (ANOMALY_FILTER) for the planner to pick it.
+ANOMALY_FILTER = Telemetry.is_anomaly == True
+Index("idx_telemetry_anomaly_time", Telemetry.timestamp_sim,
+      sqlite_where=ANOMALY_FILTER, postgresql_where=ANOMALY_FILTER)
+
+# Stats: NG / DOWN counts per run without scanning the OK rows
+Index("idx_telemetry_run_ng", Telemetry.sim_run_id,
+      sqlite_where=Telemetry.ng_reason.isnot(None), postgresql_where=Telemetry.ng_reason.isnot(None))
+Index("idx_telemetry_run_down", Telemetry.sim_run_id,
+      sqlite_where=Telemetry.downtime_reason.isnot(None), postgresql_where=Telemetry.downtime_reason.isnot(None))
@@ -0,0 +1,215 @@
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import get_db
+from backend.models import SimRun, Telemetry
+from backend.simulation.machine import MachineState
+from backend.state import registry, scheduler, persistence_layer
+from backend.routers.simulation import machine_stream
+from datetime import datetime
+from typing import List
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/machines",
+    tags=["machines"]
+)
+
+
+async def ensure_sim_run(db: AsyncSession, machine_id: int):
+    """Each machine writes into its own SimRun (id == machine id)."""
+    result = await db.execute(select(SimRun).where(SimRun.id == machine_id))
+    if not result.scalar():
+        logger.info("🆕 INITIALIZING SIMULATION RUN (ID=%s) FOR MACHINE #%s", machine_id, machine_id)
+        db.add(SimRun(id=machine_id, status="RUNNING", total_rows=0))
+
+
+def get_machine(machine_id: int) -> MachineState:
+    machine = registry.get(machine_id)
+    if machine is None:
+        raise HTTPException(status_code=404, detail=f"Machine {machine_id} is not registered")
+    return machine
+
+
+def publish_status(machine: MachineState):
+    """Pushes an out-of-tick snapshot (e.g. after Stop/Repair) to the machine's stream clients."""
+    machine.broadcaster.publish(machine.get_status())
+
+
+def machine_summary(machine_id: int, machine: MachineState) -> dict:
+    return {
+        "id": machine_id,
+        "state": machine.state,
+        "part_id": machine.current_part_id,
+        "ok_count": machine.ok_count,
+        "ng_count": machine.ng_count,
+        "coil_life": machine.coil_life_counter,
+        "downtime_reason": machine.downtime_reason if machine.state == MachineState.DOWN else None,
+    }
+
+
+@router.get("")
+async def list_machines():
+    """
+    Lists every registered machine with its state and counters.
+    """
+    return [machine_summary(machine_id, machine) for machine_id, machine in registry.items()]
+
+
+@router.get("/scheduler")
+async def get_scheduler_metrics():
+    """
+    Tick rate and per-tick cost of the shared scheduler (one task for all machines).
+    """
+    return scheduler.get_metrics()
+
+
+@router.post("/{machine_id}")
+async def register_machine(machine_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Adds a machine to the line (idempotent). It starts IDLE.
+    """
+    if machine_id < 1:
+        raise HTTPException(status_code=400, detail="Machine id must be >= 1")
+    await ensure_sim_run(db, machine_id)
+    await db.commit()
+    machine = registry.add(machine_id)
+    return machine_summary(machine_id, machine)
+
+
+@router.post("/{machine_id}/start")
+async def start_machine(machine_id: int):
+    """
+    Starts a LIVE production cycle on one machine.
+    """
+    machine = get_machine(machine_id)
+
+    # 1. Start the DB Worker (if not running)
+    if not persistence_layer.is_running:
+        asyncio.create_task(persistence_layer.start_worker())
+
+    # 2. Start Cycle & make sure the shared scheduler is ticking
+    machine.start_cycle()
+    publish_status(machine)
+    scheduler.ensure_running()
+
+    return {"message": f"Machine {machine_id} Started", "new_state": machine.state}
+
+
+@router.post("/{machine_id}/stop")
+async def stop_machine(machine_id: int):
+    """
+    Safely halts one machine (IDLE) but preserves counters/coil life.
+    """
+    machine = get_machine(machine_id)
+    machine.stop()
+    publish_status(machine)
+    return {"message": f"Machine {machine_id} Stopped", "new_state": machine.state}
+
+
+@router.post("/{machine_id}/repair")
+async def repair_machine(machine_id: int):
+    """
+    Fixes one machine (clears drift/faults) without resetting counters.
+    """
+    machine = get_machine(machine_id)
+    machine.repair()
+    publish_status(machine)
+    return {"message": f"Machine {machine_id} Repaired", "new_state": machine.state}
+
+
+@router.post("/{machine_id}/inject-fault")
+async def inject_machine_fault(machine_id: int, type: str = None):
+    """
+    Manually triggers a breakdown on one machine.
+    type: Optional specific fault (hose_burst, power_surge, etc)
+    """
+    machine = get_machine(machine_id)
+    machine.inject_fault(fault_type=type)
+    publish_status(machine)
+    return {"message": f"Fault injected on machine {machine_id}: {type or 'Random'}", "new_state": machine.state}
+
+
+@router.post("/{machine_id}/reset")
+async def reset_machine(machine_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    HARD RESET of one machine: IDLE state, counters cleared and its own
+    telemetry (sim_run_id == machine id) deleted. Other machines are untouched.
+    """
+    from backend.analytics.counters import reset_counters
+    from backend.analytics.aggregates import reset_aggregates
+    from backend.ai.trainer import reset_model_state
+    from backend.analytics.rollup import rollup_cache
+
+    machine = get_machine(machine_id)
+    machine.reset()
+    publish_status(machine)
+
+    await db.execute(delete(Telemetry).where(Telemetry.sim_run_id == machine_id))
+    await reset_counters(db, sim_run_id=machine_id)
+    await reset_aggregates(db, sim_run_id=machine_id)
+    await reset_model_state(db)
+    rollup_cache.clear()
+
+    result = await db.execute(select(SimRun).where(SimRun.id == machine_id))
+    sim_run = result.scalars().first()
+    if sim_run:
+        sim_run.session_start_time = datetime.now() # Use Local System Time (matches UI)
+        sim_run.total_rows = 0
+    await db.commit()
+
+    return {"message": f"Machine {machine_id} HARD RESET", "new_state": machine.state}
+
+
+@router.get("/{machine_id}/status")
+async def get_machine_status(machine_id: int):
+    """
+    Returns the current live status of one machine (same shape as /simulation/status).
+    """
+    return get_machine(machine_id).get_status()
+
+
+@router.get("/{machine_id}/rules")
+async def get_machine_rules(machine_id: int):
+    """
+    The rule table this machine is graded with (its own recipe, or the shared one).
+    """
+    failure_manager = get_machine(machine_id).failure_manager
+    return {"override": failure_manager.rules_override is not None, **failure_manager.rules.describe()}
+
+
+@router.put("/{machine_id}/rules")
+async def set_machine_rules(machine_id: int, rules: List[dict] = Body(...)):
+    """
+    Gives one machine its own rule table (per-line recipe), live from the next tick.
+    """
+    from backend.simulation.rules import RuleSet
+    machine = get_machine(machine_id)
+    try:
+        machine.failure_manager.rules_override = RuleSet(rules, source=f"machine {machine_id}")
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rule table: {e}")
+    machine.risk.set_limits(machine.failure_manager.SAFETY_LIMITS)
+    return {"override": True, **machine.failure_manager.rules.describe()}
+
+
+@router.delete("/{machine_id}/rules")
+async def clear_machine_rules(machine_id: int):
+    """
+    Drops the machine's own recipe; it follows the shared rule table again.
+    """
+    machine = get_machine(machine_id)
+    machine.failure_manager.rules_override = None
+    machine.risk.set_limits(machine.failure_manager.SAFETY_LIMITS)
+    return {"override": False, **machine.failure_manager.rules.describe()}
+
+
+@router.get("/{machine_id}/stream")
+async def stream_machine_status(machine_id: int, request: Request):
+    """
+    Server-Sent Events stream of one machine's live snapshots.
+    """
+    return machine_stream(request, get_machine(machine_id))
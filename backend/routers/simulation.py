@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Body, Depends, BackgroundTasks, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.database import get_db
 from backend.simulation.generator import SimulationGenerator
 from backend.simulation.machine import MachineState
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/simulation",
@@ -10,83 +14,37 @@ router = APIRouter(
 )
 
 # Import Singleton State
-from backend.state import active_machine, persistence_layer 
+from backend.state import active_machine, persistence_layer, broadcaster, scheduler, registry
+from backend.simulation.broadcaster import encode_snapshot
 
 import asyncio
-import threading
-import time
+
+# Seconds without a frame before a keep-alive comment is sent on /stream
+STREAM_KEEPALIVE = 15.0
+
+
+def publish_status():
+    """Pushes an out-of-tick snapshot (e.g. after Stop/Repair) to stream clients."""
+    broadcaster.publish(active_machine.get_status())
 
 @router.post("/start")
 async def start_simulation(db: AsyncSession = Depends(get_db)): # Removed BackgroundTasks arg
     """
-    Starts a LIVE simulation cycle (Real-time).
+    Starts a LIVE simulation cycle (Real-time) on machine #1.
     """
-    if active_machine.state != "IDLE":
-        # Force restart behavior might be safer or just return running
-        pass
-    
     # 1. Start the DB Worker (if not running)
     if not persistence_layer.is_running:
         asyncio.create_task(persistence_layer.start_worker())
     
     # 2. Start Cycle
-    print(f"🆔 START ENDPOINT MACHINE ID: {id(active_machine)}", flush=True)
     active_machine.start_cycle()
+    publish_status()
     
-    # 3. Launch Simulation Loop (Robust)
-    sim_thread = threading.Thread(target=run_live_simulation_thread, daemon=True)
-    sim_thread.start()
+    # 3. Make sure the shared scheduler is ticking (one task for ALL machines)
+    scheduler.ensure_running()
     
     return {"message": "Live Simulation Started", "mode": "REAL_TIME"}
 
-def run_live_simulation_thread():
-    """
-    Ticks the machine every 0.2 seconds (5Hz).
-    Running in a THREAD allows it to survive past the HTTP request.
-    """
-    print("🚀 LIVE SIMULATION THREAD STARTED", flush=True)
-    print(f"🆔 THREAD MACHINE ID: {id(active_machine)}", flush=True)
-    try:
-        while active_machine.state != "IDLE" and active_machine.state != "DOWN":
-            # PAUSE if Fast Forward is running
-            if active_machine.is_fast_forwarding:
-                time.sleep(0.1)  # Wait for FF to complete
-                continue
-            
-            active_machine.update()
-            time.sleep(0.2) # Sync sleep in thread
-        
-        print(f"🏁 LIVE SIMULATION ENDED. State: {active_machine.state}", flush=True)
-        
-    except Exception as e:
-        import traceback
-        print(f"❌ CRITICAL SIMULATION CRASH: {e}", flush=True)
-        traceback.print_exc()
-        active_machine.transition_to("DOWN") # Safe Fallback
-    
-    finally:
-        # This part needs to be async, but we are in a sync thread.
-        # We need to run it in the event loop.
-        # A common pattern is to get the event loop and run the async function.
-        # However, for a simple stop_worker, if it's just setting a flag, it might be okay.
-        # If it involves actual async I/O, it needs to be awaited in an async context.
-        # For now, assuming persistence_layer.stop_worker() can be called from a thread
-        # or that it internally handles its async nature (e.g., by scheduling on the event loop).
-        # A more robust solution would involve a queue or a dedicated async thread executor.
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                loop.call_soon_threadsafe(lambda: asyncio.create_task(persistence_layer.stop_worker()))
-            else:
-                # If the event loop is not running (e.g., app shutdown),
-                # we might not be able to stop it cleanly.
-                # For simplicity, we'll just call it directly if no loop is running,
-                # assuming it's safe or will be handled by app shutdown.
-                asyncio.run(persistence_layer.stop_worker())
-        except RuntimeError:
-            # No running event loop, try to run it directly if possible
-            asyncio.run(persistence_layer.stop_worker())
-
 
 @router.post("/reset")
 async def reset_simulation(db: AsyncSession = Depends(get_db)):
@@ -98,14 +56,23 @@ async def reset_simulation(db: AsyncSession = Depends(get_db)):
     """
     from datetime import datetime
     from backend.models import SimRun, Telemetry
+    from backend.analytics.counters import reset_counters
+    from backend.analytics.aggregates import reset_aggregates
+    from backend.ai.trainer import reset_model_state
+    from backend.analytics.rollup import rollup_cache
     from sqlalchemy import select, delete
     
     # 1. Reset Machine Logic
     active_machine.reset()
+    publish_status()
     
     # 2. Clear Database (Telemetry)
     # Using `delete` instead of `truncate` for cross-db compatibility (SQLite doesn't support truncate)
     await db.execute(delete(Telemetry))
+    await reset_counters(db)
+    await reset_aggregates(db)
+    await reset_model_state(db)
+    rollup_cache.clear()
     
     # 3. Reset SimRun Stats
     result = await db.execute(select(SimRun).where(SimRun.id == 1))
@@ -114,7 +81,7 @@ async def reset_simulation(db: AsyncSession = Depends(get_db)):
         sim_run.session_start_time = datetime.now() # Use Local System Time (matches UI)
         sim_run.total_rows = 0 # Reset counter
         await db.commit()
-        print(f"🧹 DATABASE CLEARED. Session start time updated for run_id=1")
+        logger.info("🧹 DATABASE CLEARED. Session start time updated for run_id=1")
     
     return {"message": "Machine HARD RESET: Database cleared.", "new_state": active_machine.state}
 
@@ -124,6 +91,7 @@ async def stop_simulation():
     Safely halts the machine (IDLE) but preserves counters/coil life.
     """
     active_machine.stop()
+    publish_status()
     return {"message": "Machine Stopped", "new_state": active_machine.state}
 
 @router.post("/manual-control")
@@ -140,7 +108,7 @@ async def manual_control(enabled: bool, temp_limit: float = 1000.0, flow_target:
         "flow_target": flow_target
     }
     mode = "MANUAL" if enabled else "AUTO"
-    print(f"🎛️ MANUAL CONTROL: {mode} | Temp<={temp_limit} | Flow~={flow_target}")
+    logger.info("🎛️ MANUAL CONTROL: %s | Temp<=%s | Flow~=%s", mode, temp_limit, flow_target)
     return {"message": f"Manual Mode set to {mode}", "limits": active_machine.manual_limits}
 
 @router.post("/inject-fault")
@@ -150,6 +118,7 @@ async def inject_fault(type: str = None):
     type: Optional specific fault (hose_burst, power_surge, etc)
     """
     active_machine.inject_fault(fault_type=type)
+    publish_status()
     return {"message": f"Fault injected: {type or 'Random'}", "new_state": active_machine.state}
 
 @router.post("/repair")
@@ -158,6 +127,7 @@ async def repair_simulation():
     Fixes the machine (clears drift/faults) without resetting counters.
     """
     active_machine.repair()
+    publish_status()
     return {"message": "Machine Repaired", "new_state": active_machine.state}
 
 @router.post("/start-drift-test")
@@ -200,12 +170,65 @@ async def get_status():
     return active_machine.get_status()
 
 
+@router.get("/stream")
+async def stream_status(request: Request):
+    """
+    Server-Sent Events stream of live machine snapshots (same payload as /status).
+    Each tick is pushed once by the simulation loop; slow clients drop their
+    oldest frames rather than building up a backlog.
+    """
+    return machine_stream(request, active_machine)
+
+
+def machine_stream(request: Request, machine: MachineState) -> StreamingResponse:
+    """SSE response for one machine's broadcaster (shared with /machines/{id}/stream)."""
+    sub = machine.broadcaster.subscribe()
+    # Send the current state immediately so the client doesn't wait for the next tick
+    sub.offer(encode_snapshot(machine.get_status()))
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    payload = await asyncio.wait_for(sub.queue.get(), timeout=STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {payload}\n\n"
+        finally:
+            machine.broadcaster.unsubscribe(sub)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/persistence/metrics")
+async def get_persistence_metrics():
+    """
+    Returns DB write worker metrics: queue depth, batch sizes, commit latency.
+    """
+    return persistence_layer.get_metrics()
+
+
 # === FAST FORWARD ENDPOINTS ===
 
-from backend.simulation.fast_forward import simulate_day, get_last_timestamp
+from backend.simulation.fast_forward import simulate_day, simulate_days, get_last_timestamp, CYCLE_TIME_SECONDS
+from datetime import datetime, timedelta
+from typing import List, Optional
+import os
+
+# Leave one core for the API / live simulation thread
+MAX_FF_WORKERS = max(1, (os.cpu_count() or 2) - 1)
 
 @router.post("/fast-forward/day")
-async def fast_forward_one_day():
+async def fast_forward_one_day(
+    seed: Optional[int] = Query(None, description="Seed for reproducible output (random if omitted)")
+):
     """
     Simulate one full day of production data (~7,500 parts).
     Appends to existing data. Can be called multiple times to stack days.
@@ -218,16 +241,16 @@ async def fast_forward_one_day():
 
     try:
         # LOCK the live machine so it doesn't produce data mid-calculation
-        print(f"🆔 FF ENDPOINT MACHINE ID: {id(active_machine)}", flush=True)
-        print(f"🚦 FF: Setting flag=True | Current OK={active_machine.ok_count}", flush=True)
+        logger.debug("🆔 FF ENDPOINT MACHINE ID: %s", id(active_machine))
+        logger.debug("🚦 FF: Setting flag=True | Current OK=%s", active_machine.ok_count)
         active_machine.is_fast_forwarding = True
         
         # Wait a tick to let any current live loop finish
-        print("🚦 FF: Waiting 0.5s for thread to pause...", flush=True)
+        logger.debug("🚦 FF: Waiting 0.5s for thread to pause...")
         await asyncio.sleep(0.5)
         
         # Flush pending Live data to ensure clean cutoff
-        print("🚦 FF: Flushing persistence queue...", flush=True)
+        logger.debug("🚦 FF: Flushing persistence queue...")
         await persistence_layer.flush()
         
         # 2. Get Start Time
@@ -241,12 +264,14 @@ async def fast_forward_one_day():
             start_time = datetime.now()
         
         # 3. Run Simulation - Pass MACHINE counters as source of truth
-        print(f"🚦 FF: Passing machine counters to simulate_day: OK={active_machine.ok_count}, NG={active_machine.ng_count}, Coil={active_machine.coil_life_counter}", flush=True)
+        logger.debug("🚦 FF: Passing machine counters to simulate_day: OK=%s, NG=%s, Coil=%s",
+                     active_machine.ok_count, active_machine.ng_count, active_machine.coil_life_counter)
         result = await simulate_day(
             start_time,
             initial_ok=active_machine.ok_count,
             initial_ng=active_machine.ng_count,
-            initial_coil_life=active_machine.coil_life_counter
+            initial_coil_life=active_machine.coil_life_counter,
+            seed=seed
         )
         
         # Store debug info BEFORE sync
@@ -266,14 +291,14 @@ async def fast_forward_one_day():
         
         # 4. SYNC COUNTERS (The Fix)
         # Update the live machine with the new totals from the simulation run
-        print(f"🔁 FF RESULT: ok={result['ok']}, ng={result['ng']}, coil={result['coil_life']}", flush=True)
-        print(f"🔁 BEFORE SYNC: machine.ok={active_machine.ok_count}, ng={active_machine.ng_count}", flush=True)
+        logger.info("🔁 FF RESULT: ok=%s, ng=%s, coil=%s", result['ok'], result['ng'], result['coil_life'])
+        logger.debug("🔁 BEFORE SYNC: machine.ok=%s, ng=%s", active_machine.ok_count, active_machine.ng_count)
         active_machine.force_sync_counters(
             result['ok'], 
             result['ng'], 
             result['coil_life']
         )
-        print(f"🔁 AFTER SYNC: machine.ok={active_machine.ok_count}, ng={active_machine.ng_count}", flush=True)
+        logger.debug("🔁 AFTER SYNC: machine.ok=%s, ng=%s", active_machine.ok_count, active_machine.ng_count)
         
         # Update debug info AFTER sync
         _last_ff_debug["machine_after_sync"] = {
@@ -295,6 +320,56 @@ async def fast_forward_one_day():
         # UNLOCK: Allow live simulation to resume
         active_machine.is_fast_forwarding = False
 
+
+@router.post("/fast-forward")
+async def fast_forward_days(
+    days: int = Query(1, ge=1, le=366, description="Number of days to simulate"),
+    workers: int = Query(1, ge=1, le=MAX_FF_WORKERS, description="Worker processes generating days in parallel"),
+    seed: Optional[int] = Query(None, description="Base seed for reproducible output (random if omitted)")
+):
+    """
+    Simulate N days of production data, split across a process pool.
+    Counters (OK/NG/coil life) continue seamlessly from the live machine and
+    across days; rows are inserted in chronological order.
+    """
+    if active_machine.is_fast_forwarding:
+        raise HTTPException(status_code=409, detail="Fast Forward already in progress. Please wait.")
+
+    try:
+        # LOCK the live machine so it doesn't produce data mid-calculation
+        active_machine.is_fast_forwarding = True
+        await asyncio.sleep(0.5)
+        await persistence_layer.flush()
+
+        last_ts = await get_last_timestamp()
+        start_time = last_ts + timedelta(seconds=CYCLE_TIME_SECONDS) if last_ts else datetime.now()
+
+        result = await simulate_days(
+            days,
+            workers=workers,
+            start_time=start_time,
+            initial_ok=active_machine.ok_count,
+            initial_ng=active_machine.ng_count,
+            initial_coil_life=active_machine.coil_life_counter,
+            seed=seed
+        )
+
+        active_machine.force_sync_counters(result['ok'], result['ng'], result['coil_life'])
+
+        return {
+            "message": f"Fast Forward Complete: {days} Day(s) Simulated",
+            "stats": result
+        }
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    finally:
+        # UNLOCK: Allow live simulation to resume
+        active_machine.is_fast_forwarding = False
+
 # Store last FF debug info for API access
 _last_ff_debug = {}
 
@@ -312,12 +387,58 @@ async def get_ff_debug():
     }
 
 @router.post("/predict")
-async def predict_failure(data: dict):
+async def predict_failure(data: Optional[dict] = None):
     """
-    Mock AI prediction endpoint to prevent 404s.
-    Returns a dummy risk score.
+    Live AI prediction for machine #1 from the online risk scorer:
+    risk_score (0-1), status (OK / WARNING / CRITICAL), the signal driving it,
+    and the projected seconds until it crosses its safety limit.
     """
-    return {"risk_score": 0.05, "status": "HEALTHY"}
+    return active_machine.risk.snapshot()
+
+
+def refresh_risk_limits():
+    """Points every machine's risk scorer at its (possibly new) safety limits."""
+    for _, machine in registry.items():
+        machine.risk.set_limits(machine.failure_manager.SAFETY_LIMITS)
+
+
+@router.get("/rules")
+async def get_failure_rules():
+    """
+    The shared FailureManager rule table (machines without their own recipe follow it).
+    """
+    from backend.simulation.rules import get_active_rules
+    return get_active_rules().describe()
+
+
+@router.put("/rules")
+async def replace_failure_rules(rules: List[dict] = Body(...)):
+    """
+    Hot-swaps the shared rule table: validated, compiled and live from the
+    next tick, no restart. In memory only (edit failure_rules.json to keep it).
+    """
+    from backend.simulation.rules import RuleSet, set_active_rules
+    try:
+        ruleset = RuleSet(rules, source="api")
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rule table: {e}")
+    set_active_rules(ruleset)
+    refresh_risk_limits()
+    return ruleset.describe()
+
+
+@router.post("/rules/reload")
+async def reload_failure_rules():
+    """
+    Re-reads the rule file (failure_rules.json or $FAILURE_RULES_PATH) and activates it.
+    """
+    from backend.simulation.rules import reload_rules
+    try:
+        ruleset = reload_rules()
+    except (OSError, ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not load rule file: {e}")
+    refresh_risk_limits()
+    return ruleset.describe()
 
 
 @router.get("/fast-forward/record-count")
@@ -342,53 +463,25 @@ async def get_db_stats():
     """
     Returns production statistics from the database.
     Use this for accurate totals after Fast Forward.
+    
+    Served from the incrementally maintained telemetry_counters table
+    (updated on every insert), so the cost doesn't grow with telemetry size.
     """
-    from sqlalchemy import select, func
-    from backend.models import Telemetry
+    from backend.analytics.counters import read_totals
     
     async with AsyncSessionLocal() as session:
-        # Total records
-        total_result = await session.execute(
-            select(func.count(Telemetry.id))
-        )
-        total = total_result.scalar() or 0
-        
-        # OK count (no ng_reason and no downtime_reason)
-        ok_result = await session.execute(
-            select(func.count(Telemetry.id)).where(
-                Telemetry.ng_reason.is_(None),
-                Telemetry.downtime_reason.is_(None)
-            )
-        )
-        ok_count = ok_result.scalar() or 0
-        
-        # NG count (has ng_reason but no downtime_reason)
-        ng_result = await session.execute(
-            select(func.count(Telemetry.id)).where(
-                Telemetry.ng_reason.isnot(None),
-                Telemetry.downtime_reason.is_(None)
-            )
-        )
-        ng_count = ng_result.scalar() or 0
-        
-        # DOWN count (has downtime_reason)
-        down_result = await session.execute(
-            select(func.count(Telemetry.id)).where(
-                Telemetry.downtime_reason.isnot(None)
-            )
-        )
-        down_count = down_result.scalar() or 0
+        totals = await read_totals(session)
     
     return {
-        "total": total,
-        "ok_count": ok_count,
-        "ng_count": ng_count,
-        "down_count": down_count
+        "total": totals['total'],
+        "ok_count": totals['ok_count'],
+        "ng_count": totals['ng_count'],
+        "down_count": totals['down_count']
     }
 
 
 @router.post("/fast-forward/ai")
-async def fast_forward_ai(days: int = 7):
+async def fast_forward_ai(days: int = 7, seed: Optional[int] = None):
     """
     Simulates N DAYS of production using Statistical AI.
     Learns from existing data in DB to model patterns.
@@ -406,7 +499,7 @@ async def fast_forward_ai(days: int = 7):
     
     async with AsyncSessionLocal() as session:
         # Pass session for training AND inserting
-        result = await ai.predict_week(session, start_time, days=days)
+        result = await ai.predict_week(session, start_time, days=days, seed=seed)
         
     return {
         "message": f"AI Prediction Complete: {days} Days Generated",
@@ -414,23 +507,46 @@ async def fast_forward_ai(days: int = 7):
     }
 
 
+@router.post("/ai/train")
+async def train_ai(full: bool = False):
+    """
+    Updates the online AI model with telemetry written since its last
+    checkpoint (full=true rescans the entire history) and returns what it learned:
+    parameter stats, the sequential OK/NG/DOWN transition matrix and run lengths.
+    """
+    from backend.ai.prediction import ProductionAI
+    import time
+    
+    ai = ProductionAI()
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        trained = await ai.train_model(session, full=full)
+    
+    return {
+        "trained": trained,
+        "rows_read": ai.trained_rows,
+        "seconds": round(time.perf_counter() - start, 3),
+        "stats": ai.stats,
+        "transition_matrix": ai.transition_matrix,
+        "transitions_counted": ai.markov.total_transitions if ai.markov else 0,
+        "run_lengths": ai.markov.run_length_summary() if ai.markov else {}
+    }
+
+
 @router.get("/events")
 async def get_db_events():
     """
     Returns the last 10 NG or DOWN events from the database.
     """
-    from sqlalchemy import select, or_
-    from backend.models import Telemetry
+    from sqlalchemy import select
+    from backend.models import Telemetry, ANOMALY_FILTER
     
+    # Every writer flags NG and DOWN rows with is_anomaly, so this one predicate
+    # covers both and matches the partial index idx_telemetry_anomaly_time
     async with AsyncSessionLocal() as session:
         result = await session.execute(
-            select(Telemetry).where(
-                or_(
-                    Telemetry.state == 'NG',
-                    Telemetry.state == 'DOWN',
-                    Telemetry.is_anomaly == True
-                )
-            ).order_by(Telemetry.timestamp_sim.desc()).limit(10)
+            select(Telemetry).where(ANOMALY_FILTER)
+            .order_by(Telemetry.timestamp_sim.desc()).limit(10)
         )
         events = result.scalars().all()
         
@@ -0,0 +1,219 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import get_db
+from backend.models import Telemetry
+from datetime import datetime
+from typing import List, Optional
+import json
+
+router = APIRouter(
+    prefix="/telemetry",
+    tags=["telemetry"]
+)
+
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10_000
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Field projection: comma-separated Telemetry column names (default: all).
+    `id` is always returned first since it is the pagination cursor.
+    """
+    table_columns = Telemetry.__table__.columns
+    if not fields:
+        return list(table_columns.keys())
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in table_columns]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown)}. Valid: {', '.join(table_columns.keys())}"
+        )
+    return ["id"] + [name for name in dict.fromkeys(names) if name != "id"]
+
+
+def _encode_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+@router.get("")
+async def read_telemetry(
+    request: Request,
+    run_id: Optional[int] = Query(None, description="Only rows of this SimRun"),
+    after_id: int = Query(0, ge=0, description="Cursor: return rows with id > after_id (use next_after_id from the previous page)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (default: all)"),
+    state: Optional[str] = Query(None, description="Machine state, e.g. COMPLETED or DOWN"),
+    from_time: Optional[datetime] = Query(None, alias="from", description="timestamp_sim >= from"),
+    to_time: Optional[datetime] = Query(None, alias="to", description="timestamp_sim < to"),
+    format: Optional[str] = Query(None, pattern="^(json|msgpack)$", description="json (default) or msgpack; also honours Accept: application/msgpack"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Pages through Telemetry history with a keyset cursor on id.
+
+    Each page is `WHERE id > after_id ORDER BY id LIMIT limit`, so page N costs
+    the same as page 1 (no OFFSET scan). Rows are returned as compact arrays
+    in `fields` order: {"fields": [...], "rows": [[...], ...], "next_after_id": id | null}.
+    next_after_id is null on the last page.
+    """
+    names = parse_fields(fields)
+    use_msgpack = format == "msgpack" or (format is None and MSGPACK_MEDIA_TYPE in request.headers.get("accept", ""))
+    if use_msgpack:
+        try:
+            import msgpack
+        except ImportError:
+            raise HTTPException(status_code=500, detail="msgpack not installed. Run: pip install msgpack")
+
+    # 1. Keyset Query (plain column tuples)
+    table_columns = Telemetry.__table__.columns
+    query = select(*(table_columns[name] for name in names)).where(Telemetry.id > after_id)
+    if run_id is not None:
+        query = query.where(Telemetry.sim_run_id == run_id)
+    if state:
+        query = query.where(Telemetry.state == state)
+    if from_time:
+        query = query.where(Telemetry.timestamp_sim >= from_time)
+    if to_time:
+        query = query.where(Telemetry.timestamp_sim < to_time)
+    query = query.order_by(Telemetry.id).limit(limit)
+
+    result = await db.execute(query)
+    rows = [[_encode_value(v) for v in row] for row in result.all()]
+
+    # 2. Cursor for the next page (a short page means we reached the end)
+    next_after_id = rows[-1][0] if len(rows) == limit else None
+    body = {"fields": names, "rows": rows, "count": len(rows), "next_after_id": next_after_id}
+
+    # 3. Encode
+    if use_msgpack:
+        return Response(content=msgpack.packb(body, use_bin_type=True), media_type=MSGPACK_MEDIA_TYPE)
+    return Response(content=json.dumps(body, separators=(",", ":")), media_type="application/json")
+
+
+@router.get("/rollup")
+async def read_rollup(
+    bucket: str = Query("5m", pattern="^(1m|5m|1h)$"),
+    metrics: Optional[str] = Query(None, description="Comma-separated numeric columns (default: part_temp, induction_power, quench_water_flow, quench_pressure)"),
+    run_id: Optional[int] = Query(None),
+    from_time: Optional[datetime] = Query(None, alias="from"),
+    to_time: Optional[datetime] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Time-bucketed min/max/mean/count per metric, computed in SQL (one GROUP BY).
+    Returns chart-ready arrays: {"t": [...], "count": [...], "<metric>": {"min": [...], "max": [...], "mean": [...]}}.
+    Cached per (run, bucket, range, metrics).
+    """
+    from backend.analytics.rollup import rollup_cache, rollup_query, columnar_rollup, parse_metrics
+
+    try:
+        names = parse_metrics(metrics)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    key = ("rollup", run_id, bucket, from_time, to_time, tuple(names))
+    cached = rollup_cache.get(key)
+    if cached is None:
+        connection = await db.connection()
+        query = rollup_query(connection.dialect.name, bucket, names, run_id, from_time, to_time)
+        rows = (await db.execute(query)).all()
+        cached = json.dumps(
+            {"bucket": bucket, "metrics": names, **columnar_rollup(rows, names)},
+            separators=(",", ":")
+        )
+        rollup_cache.put(key, cached, rollup_cache.ttl_for(to_time))
+    return Response(content=cached, media_type="application/json")
+
+
+@router.get("/downsample")
+async def read_downsampled(
+    metric: str = Query("part_temp"),
+    points: int = Query(1000, ge=3, le=20_000, description="Target number of points"),
+    run_id: Optional[int] = Query(None),
+    from_time: Optional[datetime] = Query(None, alias="from"),
+    to_time: Optional[datetime] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Raw (timestamp, value) series reduced to `points` with LTTB, which keeps
+    spikes and dips that bucket means would flatten. {"t": [...], "<metric>": [...]}
+    """
+    import numpy as np
+    from backend.analytics.rollup import rollup_cache, apply_range, lttb, parse_metrics
+
+    try:
+        name = parse_metrics(metric)[0]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    key = ("lttb", run_id, name, points, from_time, to_time)
+    cached = rollup_cache.get(key)
+    if cached is None:
+        column = Telemetry.__table__.c[name]
+        query = apply_range(
+            select(Telemetry.timestamp_sim, column).where(column.isnot(None)),
+            run_id, from_time, to_time
+        ).order_by(Telemetry.timestamp_sim)
+
+        # Stream the raw series into flat arrays (no ORM objects, no per-row dicts)
+        stamps, values = [], []
+        result = await db.stream(query.execution_options(yield_per=50_000))
+        async for chunk in result.partitions(50_000):
+            for ts, value in chunk:
+                stamps.append(ts)
+                values.append(value)
+
+        x = np.array([ts.timestamp() for ts in stamps], dtype=float)
+        y = np.array(values, dtype=float)
+        kept = lttb(x, y, points)
+        cached = json.dumps({
+            "metric": name,
+            "raw_points": len(values),
+            "t": [stamps[i].isoformat() for i in kept],
+            name: [values[i] for i in kept],
+        }, separators=(",", ":"))
+        rollup_cache.put(key, cached, rollup_cache.ttl_for(to_time))
+    return Response(content=cached, media_type="application/json")
+
+
+@router.get("/aggregates")
+async def read_aggregates(
+    grain: str = Query("minute", pattern="^(minute|shift)$"),
+    run_id: Optional[int] = Query(None, description="Only this SimRun (default: summed across runs)"),
+    from_time: Optional[datetime] = Query(None, alias="from"),
+    to_time: Optional[datetime] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Per-minute or per-shift OK/NG/DOWN counts, OK-part mean/stdev per metric
+    and NG/DOWN reason totals, read from the aggregate tables maintained on
+    insert (no Telemetry scan).
+    """
+    from backend.analytics.aggregates import (
+        METRICS, COUNT_FIELDS, VALUE_FIELDS, metric_stats, read_range_totals, read_reason_counts
+    )
+
+    keys, rows = await read_range_totals(db, grain, run_id, from_time, to_time)
+    out = {k: [] for k in keys}
+    out.update({f: [] for f in COUNT_FIELDS})
+    out.update({m: {"mean": [], "stdev": []} for m in METRICS})
+    for row in rows:
+        for i, k in enumerate(keys):
+            out[k].append(_encode_value(row[i]) if k != "shift_date" else row[i].isoformat())
+        totals = dict(zip(VALUE_FIELDS, row[len(keys):]))
+        for f in COUNT_FIELDS:
+            out[f].append(int(totals[f]))
+        stats = metric_stats(totals)
+        for m in METRICS:
+            stat = stats.get(m)
+            out[m]["mean"].append(round(stat["mean"], 4) if stat else None)
+            out[m]["stdev"].append(round(stat["stdev"], 4) if stat else None)
+
+    reasons = await read_reason_counts(db, run_id, from_time, to_time)
+    body = {"grain": grain, **out, "reasons": reasons}
+    return Response(content=json.dumps(body, separators=(",", ":")), media_type="application/json")
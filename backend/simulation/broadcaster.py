@@ -0,0 +1,98 @@
+"""
+Telemetry Broadcaster
+Fan-out of per-tick machine snapshots to streaming clients (/simulation/stream).
+
+The simulation thread publishes each tick's snapshot exactly once. The
+snapshot is serialized once on the event loop and the same payload is handed
+to every subscriber. Each subscriber has its own bounded queue: a slow client
+loses its oldest frames (drop-oldest) instead of stalling the tick loop or
+the other clients.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CLIENT_QUEUE = 25  # ~5 s of frames at 5 Hz
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_snapshot(snapshot: Dict) -> str:
+    return json.dumps(snapshot, default=_json_default, separators=(",", ":"))
+
+
+class Subscription:
+    """One connected client: a bounded queue of encoded frames."""
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, payload: str):
+        if self.queue.full():
+            # Backpressure: discard the oldest frame, keep the newest
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(payload)
+
+
+class TelemetryBroadcaster:
+    """
+    Thread-safe publisher -> asyncio fan-out.
+    publish() may be called from any thread; delivery happens on the loop.
+    """
+
+    def __init__(self, client_queue_size: int = DEFAULT_CLIENT_QUEUE):
+        self.client_queue_size = client_queue_size
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        # Subscribing always happens on the serving loop, so capture it here
+        self._loop = asyncio.get_running_loop()
+        sub = Subscription(self.client_queue_size)
+        self._subscribers.add(sub)
+        logger.info("📡 STREAM CLIENT CONNECTED (%s active)", len(self._subscribers))
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        self._subscribers.discard(sub)
+        logger.info("📡 STREAM CLIENT DISCONNECTED (%s active, %s frames dropped)",
+                    len(self._subscribers), sub.dropped)
+
+    def publish(self, snapshot: Dict):
+        """Called once per tick by the producer (usually the simulation thread)."""
+        loop = self._loop
+        if loop is None or not self._subscribers or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._fan_out, snapshot)
+        except RuntimeError:
+            # Loop shut down between the check and the call
+            pass
+
+    def _fan_out(self, snapshot: Dict):
+        payload = encode_snapshot(snapshot)
+        self.published += 1
+        for sub in list(self._subscribers):
+            sub.offer(payload)
+
+    def get_metrics(self) -> Dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": sum(s.dropped for s in self._subscribers),
+        }
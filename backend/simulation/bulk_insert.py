@@ -0,0 +1,177 @@
+"""
+Bulk Telemetry Insert
+Streaming, chunked Core inserts shared by every high-volume write path
+(live persistence worker, fast forward, AI prediction).
+
+Rows are plain dicts keyed by Telemetry column name. They are consumed lazily
+from any iterable and written `chunk_size` at a time with one prepared
+executemany per chunk, so callers can generate days of data without ever
+materializing it. On SQLite an optional fast path skips SQLAlchemy's per-row
+bind processing and hands positional tuples straight to the DBAPI cursor.
+
+insert_telemetry_columns() is the columnar variant for vectorized generators:
+it takes whole NumPy arrays per column and never builds per-row dicts for
+the insert itself.
+
+Each chunk also updates the TelemetryCounters totals and the per-minute /
+per-shift aggregates (backend.analytics.aggregates) in the same transaction.
+"""
+
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Union
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from backend.analytics.aggregates import SOURCE_COLUMNS, add_rows_to_aggregates
+from backend.analytics.counters import add_rows_to_counters
+from backend.models import Telemetry
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Insertable columns in table order (the autoincrement PK is left to the DB)
+TELEMETRY_COLUMNS = [c.name for c in Telemetry.__table__.columns if not c.primary_key]
+
+# Scalar column defaults, applied on the fast path (which bypasses SQLAlchemy defaults)
+COLUMN_DEFAULTS = {
+    c.name: c.default.arg
+    for c in Telemetry.__table__.columns
+    if c.default is not None and c.default.is_scalar
+}
+
+_SQLITE_INSERT_SQL = "INSERT INTO {table} ({cols}) VALUES ({params})".format(
+    table=Telemetry.__tablename__,
+    cols=", ".join(TELEMETRY_COLUMNS),
+    params=", ".join("?" for _ in TELEMETRY_COLUMNS),
+)
+
+
+def _chunks(rows: Iterable[Dict], size: int) -> Iterable[List[Dict]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _sqlite_value(value):
+    # Match SQLAlchemy's SQLite DateTime storage format so both paths sort/compare identically
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _sqlite_tuples(chunk: List[Dict]) -> List[tuple]:
+    defaults = COLUMN_DEFAULTS
+    return [
+        tuple(_sqlite_value(row.get(col, defaults.get(col))) for col in TELEMETRY_COLUMNS)
+        for row in chunk
+    ]
+
+
+async def insert_telemetry_rows(target: Union[AsyncConnection, AsyncSession],
+                                rows: Iterable[Dict],
+                                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                sqlite_fast_path: bool = True,
+                                update_counters: bool = True) -> int:
+    """
+    Inserts `rows` into Telemetry in chunks, inside the caller's transaction.
+
+    Args:
+        target: An AsyncConnection (e.g. from engine.begin()) or AsyncSession.
+        rows: Any iterable of column dicts; consumed lazily.
+        chunk_size: Rows per executemany.
+        sqlite_fast_path: On SQLite, bypass Core and use cursor.executemany.
+        update_counters: Maintain TelemetryCounters and the aggregate tables
+            for the inserted rows.
+
+    Returns:
+        Number of rows written.
+    """
+    conn = await target.connection() if isinstance(target, AsyncSession) else target
+    use_fast_path = sqlite_fast_path and conn.dialect.name == "sqlite"
+    stmt = insert(Telemetry)
+
+    written = 0
+    for chunk in _chunks(rows, chunk_size):
+        if use_fast_path:
+            params = _sqlite_tuples(chunk)
+            await conn.run_sync(_executemany_raw, params)
+        else:
+            await conn.execute(stmt, chunk)
+        if update_counters:
+            await add_rows_to_counters(conn, chunk)
+            await add_rows_to_aggregates(conn, chunk)
+        written += len(chunk)
+    return written
+
+
+def _executemany_raw(sync_conn, params: List[tuple]):
+    cursor = sync_conn.connection.cursor()
+    try:
+        cursor.executemany(_SQLITE_INSERT_SQL, params)
+    finally:
+        cursor.close()
+
+
+def _column_values(values, start: int, stop: int, n: int, for_sqlite: bool) -> list:
+    """One column's slice as a list of DB-ready Python values (scalars are broadcast)."""
+    if not isinstance(values, (np.ndarray, list, tuple)):
+        value = _sqlite_value(values) if for_sqlite else values
+        return [value] * n
+    part = values[start:stop]
+    if not isinstance(part, np.ndarray):
+        return [_sqlite_value(v) for v in part] if for_sqlite else list(part)
+    if for_sqlite and part.dtype.kind == "M":
+        # Same text format as _sqlite_value, formatted in C
+        return np.char.replace(np.datetime_as_string(part, unit="us"), "T", " ").tolist()
+    if part.dtype.kind == "b":
+        part = part.astype(np.int8) if for_sqlite else part
+    return part.astype("datetime64[us]").tolist() if part.dtype.kind == "M" else part.tolist()
+
+
+async def insert_telemetry_columns(target: Union[AsyncConnection, AsyncSession],
+                                   columns: Dict,
+                                   chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                   sqlite_fast_path: bool = True,
+                                   update_counters: bool = True) -> int:
+    """
+    Columnar insert: `columns` maps Telemetry column name -> NumPy array / list
+    (all the same length) or a scalar applied to every row. Missing columns
+    get their defaults. Same chunking, transaction and counter semantics as
+    insert_telemetry_rows.
+
+    Returns:
+        Number of rows written.
+    """
+    lengths = {len(v) for v in columns.values() if isinstance(v, (np.ndarray, list, tuple))}
+    if len(lengths) > 1:
+        raise ValueError(f"Column lengths differ: {sorted(lengths)}")
+    total = lengths.pop() if lengths else 0
+
+    conn = await target.connection() if isinstance(target, AsyncSession) else target
+    use_fast_path = sqlite_fast_path and conn.dialect.name == "sqlite"
+    stmt = insert(Telemetry)
+    values = {col: columns.get(col, COLUMN_DEFAULTS.get(col)) for col in TELEMETRY_COLUMNS}
+
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        n = stop - start
+        if use_fast_path:
+            lists = [_column_values(values[col], start, stop, n, True) for col in TELEMETRY_COLUMNS]
+            await conn.run_sync(_executemany_raw, list(zip(*lists)))
+        else:
+            lists = [_column_values(values[col], start, stop, n, False) for col in TELEMETRY_COLUMNS]
+            await conn.execute(stmt, [dict(zip(TELEMETRY_COLUMNS, row)) for row in zip(*lists)])
+        if update_counters:
+            # Counters / aggregates only read a handful of columns
+            source = [_column_values(values[col], start, stop, n, False) for col in SOURCE_COLUMNS]
+            rows = [dict(zip(SOURCE_COLUMNS, row)) for row in zip(*source)]
+            await add_rows_to_counters(conn, rows)
+            await add_rows_to_aggregates(conn, rows)
+    return total
@@ -0,0 +1,69 @@
+"""
+Discrete-Event Queue
+Pending simulation events ordered by the simulation tick they fire at, so a
+runner can jump the clock straight to the next one instead of ticking
+through spans where nothing happens (DOWN waiting for repair, IDLE).
+
+- Events with the same time fire in the order they were scheduled.
+- cancel(kind) drops every pending event of that kind (lazily: stale heap
+  entries are skipped when they reach the top).
+"""
+
+import heapq
+import itertools
+import math
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+# === EVENT KINDS ===
+REPAIR_DONE = "REPAIR_DONE"   # Breakdown repair time has elapsed
+FAULT = "FAULT"               # Random fault arrival (inject_fault)
+SAMPLE = "SAMPLE"             # Fixed-rate telemetry sample was requested
+
+
+class Event(NamedTuple):
+    time: int
+    kind: str
+    payload: Any = None
+
+
+class EventQueue:
+    """Min-heap of pending events keyed by simulation tick."""
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int, int, Event]] = []
+        self._seq = itertools.count()
+        self._generation = {}  # kind -> bumped by cancel()
+
+    def schedule(self, time: int, kind: str, payload: Any = None) -> Event:
+        event = Event(int(time), kind, payload)
+        heapq.heappush(self._heap, (event.time, next(self._seq), self._generation.get(kind, 0), event))
+        return event
+
+    def cancel(self, kind: str):
+        self._generation[kind] = self._generation.get(kind, 0) + 1
+
+    def pending(self, kind: str) -> bool:
+        gen = self._generation.get(kind, 0)
+        return any(e.kind == kind and g == gen for _, _, g, e in self._heap)
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap and heap[0][2] != self._generation.get(heap[0][3].kind, 0):
+            heapq.heappop(heap)
+
+    def next_time(self) -> float:
+        """Tick of the earliest pending event (inf if none)."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else math.inf
+
+    def pop_due(self, now: int) -> Optional[Event]:
+        """The earliest event with time <= now, or None."""
+        self._drop_stale()
+        if self._heap and self._heap[0][0] <= now:
+            return heapq.heappop(self._heap)[3]
+        return None
+
+    def __len__(self):
+        self._drop_stale()
+        gens = self._generation
+        return sum(1 for _, _, g, e in self._heap if g == gens.get(e.kind, 0))
@@ -1,162 +1,222 @@
+from typing import Dict, Mapping, Optional
+
+import numpy as np
+
+from backend.simulation.rules import RuleSet, get_active_rules
+
+# === BATCH HEALTH CHECKS ===
+# Status codes returned by check_health_batch
+STATUS_OK = 0
+STATUS_NG = 1
+STATUS_DOWN = 2
+STATUS_NAMES = ("OK", "NG", "DOWN")
+
+
+class HealthBatch:
+    """
+    Result of FailureManager.check_health_batch.
+
+    status:      STATUS_OK / STATUS_NG / STATUS_DOWN per row
+    reason_code: first violated rule per row (index into rules.down, or
+                 len(rules.down) + k for rules.ng[k]); -1 if OK
+    ng_flags:    bitmask of every violated NG rule (NG rows)
+    Reason strings are only formatted on request, for failing rows.
+    """
+    def __init__(self, status: np.ndarray, reason_code: np.ndarray, ng_flags: np.ndarray,
+                 columns: Dict[str, np.ndarray], rules: RuleSet):
+        self.status = status
+        self.reason_code = reason_code
+        self.ng_flags = ng_flags
+        self.rules = rules
+        self._columns = columns
+
+    def __len__(self):
+        return len(self.status)
+
+    @property
+    def failing(self) -> np.ndarray:
+        """Row indices that are NG or DOWN."""
+        return np.flatnonzero(self.status != STATUS_OK)
+
+    @property
+    def down(self) -> np.ndarray:
+        return np.flatnonzero(self.status == STATUS_DOWN)
+
+    @property
+    def first_violation(self) -> int:
+        """Index of the first NG/DOWN row, or -1."""
+        failing = self.failing
+        return int(failing[0]) if failing.size else -1
+
+    @property
+    def first_down(self) -> int:
+        """Index of the first DOWN row, or -1."""
+        down = self.down
+        return int(down[0]) if down.size else -1
+
+    def reason(self, i: int) -> Optional[str]:
+        """The exact reason string check_health would return for row i."""
+        code = int(self.reason_code[i])
+        if code < 0:
+            return None
+        if code < len(self.rules.down):
+            rule = self.rules.down[code]
+            return rule.reason(self._columns[rule.param][i])
+        flags = int(self.ng_flags[i])
+        return ", ".join(
+            rule.reason(self._columns[rule.param][i])
+            for k, rule in enumerate(self.rules.ng) if flags >> k & 1
+        )
+
+    def report(self, i: int) -> Dict:
+        """Row i as a check_health-style dict."""
+        status = int(self.status[i])
+        if status != STATUS_DOWN:
+            return {"status": STATUS_NAMES[status], "reason": self.reason(i)}
+        rule = self.rules.down[int(self.reason_code[i])]
+        return {"status": "DOWN", "code": rule.code, "reason": self.reason(i), "repair_time": rule.repair_time}
+
+
 class FailureManager:
     """
     Phase 7: Central Brain for Health & Quality Logic.
     Enforces SOR Section 3.2 and 3.3 Rules.
+
+    The rules themselves are a declarative table (backend/simulation/rules.py,
+    failure_rules.json). Every FailureManager follows the shared active table
+    unless it is given its own (per-machine recipe).
     """
-    def __init__(self):
-        # 1. Configuration (The "Rules")
-        self.THRESHOLDS = {
-            "pressure": {"min": 2.0, "max": 4.0}, # Bar (Quality)
-            "temp":     {"min": 25.0, "max": 32.0}, # Celsius (Quality)
-            "flow":     {"min": 80.0, "max": 150.0}, # LPM (Quality)
-            "scan_speed": {"min": 8.0, "max": 12.0}, # mm/s
-            "temp_speed": {"min": 20.0, "max": 30.0}, # mm/s
-            "part_temp":  {"min": 800.0, "max": 880.0}, # Celsius (Part Quality) [NEW]
-            "coil_life":  {"max": 200000} # Cycles
-        }
-        
-        # Safety Limits (Machine Protection - Trigger DOWN)
-        # NOTE: Safety limits should be MORE EXTREME than Quality limits to allow an NG zone.
-        # Example: Quality flow_min=80, Safety flow_min=50. 
-        # Flow 50-80 = NG (Softness), Flow <50 = Breakdown (Pump Failure).
-        self.SAFETY_LIMITS = {
-            "pressure_max": 6.0, # Hose Burst (BD) - Quality max is 4.0
-            "pressure_min": 1.0, # Complete Loss (MS) - Quality min is 2.0
-            "flow_min": 50.0,    # Pump Failure (MS) - Quality min is 80.0 (Zone: 50-80 = NG)
-            "temp_max": 50.0,    # Scalding/Boiling (BD) - Quench Water
-            "part_temp_max": 1200.0, # Melt Down (BD) - Coil Damage [NEW]
-            "power_max": 80.0,   # Inverter Overcurrent (BD)
-            "speed_min": 5.0     # Servo Overload/Jam (MS)
-        }
-        
+    def __init__(self, rules: Optional[RuleSet] = None):
+        # 1. Configuration (The "Rules") - None = follow the shared, hot-reloadable table
+        self.rules_override = rules
+
         # 2. State Tracking (For "5 NG" Rule)
         self.consecutive_ng_counter = 0
         self.active_fault = None
         self.active_drift_param = None # Which param is currently drifting?
 
-    def check_health(self, telemetry, commit=False):
+    @property
+    def rules(self) -> RuleSet:
+        return self.rules_override or get_active_rules()
+
+    @property
+    def SAFETY_LIMITS(self) -> Dict[str, float]:
+        """Machine Protection limits (Trigger DOWN), e.g. SAFETY_LIMITS['pressure_min']."""
+        return self.rules.safety_limits
+
+    @property
+    def THRESHOLDS(self) -> Dict[str, Dict[str, float]]:
+        """Quality limits (Trigger NG), e.g. THRESHOLDS['flow']['min']."""
+        return self.rules.thresholds
+
+    def check_health(self, telemetry, commit=False, safety_only=False):
         """
         Evaluates current telemetry against rules.
         commit: If True, updates internal counters (use only at End of Cycle).
+        safety_only: Only the E-Stop rules (mid-cycle checks that act on DOWN alone).
         Returns: { "status": "OK" | "NG" | "DOWN", "reason": str | None }
         """
-        issues = []
-        
-        # --- A. Critical Checks (Priority 1 & 2 - Instant Stop) ---
-        # 1. Coil Life (BD)
-        if telemetry.get('coil_life', 200000) <= 0:
-            return self._trigger_failure("BD", "Coil Failure (Life Exceeded)", 60)
-
-        # 0. Part Melt Check (BD) [NEW]
-        pt = telemetry.get('temp', 0)
-        if pt > self.SAFETY_LIMITS['part_temp_max']:
-             return self._trigger_failure("BD", f"Coil Damage (Part Melted: {pt:.1f}°C)", 60)
-
-        # 2. Power System (BD) [NEW]
-        power = telemetry.get('power', 0)
-        if power > self.SAFETY_LIMITS['power_max']:
-             return self._trigger_failure("BD", f"Inverter Overcurrent ({power:.1f} kW)", 45)
-
-        # 3. Pressure Safety (BD/MS)
-        p = telemetry.get('pressure', 0)
-        # Note: Pressure is 0 during IDLE/LOADING, so only check if state is QUENCH
-        if telemetry['state'] == 'QUENCH':
-            if p > self.SAFETY_LIMITS['pressure_max']:
-                 return self._trigger_failure("BD", f"Hose Burst (Pressure {p:.1f})", 45)
-            # Only trigger Pressure Drop if we are deep into Quench (timer > 2) to avoid noise at start
-            if p < self.SAFETY_LIMITS['pressure_min'] and telemetry.get('timer', 0) > 2:
-                 return self._trigger_failure("MS", f"Severe Pressure Drop ({p:.1f})", 15) 
-            
-            # 4. Flow Safety (MS) [NEW]
-            f = telemetry.get('flow', 0)
-            if f < self.SAFETY_LIMITS['flow_min'] and telemetry.get('timer', 0) > 2:
-                 return self._trigger_failure("MS", f"Pump Failure (Flow {f:.1f})", 30)
-
-            # 5. Temperature Safety (BD) [NEW]
-            qt = telemetry.get('quench_water_temp', 25.0)
-            if qt > self.SAFETY_LIMITS['temp_max']:
-                 return self._trigger_failure("BD", f"Scalding Risk (Temp {qt:.1f})", 45)
-
-        # 6. Motion Safety (MS) [NEW]
-        # Check speed only during active motion (HEATING or QUENCH)
-        # 6. Motion Safety (MS) [NEW]
-        # Check speed only during active motion (HEATING or QUENCH)
-        if telemetry['state'] == 'HEATING':
-             # Enable Servo Check in Heating
-             s = telemetry.get('coil_scan_speed', 0)
-             if s < self.SAFETY_LIMITS['speed_min'] and telemetry.get('timer', 0) > 2:
-                  return self._trigger_failure("MS", f"Servo Overload (Speed {s:.1f})", 20)
-        elif telemetry['state'] == 'QUENCH':
-             s = telemetry.get('coil_scan_speed', 0) # Quench also has scan speed
-             if s < self.SAFETY_LIMITS['speed_min'] and telemetry.get('timer', 0) > 2:
-                  return self._trigger_failure("MS", f"Servo Overload (Speed {s:.1f})", 20) 
-
-        # --- B. Quality Checks (Priority 3 - Drift & Count) ---
-        # Only check these during active processing
-        is_ng = False
-        ng_reasons = []
-
-        if telemetry['state'] in ['HEATING', 'QUENCH', 'UNLOADING', 'COMPLETED']:
-            # 0. Part Temperature Check [NEW]
-            # Must assume we have 'peak_part_temp' in telemetry
-            pt = telemetry.get('peak_part_temp', 0.0)
-            # Only check if temp is significant OR if the process is finishing (to catch cold parts)
-            if pt > 100 or telemetry['state'] in ['UNLOADING', 'COMPLETED']: 
-                if pt < self.THRESHOLDS['part_temp']['min']:
-                    is_ng = True; ng_reasons.append(f"NG: UNDERHEATED Part ({pt:.1f}°C) -> SOFTNESS")
-                elif pt > self.THRESHOLDS['part_temp']['max']:
-                    is_ng = True; ng_reasons.append(f"NG: OVERHEATED Part ({pt:.1f}°C) -> BRITTLENESS")
-
-            # Quench Water Temp Check (Softness/Cracking)
-            # User Rule: Temp between 25-32 is OK. <25 Crack, >32 Soft.
-            # We must check 'quench_water_temp', NOT 'temp' (Part Temp).
-            # 1. Quench Water Temp Check
-            # Rule: Cold Water (<25) -> Thermal Shock -> CRACKING
-            # Rule: Hot Water (>32) -> Slow Cooling -> SOFTNESS. 
-            qt = telemetry.get('quench_water_temp', 25.0) 
-            if qt < self.THRESHOLDS['temp']['min']:
-                is_ng = True; ng_reasons.append(f"CRACKING (Water Too Cold: {qt:.1f}°C)")
-            elif qt > self.THRESHOLDS['temp']['max']:
-                is_ng = True; ng_reasons.append(f"SOFTNESS (Water Too Hot: {qt:.1f}°C)")
-            
-            # 2. Flow Check
-            # Rule: Low Flow -> Insufficient Heat Removal -> SOFTNESS
-            # Rule: High Flow -> Too Aggressive -> CRACKING (or Distortion)
-            f = telemetry.get('flow', 0)
-            if f > 10.0: 
-                if f < self.THRESHOLDS['flow']['min']:
-                     is_ng = True; ng_reasons.append(f"SOFTNESS (Low Flow: {f:.1f} lpm)")
-                elif f > self.THRESHOLDS['flow']['max']:
-                     is_ng = True; ng_reasons.append(f"CRACKING (High Flow: {f:.1f} lpm)")
-
-            # 3. Pressure Check
-            # Rule: Low Pressure -> Vapor Blanket persists -> SOFTNESS (Spotty)
-            # Rule: High Pressure -> Too Aggressive -> CRACKING
-            p = telemetry.get('pressure', 0)
-            if p > 0.1: 
-                if p < self.THRESHOLDS['pressure']['min']:
-                     is_ng = True; ng_reasons.append(f"SOFTNESS (Low Pressure: {p:.1f} bar)")
-                elif p > self.THRESHOLDS['pressure']['max']:
-                     is_ng = True; ng_reasons.append(f"CRACKING (High Pressure: {p:.1f} bar)")
+        rules = self.rules
+        k, hit = rules.for_state(telemetry['state'], safety_only)(telemetry.get, telemetry.get('timer', 0))
+
+        # --- A. Critical Checks (Instant Stop - first violated DOWN rule in table order) ---
+        if k >= 0:
+            rule = rules.down[k]
+            return self._trigger_failure(rule.code, rule.reason(hit), rule.repair_time)
+
+        # --- B. Quality Checks (every violated NG rule, in table order) ---
+        ng_reasons = [rules.ng[j].reason(v) for j, v in hit] if hit else None
 
         # --- C. Decision Logic ---
-        if is_ng:
+        if ng_reasons:
             reason_str = ", ".join(ng_reasons)
-            
+
             if commit:
                 self.consecutive_ng_counter += 1
                 # FR-08: Hard Stop after 5 NG parts (DISABLED FOR DEV VARIABILITY TESTING)
                 # if self.consecutive_ng_counter >= 5:
                 #    return self._trigger_failure("QL", f"Quality Stop (5 Consecutive NG): {reason_str}", 15)
-            
+
             return {"status": "NG", "reason": reason_str}
         else:
             # Reset counter if a good part is produced
-            if commit: 
+            if commit:
                 self.consecutive_ng_counter = 0
-            
+
             return {"status": "OK", "reason": None}
 
+    def check_health_batch(self, columns: Mapping[str, np.ndarray], commit: bool = False) -> HealthBatch:
+        """
+        check_health over many rows at once: column arrays in (same keys as the
+        telemetry dict; 'state' holds state names), one vectorized pass per rule.
+        commit: If True, rows are consecutive parts of THIS machine, in order;
+        the consecutive-NG counter / active fault end up as if check_health had
+        been called on each.
+        """
+        rules = self.rules
+        state = np.asarray(columns['state'])
+        n = len(state)
+        timer = np.asarray(columns['timer'], dtype=float) if 'timer' in columns else np.zeros(n)
+        values: Dict[str, np.ndarray] = {}
+        in_states: Dict[frozenset, np.ndarray] = {}
+
+        def violations(rule_list) -> np.ndarray:
+            masks = np.zeros((len(rule_list), n), dtype=bool)
+            for k, rule in enumerate(rule_list):
+                v = values.get(rule.param)
+                if v is None:
+                    raw = columns.get(rule.param)
+                    v = np.asarray(raw, dtype=float) if raw is not None else np.full(n, float(rule.default))
+                    values[rule.param] = v
+                mask = (v < rule.lo) | (v > rule.hi)
+                if rule.floor > -np.inf:
+                    mask &= v > rule.floor
+                if rule.min_timer > 0:
+                    mask &= timer >= rule.min_timer
+                if rule.states is not None:
+                    if rule.states not in in_states:
+                        in_states[rule.states] = np.isin(state, tuple(rule.states))
+                    mask &= in_states[rule.states]
+                masks[k] = mask
+            return masks
+
+        # 1. Safety (first violated DOWN rule wins)
+        safety = violations(rules.down)
+        is_down = safety.any(axis=0)
+
+        # 2. Quality (every violated NG rule), only for rows that stay up
+        quality = violations(rules.ng) & ~is_down
+        weights = np.left_shift(1, np.arange(len(rules.ng), dtype=np.int64))
+        ng_flags = (quality * weights[:, None]).sum(axis=0)
+        is_ng = ng_flags > 0
+
+        status = np.where(is_down, STATUS_DOWN, np.where(is_ng, STATUS_NG, STATUS_OK)).astype(np.int8)
+        first_down = safety.argmax(axis=0) if len(rules.down) else 0
+        first_ng = len(rules.down) + quality.argmax(axis=0) if len(rules.ng) else 0
+        reason_code = np.where(is_down, first_down, np.where(is_ng, first_ng, -1)).astype(np.int16)
+        batch = HealthBatch(status, reason_code, ng_flags, values, rules)
+
+        # 3. Side effects, as sequential check_health calls would leave them
+        if commit:
+            ok_rows = np.flatnonzero(status == STATUS_OK)
+            tail = status[ok_rows[-1] + 1:] if ok_rows.size else status
+            if ok_rows.size:
+                self.consecutive_ng_counter = 0
+            self.consecutive_ng_counter += int((tail == STATUS_NG).sum())
+        last_down = batch.down
+        if last_down.size:
+            self.active_fault = batch.reason(int(last_down[-1]))
+        return batch
+
+    def record(self, status: int, reason: Optional[str] = None):
+        """Applies one committed check_health_batch row to this machine's state."""
+        if status == STATUS_DOWN:
+            self.active_fault = reason
+        elif status == STATUS_NG:
+            self.consecutive_ng_counter += 1
+        else:
+            self.consecutive_ng_counter = 0
+
     def _trigger_failure(self, code, reason, repair_time):
         """
         Helper to format breakdown response.
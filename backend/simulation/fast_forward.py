@@ -3,13 +3,20 @@ Fast Forward Simulation Module
 Generates large datasets for AI/ML training by running accelerated physics.
 """
 
+import asyncio
+import logging
+import multiprocessing
 import random
-import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
-from backend.database import AsyncSessionLocal
-from backend.models import Telemetry, SimRun
-from backend.simulation.failure_manager import FailureManager
+from typing import Optional, Dict, Iterator, List, Tuple
+from backend.database import AsyncSessionLocal, engine
+from backend.models import Telemetry
+from backend.simulation.bulk_insert import insert_telemetry_rows, DEFAULT_CHUNK_SIZE
+from backend.simulation.physics import ThermalModel
+
+logger = logging.getLogger(__name__)
 
 # === CONFIGURATION ===
 
@@ -46,6 +53,15 @@ CYCLE_TIME_SECONDS = 10
 # Parts per day (accounting for ~10% downtime)
 PARTS_PER_DAY = 7500
 
+# Days submitted ahead of the one being inserted, per pool worker (bounds memory)
+IN_FLIGHT_PER_WORKER = 2
+
+# Fresh coil life (cycles)
+COIL_LIFE_MAX = 200000
+
+# Closed-form part physics (a fresh part starts at ambient)
+THERMAL = ThermalModel()
+
 
 def get_shift_operator(hour: int) -> tuple:
     """Returns (shift_id, operator_id) based on hour of day."""
@@ -55,56 +71,73 @@ def get_shift_operator(hour: int) -> tuple:
         return 'Shift_B', 'OP_B'
 
 
-def generate_ok_parameters() -> Dict:
+def physics_peak_temp(power: float, water_temp: float, rng=random) -> float:
+    """
+    Peak part temperature the ThermalModel reaches heating a fresh part at
+    `power` up to 850 C: the closed-form phase (no ticking) plus the sensor
+    flicker accumulated on the way.
+    """
+    ambient = THERMAL.ambient_temp
+    r, t_eq = THERMAL.coefficients(power, 0.0, water_temp)
+    n = THERMAL.ticks_to(850.0, power, 0.0, water_temp, start=ambient)
+    if n is None:
+        return t_eq  # Stalls below target at its equilibrium
+    flicker = ((1.0 - r ** (2 * n)) / (1.0 - r * r) / 12.0) ** 0.5
+    return t_eq + (ambient - t_eq) * r ** n + rng.gauss(0.0, flicker)
+
+
+def generate_ok_parameters(rng=random) -> Dict:
     """Generate parameters within OK ranges with natural variation."""
-    return {
-        'power': random.uniform(48.0, 52.0),  # OK: 45-55 kW
-        'flow': random.uniform(110.0, 130.0),  # OK: 80-150 LPM
-        'pressure': random.uniform(3.2, 3.8),  # OK: 2.0-4.0 bar
-        'quench_water_temp': random.uniform(24.0, 28.0),  # OK: < 32 C
-        'coil_scan_speed': random.uniform(9.0, 11.0),  # OK: 8-12 mm/s
-        'tempering_speed': random.uniform(4.5, 5.5),
-        'peak_part_temp': random.uniform(820.0, 880.0),  # OK: 800-900 C
+    params = {
+        'power': rng.uniform(48.0, 52.0),  # OK: 45-55 kW
+        'flow': rng.uniform(110.0, 130.0),  # OK: 80-150 LPM
+        'pressure': rng.uniform(3.2, 3.8),  # OK: 2.0-4.0 bar
+        'quench_water_temp': rng.uniform(24.0, 28.0),  # OK: < 32 C
+        'coil_scan_speed': rng.uniform(9.0, 11.0),  # OK: 8-12 mm/s
+        'tempering_speed': rng.uniform(4.5, 5.5),
     }
+    # OK: 800-880 C, consistent with the sampled power (~850-876 C)
+    params['peak_part_temp'] = physics_peak_temp(params['power'], params['quench_water_temp'], rng)
+    return params
 
 
-def generate_ng_parameters(ng_type: str) -> Dict:
+def generate_ng_parameters(ng_type: str, rng=random) -> Dict:
     """Generate parameters that would cause NG (quality failure)."""
-    params = generate_ok_parameters()
+    params = generate_ok_parameters(rng)
     
     if ng_type == 'SOFTNESS':
         # Low temp or low power -> Soft part
-        params['peak_part_temp'] = random.uniform(700.0, 780.0)
-        params['power'] = random.uniform(40.0, 45.0)
+        params['peak_part_temp'] = rng.uniform(700.0, 780.0)
+        params['power'] = rng.uniform(40.0, 45.0)
     elif ng_type == 'CRACKING':
         # High pressure -> Cracking
-        params['pressure'] = random.uniform(4.2, 5.5)
+        params['pressure'] = rng.uniform(4.2, 5.5)
     elif ng_type == 'SHALLOW_HARDENING':
         # Low scan speed or high flow
-        params['coil_scan_speed'] = random.uniform(6.0, 7.5)
+        params['coil_scan_speed'] = rng.uniform(6.0, 7.5)
     elif ng_type == 'UNEVEN_HARDENING':
         # Temperature variance (simulated by high quench temp)
-        params['quench_water_temp'] = random.uniform(33.0, 45.0)
+        params['quench_water_temp'] = rng.uniform(33.0, 45.0)
     
     return params
 
 
-def generate_down_parameters(failure_type: str) -> Dict:
+def generate_down_parameters(failure_type: str, rng=random) -> Dict:
     """Generate parameters that caused machine to break down."""
-    params = generate_ok_parameters()
+    params = generate_ok_parameters(rng)
     
     if failure_type == 'hose_burst':
-        params['pressure'] = random.uniform(6.5, 9.0)
+        params['pressure'] = rng.uniform(6.5, 9.0)
     elif failure_type == 'pump_failure':
-        params['flow'] = random.uniform(10.0, 45.0)
+        params['flow'] = rng.uniform(10.0, 45.0)
     elif failure_type == 'power_surge':
-        params['power'] = random.uniform(82.0, 95.0)
+        params['power'] = rng.uniform(82.0, 95.0)
     elif failure_type == 'servo_jam':
-        params['coil_scan_speed'] = random.uniform(1.0, 4.5)
+        params['coil_scan_speed'] = rng.uniform(1.0, 4.5)
     elif failure_type == 'cooling_fail':
-        params['quench_water_temp'] = random.uniform(52.0, 65.0)
+        params['quench_water_temp'] = rng.uniform(52.0, 65.0)
     elif failure_type == 'coil_failure':
-        params['peak_part_temp'] = random.uniform(1200.0, 1350.0)
+        params['peak_part_temp'] = rng.uniform(1200.0, 1350.0)
     
     return params
 
@@ -122,34 +155,25 @@ def get_downtime_reason(failure_type: str) -> str:
     return reasons.get(failure_type, 'Unknown Failure')
 
 
-async def simulate_day(start_time: Optional[datetime] = None, 
-                       initial_ok: int = 0, 
-                       initial_ng: int = 0, 
-                       initial_coil_life: int = 200000) -> Dict:
+def iter_day_rows(start_time: datetime, summary: Dict, rng=random) -> Iterator[Dict]:
     """
-    Simulate one full day of production data.
-    
-    Args:
-        start_time: Starting timestamp. If None, uses current time.
-        initial_ok: Starting OK count (from Live machine).
-        initial_ng: Starting NG count (from Live machine).
-        initial_coil_life: Starting coil life (from Live machine).
-        
-    Returns:
-        Dict with statistics: ok, ng, down_count, coil_life, total_records
+    Lazily generates one day of Telemetry rows (column dicts).
+
+    `summary` must hold the starting 'ok', 'ng' and 'coil_life' counters and is
+    updated in place as rows are produced, so that after the iterator is
+    exhausted it also carries 'down_count', 'coil_replacements',
+    'total_records' and 'end_time'.
+    `rng` is the random source (a seeded random.Random makes the day reproducible).
     """
-    if start_time is None:
-        start_time = datetime.now()
-    
     # Use provided counters (from machine) as starting point
-    ok_count = initial_ok
-    ng_count = initial_ng
-    coil_life = initial_coil_life
-    
-    print(f"📊 FAST FORWARD: Starting from OK={ok_count}, NG={ng_count}, Coil={coil_life}")
+    ok_count = summary['ok']
+    ng_count = summary['ng']
+    coil_life = summary['coil_life']
     
     # Track down events generated in this run (starts at 0 for this batch)
     down_count = 0
+    coil_replacements = 0
+    total_records = 0
     
     # Calculate target counts based on distribution
     target_ng = int(PARTS_PER_DAY * TARGET_NG_PERCENT)
@@ -161,39 +185,38 @@ async def simulate_day(start_time: Optional[datetime] = None,
     
     # Track repair cycles (skip parts during repair)
     repair_cycles_remaining = 0
-    current_failure_type = None
     
-    records_to_insert = []
     current_time = start_time
     
     for cycle in range(PARTS_PER_DAY):
         # Generate timestamp
         current_time = start_time + timedelta(seconds=cycle * CYCLE_TIME_SECONDS)
-        hour = current_time.hour
-        shift_id, operator_id = get_shift_operator(hour)
-        
-        # Generate part ID
-        part_id = f"PART-{str(uuid.uuid4())[:8].upper()}"
         
         # Handle ongoing repair
         if repair_cycles_remaining > 0:
             repair_cycles_remaining -= 1
             continue  # Skip this cycle (machine is down)
         
+        shift_id, operator_id = get_shift_operator(current_time.hour)
+        
+        # Generate part ID (same format as uuid4()[:8].upper(), but drawn from rng)
+        part_id = f"PART-{rng.getrandbits(32):08X}"
+        
         # Determine outcome for this part
         if cycle > 0 and cycle % down_interval == 0 and down_count < target_down:
             # Generate DOWN event
-            failure_type = random.choice(FAILURE_TYPES)
+            failure_type = rng.choice(FAILURE_TYPES)
             
             # Check for proactive coil replacement (20% chance)
-            if failure_type == 'coil_failure' and random.random() < 0.2:
+            if failure_type == 'coil_failure' and rng.random() < 0.2:
                 coil_life = 200000  # Proactive replacement
+                coil_replacements += 1
                 # Still count as down but shorter repair
-                repair_cycles_remaining = random.randint(15, 25)
+                repair_cycles_remaining = rng.randint(15, 25)
             else:
-                repair_cycles_remaining = random.randint(*REPAIR_TIMES[failure_type])
+                repair_cycles_remaining = rng.randint(*REPAIR_TIMES[failure_type])
             
-            params = generate_down_parameters(failure_type)
+            params = generate_down_parameters(failure_type, rng)
             state = 'DOWN'
             downtime_reason = get_downtime_reason(failure_type)
             ng_reason = f"PROCESS FAILURE: {downtime_reason}"
@@ -201,8 +224,8 @@ async def simulate_day(start_time: Optional[datetime] = None,
             
         elif cycle > 0 and cycle % ng_interval == 0 and ng_count < target_ng:
             # Generate NG event
-            ng_type = random.choice(NG_REASONS)
-            params = generate_ng_parameters(ng_type)
+            ng_type = rng.choice(NG_REASONS)
+            params = generate_ng_parameters(ng_type, rng)
             state = 'COMPLETED'
             downtime_reason = None
             ng_reason = ng_type
@@ -210,7 +233,7 @@ async def simulate_day(start_time: Optional[datetime] = None,
             
         else:
             # Generate OK event
-            params = generate_ok_parameters()
+            params = generate_ok_parameters(rng)
             state = 'COMPLETED'
             downtime_reason = None
             ng_reason = None
@@ -221,59 +244,209 @@ async def simulate_day(start_time: Optional[datetime] = None,
         if coil_life <= 0:
             coil_life = 200000  # Auto-replace
         
-        # Create record
-        record = {
+        total_records += 1
+        summary.update(ok=ok_count, ng=ng_count + down_count, down_count=down_count,
+                       coil_life=coil_life, coil_replacements=coil_replacements,
+                       total_records=total_records, end_time=current_time)
+        
+        yield {
+            'sim_run_id': 1,
             'timestamp_sim': current_time,
+            'induction_power': params['power'],
+            'quench_water_temp': params['quench_water_temp'],
+            'quench_water_flow': params['flow'],
+            'quench_pressure': params['pressure'],
+            'coil_scan_speed': params['coil_scan_speed'],
+            'tempering_speed': params['tempering_speed'],
+            'part_temp': params['peak_part_temp'],
+            'state': state,
             'part_id': part_id,
             'shift_id': shift_id,
             'operator_id': operator_id,
-            'state': state,
-            'coil_life': coil_life,
+            'coil_life_counter': coil_life,
             'ok_count': ok_count,
             'ng_count': ng_count + down_count,
+            'is_anomaly': ng_reason is not None,
             'downtime_reason': downtime_reason,
             'ng_reason': ng_reason,
             'repair_time': float(repair_cycles_remaining * CYCLE_TIME_SECONDS) if state == 'DOWN' else 0.0,
-            **params
         }
-        records_to_insert.append(record)
+
+
+async def simulate_day(start_time: Optional[datetime] = None, 
+                       initial_ok: int = 0, 
+                       initial_ng: int = 0, 
+                       initial_coil_life: int = 200000,
+                       seed: Optional[int] = None,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """
+    Simulate one full day of production data.
     
-    # Batch insert to database
-    async with AsyncSessionLocal() as session:
-        async with session.begin():
-            for rec in records_to_insert:
-                entry = Telemetry(
-                    sim_run_id=1,
-                    timestamp_sim=rec['timestamp_sim'],
-                    induction_power=rec['power'],
-                    quench_water_temp=rec['quench_water_temp'],
-                    quench_water_flow=rec['flow'],
-                    quench_pressure=rec['pressure'],
-                    coil_scan_speed=rec['coil_scan_speed'],
-                    tempering_speed=rec['tempering_speed'],
-                    part_temp=rec['peak_part_temp'],
-                    state=rec['state'],
-                    part_id=rec['part_id'],
-                    shift_id=rec['shift_id'],
-                    operator_id=rec['operator_id'],
-                    coil_life_counter=rec['coil_life'],
-                    ok_count=rec['ok_count'],
-                    ng_count=rec['ng_count'],
-                    is_anomaly=rec['ng_reason'] is not None,
-                    downtime_reason=rec['downtime_reason'],
-                    ng_reason=rec['ng_reason'],
-                    repair_time=rec['repair_time']
-                )
-                session.add(entry)
+    Same path as simulate_days(1, ...): the day is generated with counters
+    relative to zero (so the NG / DOWN quotas are per day) and the starting
+    counters are applied as offsets, in a single transaction.
     
+    Args:
+        start_time: Starting timestamp. If None, uses current time.
+        initial_ok: Starting OK count (from Live machine).
+        initial_ng: Starting NG count (from Live machine).
+        initial_coil_life: Starting coil life (from Live machine).
+        seed: Seed for reproducible output (random if omitted).
+        chunk_size: Rows per executemany.
+        
+    Returns:
+        Dict with statistics: ok, ng, down_count, coil_life, total_records, seed
+    """
+    logger.info("📊 FAST FORWARD: Starting from OK=%s, NG=%s, Coil=%s", initial_ok, initial_ng, initial_coil_life)
+    result = await simulate_days(1, workers=1, start_time=start_time, initial_ok=initial_ok,
+                                 initial_ng=initial_ng, initial_coil_life=initial_coil_life,
+                                 seed=seed, chunk_size=chunk_size)
+    return {k: result[k] for k in ('ok', 'ng', 'down_count', 'coil_life', 'total_records',
+                                   'seed', 'start_time', 'end_time')}
+
+
+def day_seed(seed: int, day_index: int) -> str:
+    """Deterministic per-day seed: the same (seed, day) always yields the same rows."""
+    return f"{seed}:{day_index}"
+
+
+def generate_day_relative(args) -> Dict:
+    """
+    Process-pool worker: generates one day with counters starting from zero.
+
+    ok_count/ng_count are relative to the start of the day and coil life is
+    relative to a fresh coil, flagged per row once a proactive replacement has
+    happened (from then on the value is absolute). merge_day_rows() turns them
+    into continuous values once the previous day's totals are known.
+    """
+    day_index, start_time, seed = args
+    rng = random.Random(day_seed(seed, day_index))
+    summary = {'ok': 0, 'ng': 0, 'down_count': 0, 'coil_life': COIL_LIFE_MAX, 'coil_replacements': 0}
+
+    rows = []
+    for row in iter_day_rows(start_time, summary, rng):
+        row['_coil_absolute'] = summary['coil_replacements'] > 0
+        rows.append(row)
+
+    summary['day_index'] = day_index
+    summary['rows'] = rows
+    return summary
+
+
+def merge_day_rows(day: Dict, ok_offset: int, ng_offset: int, coil_start: int) -> Tuple[List[Dict], int]:
+    """
+    Applies the running counter offsets to a relative day from
+    generate_day_relative(). Returns (rows, coil_life at end of day).
+    """
+    coil_life = coil_start
+    for row in day['rows']:
+        row['ok_count'] += ok_offset
+        row['ng_count'] += ng_offset
+        if not row.pop('_coil_absolute'):
+            # Same countdown as the serial path: decrement, auto-replace at 0
+            used = COIL_LIFE_MAX - row['coil_life_counter']
+            value = coil_start - used
+            row['coil_life_counter'] = value if value > 0 else value + COIL_LIFE_MAX
+        coil_life = row['coil_life_counter']
+    return day['rows'], coil_life
+
+
+async def simulate_days(days: int,
+                        workers: int = 1,
+                        start_time: Optional[datetime] = None,
+                        initial_ok: int = 0,
+                        initial_ng: int = 0,
+                        initial_coil_life: int = COIL_LIFE_MAX,
+                        seed: Optional[int] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """
+    Simulate several days, generating them in parallel across a process pool.
+
+    Each day is generated independently from a deterministic per-day seed with
+    counters relative to zero. Days are then merged strictly in order: running
+    ok/ng offsets and the coil life carried over from the previous day are
+    applied, and each day is inserted and committed in its own transaction as
+    soon as it arrives, so insertion overlaps with generation of later days and
+    a failure only loses the day being written. At most
+    IN_FLIGHT_PER_WORKER * workers days are submitted ahead, which bounds the
+    generated rows held in memory. The result is reproducible for a given
+    `seed` regardless of `workers`.
+    """
+    if start_time is None:
+        start_time = datetime.now()
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+
+    day_span = timedelta(seconds=PARTS_PER_DAY * CYCLE_TIME_SECONDS)
+    jobs = [(d, start_time + d * day_span, seed) for d in range(days)]
+
+    logger.info("📊 FAST FORWARD: %s days across %s worker(s), seed=%s", days, workers, seed)
+
+    ok_count, ng_count, coil_life = initial_ok, initial_ng, initial_coil_life
+    down_count = 0
+    total_records = 0
+    days_done = 0
+    end_time = start_time
+
+    loop = asyncio.get_running_loop()
+    executor = None
+    if workers > 1:
+        # spawn: the API process runs threads (live sim, log listener) that fork would copy mid-lock
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(job):
+        return loop.run_in_executor(executor, generate_day_relative, job)
+
+    pending = deque()
+    next_job = 0
+    try:
+        # 1. At most IN_FLIGHT_PER_WORKER days per worker generated / queued / being inserted
+        if executor:
+            while next_job < len(jobs) and len(pending) < IN_FLIGHT_PER_WORKER * workers:
+                pending.append(submit(jobs[next_job]))
+                next_job += 1
+
+        for job in jobs:
+            day = await pending.popleft() if executor else generate_day_relative(job)
+
+            # 2. Merge in order, then commit the day on its own
+            rows, coil_life = merge_day_rows(day, ok_count, ng_count, coil_life)
+            async with engine.begin() as conn:
+                await insert_telemetry_rows(conn, rows, chunk_size=chunk_size)
+
+            ok_count += day['ok']
+            ng_count += day['ng']
+            down_count += day['down_count']
+            total_records += len(rows)
+            days_done += 1
+            if rows:
+                end_time = rows[-1]['timestamp_sim']
+            day['rows'] = None  # release memory before the next day
+
+            # 3. Slide the window now that this day is out of memory
+            if executor and next_job < len(jobs):
+                pending.append(submit(jobs[next_job]))
+                next_job += 1
+    except Exception:
+        logger.exception("❌ FAST FORWARD FAILED after %s/%s committed day(s) (through %s)", days_done, days, end_time)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
     return {
         'ok': ok_count,
-        'ng': ng_count + down_count,  # Total NG includes DOWN events
+        'ng': ng_count,
         'down_count': down_count,
         'coil_life': coil_life,
-        'total_records': len(records_to_insert),
+        'total_records': total_records,
+        'days': days,
+        'workers': workers,
+        'seed': seed,
         'start_time': start_time.isoformat(),
-        'end_time': current_time.isoformat(),
+        'end_time': end_time.isoformat(),
     }
 
 
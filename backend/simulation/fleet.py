@@ -0,0 +1,518 @@
+"""
+Fleet Simulation Module
+Steps N induction hardening machines together using NumPy arrays.
+
+Mirrors the per-machine logic of MachineState.update / ThermalModel.update
+(same heating, quench and ambient-loss equations, same
+LOADING -> HEATING -> QUENCH -> UNLOADING loop and the same E-Stop rules),
+but holds every signal as a column so one tick costs a handful of array ops
+instead of N Python method calls.
+
+Finished parts and breakdowns come out of drain_completed() as Telemetry
+rows (persistence.telemetry_row), ready for insert_telemetry_rows; the
+headless FleetRunner drives it for multi-machine runs.
+"""
+
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from backend.simulation.failure_manager import STATUS_DOWN, STATUS_NG, FailureManager, HealthBatch
+from backend.simulation.persistence import telemetry_row
+from backend.simulation.physics import ThermalModel
+from backend.simulation.time_manager import TimeManager
+
+# === STATE CODES ===
+# Integer codes for the state column. Index into STATE_NAMES for the string
+# used by MachineState / Telemetry.state.
+IDLE = 0
+LOADING = 1
+HEATING = 2
+QUENCH = 3
+UNLOADING = 4
+DOWN = 5
+
+STATE_NAMES = ("IDLE", "LOADING", "HEATING", "QUENCH", "UNLOADING", "DOWN")
+_STATE_NAME_ARRAY = np.array(STATE_NAMES)
+
+# === DRIFT PARAMETER CODES ===
+DRIFT_NONE = 0
+DRIFT_PRESSURE = 1
+DRIFT_FLOW = 2
+DRIFT_POWER = 3
+DRIFT_SCAN_SPEED = 4
+DRIFT_QUENCH_WATER_TEMP = 5
+
+DRIFT_PARAMS = {
+    None: DRIFT_NONE,
+    'pressure': DRIFT_PRESSURE,
+    'flow': DRIFT_FLOW,
+    'power': DRIFT_POWER,
+    'scan_speed': DRIFT_SCAN_SPEED,
+    'quench_water_temp': DRIFT_QUENCH_WATER_TEMP,
+}
+
+# Same setpoints as MachineState._apply_physics_inputs
+HEATING_POWER = 50.0
+HEATING_SCAN_SPEED = 10.0
+QUENCH_FLOW_TARGET = 120.0
+QUENCH_SCAN_SPEED = 8.0
+QUENCH_TEMP_SPEED = 5.0
+HEATING_TARGET_TEMP = 850.0
+QUENCH_END_TEMP = 50.0
+WATCHDOG_TICKS = 50
+COIL_LIFE_MAX = 200000
+
+
+class FleetEngine:
+    """
+    Batched, array-backed equivalent of N MachineState instances.
+
+    Manual mode, the live event log and risk scoring are not modelled;
+    everything else that feeds Telemetry (peaks, drift, counters, NG/DOWN
+    reasons, repair time) is. Machine i writes its rows under sim_run_ids[i]
+    (default i + 1).
+    """
+
+    def __init__(self, n_machines: int, seed: Optional[int] = None,
+                 ambient_temp: float = 25.0, noise_enabled: bool = True,
+                 sim_run_ids: Optional[Iterable[int]] = None):
+        self.n = int(n_machines)
+        self.sim_run_ids = list(sim_run_ids) if sim_run_ids is not None else list(range(1, self.n + 1))
+        if len(self.sim_run_ids) != self.n:
+            raise ValueError(f"Need {self.n} sim_run_ids, got {len(self.sim_run_ids)}")
+        self.rng = np.random.default_rng(seed)
+        self.time_manager = TimeManager()
+        self.noise_enabled = noise_enabled
+
+        # Rules are evaluated for all machines at once by check_health_batch;
+        # one FailureManager per machine keeps the consecutive-NG counters /
+        # active fault independent and is only touched for graded rows.
+        self.health = FailureManager()
+        self.failure_managers = [FailureManager() for _ in range(self.n)]
+
+        # Physics Constants (shared with the scalar model)
+        ref = ThermalModel(ambient_temp)
+        self.ambient_temp = ref.ambient_temp
+        self.C_HEAT = ref.C_HEAT
+        self.C_COOL = ref.C_COOL
+        self.C_LOSS = ref.C_LOSS
+
+        n = self.n
+        # State
+        self.state = np.full(n, IDLE, dtype=np.int8)
+        self.timer = np.zeros(n, dtype=np.int64)
+        self.temp = np.full(n, self.ambient_temp, dtype=np.float64)
+
+        # Telemetry Snapshot
+        self.power = np.zeros(n)
+        self.flow = np.zeros(n)
+        self.pressure = np.zeros(n)
+        self.scan_speed = np.zeros(n)
+        self.temp_speed = np.zeros(n)
+
+        # Peak Values (captured during cycle)
+        self.peak_power = np.zeros(n)
+        self.peak_flow = np.zeros(n)
+        self.peak_pressure = np.zeros(n)
+        self.peak_scan_speed = np.zeros(n)
+        self.peak_temp_speed = np.zeros(n)
+        self.peak_quench_temp = np.full(n, 25.0)
+        self.peak_part_temp = np.zeros(n)
+
+        # Drift (FR-08)
+        self.drift_param = np.zeros(n, dtype=np.int8)
+        self.drift_rate = np.zeros(n)
+        self.accumulated_drift = np.zeros(n)
+        self.quench_water_temp_base = np.full(n, 26.5)
+        self.override_quench_temp = np.full(n, np.nan)
+
+        # Counters
+        self.coil_life = np.full(n, COIL_LIFE_MAX, dtype=np.int64)
+        self.ok_count = np.zeros(n, dtype=np.int64)
+        self.ng_count = np.zeros(n, dtype=np.int64)
+        self.cycle_count = np.zeros(n, dtype=np.int64)
+
+        # Identity / reasons (object columns, touched only on transitions)
+        self.part_id = np.full(n, "READY", dtype=object)
+        self.ng_reason = np.full(n, None, dtype=object)
+        self.downtime_reason = np.full(n, None, dtype=object)
+        self.repair_time_remaining = np.zeros(n)  # minutes, as persisted
+
+        # Finished parts / breakdowns waiting to be drained
+        self._completed: List[Dict] = []
+        self.ticks = 0
+
+    # --- Control ---
+
+    def _select(self, machines) -> np.ndarray:
+        if machines is None:
+            return np.arange(self.n)
+        return np.atleast_1d(np.asarray(machines, dtype=np.int64))
+
+    def start(self, machines=None):
+        """Starts a cycle on the given IDLE machines (all by default)."""
+        idx = self._select(machines)
+        idx = idx[self.state[idx] == IDLE]
+        for i in idx:
+            self.part_id[i] = self._new_part_id()
+        self._transition(idx, LOADING)
+
+    def stop(self, machines=None):
+        """Halts machines to IDLE, keeping counters and coil life."""
+        idx = self._select(machines)
+        self.state[idx] = IDLE
+        self.timer[idx] = 0
+        self.temp[idx] = self.ambient_temp
+        self.drift_param[idx] = DRIFT_NONE
+        self.drift_rate[idx] = 0.0
+        for arr in (self.power, self.flow, self.pressure, self.scan_speed, self.temp_speed):
+            arr[idx] = 0.0
+        self.part_id[idx] = "READY"
+        self.downtime_reason[idx] = None
+        self.ng_reason[idx] = None
+
+    def repair(self, machines=None):
+        """Clears drift/faults; DOWN machines return to IDLE."""
+        idx = self._select(machines)
+        self.drift_param[idx] = DRIFT_NONE
+        self.drift_rate[idx] = 0.0
+        self.accumulated_drift[idx] = 0.0
+        self.override_quench_temp[idx] = np.nan
+        for i in idx:
+            self.failure_managers[i].reset()
+        down = idx[self.state[idx] == DOWN]
+        self.state[down] = IDLE
+        self.repair_time_remaining[down] = 0.0
+
+    def set_drift(self, machines, param: Optional[str], rate: float, offset: float = 0.0):
+        """Starts a linear drift (same semantics as MachineState.active_drift)."""
+        idx = self._select(machines)
+        self.drift_param[idx] = DRIFT_PARAMS[param]
+        self.drift_rate[idx] = rate
+        self.accumulated_drift[idx] = offset
+
+    def _transition(self, idx: np.ndarray, new_state: int):
+        if idx.size == 0:
+            return
+        self.state[idx] = new_state
+        self.timer[idx] = 0
+        # FAILSAFE: Force inputs immediately on transition
+        if new_state == HEATING:
+            self.power[idx] = HEATING_POWER
+        elif new_state == QUENCH:
+            self.pressure[idx] = 3.5
+            self.flow[idx] = QUENCH_FLOW_TARGET
+        elif new_state == DOWN:
+            self.ng_reason[idx] = None
+
+    @staticmethod
+    def _new_part_id() -> str:
+        return f"PART-{str(uuid.uuid4())[:8].upper()}"
+
+    # --- Tick ---
+
+    def step(self):
+        """Advances every machine by one tick (one MachineState.update each)."""
+        self.ticks += 1
+        self.timer += 1
+        self.time_manager.tick()
+
+        # Branch masks use the state at the START of the tick (if/elif chain)
+        state = self.state
+        loading = np.flatnonzero(state == LOADING)
+        heating_done = np.flatnonzero((state == HEATING) & (self.temp >= HEATING_TARGET_TEMP))
+        quench_done = np.flatnonzero((state == QUENCH) & (self.temp <= QUENCH_END_TEMP))
+        unloading = np.flatnonzero(state == UNLOADING)
+
+        # --- 1. State Logic ---
+        if loading.size:
+            self.peak_power[loading] = 0.0
+            self.peak_flow[loading] = 0.0
+            self.peak_pressure[loading] = 0.0
+            self.peak_scan_speed[loading] = 0.0
+            self.peak_temp_speed[loading] = 0.0
+            self.peak_quench_temp[loading] = 25.0
+            self.peak_part_temp[loading] = 0.0
+            self.ng_reason[loading] = None
+            self._transition(loading, HEATING)
+
+        self._transition(heating_done, QUENCH)
+        self._transition(quench_done, UNLOADING)
+
+        if unloading.size:
+            self._finish_parts(unloading)
+
+        # --- 2. Physics & Drift Simulation ---
+        self._apply_physics_inputs()
+        self._apply_drift()
+
+        heating = self.state == HEATING
+        quench = self.state == QUENCH
+        drift_qwt = self.drift_param == DRIFT_QUENCH_WATER_TEMP
+
+        # Capture Peak Values (AFTER drift applied)
+        np.maximum(self.peak_power, self.power, out=self.peak_power, where=heating)
+        np.maximum(self.peak_scan_speed, self.scan_speed, out=self.peak_scan_speed, where=heating)
+        np.maximum(self.peak_part_temp, self.temp, out=self.peak_part_temp, where=heating)
+
+        np.maximum(self.peak_flow, self.flow, out=self.peak_flow, where=quench)
+        np.maximum(self.peak_pressure, self.pressure, out=self.peak_pressure, where=quench)
+        np.maximum(self.peak_temp_speed, self.temp_speed, out=self.peak_temp_speed, where=quench)
+        base_q = self.quench_water_temp_base + np.where(drift_qwt, self.accumulated_drift, 0.0)
+        self.peak_quench_temp = np.where(quench, np.maximum(0.0, base_q), self.peak_quench_temp)
+
+        # Water Temp for Physics (Base + Drift + Override)
+        q_temp = np.where(np.isnan(self.override_quench_temp), base_q, self.override_quench_temp)
+        np.maximum(self.peak_quench_temp, q_temp, out=self.peak_quench_temp, where=quench)
+
+        self._update_thermal(q_temp)
+
+        # --- WATCHDOG: Force progression if stuck ---
+        stuck = self.timer > WATCHDOG_TICKS
+        stuck_heating = np.flatnonzero((self.state == HEATING) & stuck)
+        stuck_quench = np.flatnonzero((self.state == QUENCH) & stuck)
+        self._transition(stuck_heating, QUENCH)
+        self._transition(stuck_quench, UNLOADING)
+
+        self._critical_check()
+
+    def run(self, ticks: int):
+        """Steps the whole fleet `ticks` times."""
+        for _ in range(ticks):
+            self.step()
+
+    def _apply_physics_inputs(self):
+        heating = self.state == HEATING
+        quench = self.state == QUENCH
+        n_quench = int(quench.sum())
+
+        self.power[:] = np.where(heating, HEATING_POWER, 0.0)
+        self.scan_speed[:] = np.where(heating, HEATING_SCAN_SPEED, np.where(quench, QUENCH_SCAN_SPEED, 0.0))
+        self.temp_speed[:] = np.where(quench, QUENCH_TEMP_SPEED, 0.0)
+        self.flow[:] = 0.0
+        self.pressure[:] = 0.0
+        if n_quench:
+            self.flow[quench] = self.rng.uniform(QUENCH_FLOW_TARGET - 2.0, QUENCH_FLOW_TARGET + 2.0, n_quench)
+            self.pressure[quench] = self.rng.uniform(3.4, 3.6, n_quench)
+
+    def _apply_drift(self):
+        active = self.drift_param != DRIFT_NONE
+        if not active.any():
+            return
+        self.accumulated_drift += np.where(active, self.drift_rate, 0.0)
+        d = self.accumulated_drift
+        p = self.drift_param
+
+        m = p == DRIFT_PRESSURE
+        self.pressure[m] = np.clip(self.pressure[m] + d[m], 0.0, 10.0)
+        m = p == DRIFT_FLOW
+        self.flow[m] = np.clip(self.flow[m] + d[m], 0.0, 250.0)
+        m = p == DRIFT_POWER
+        self.power[m] = np.clip(self.power[m] + d[m], 0.0, 100.0)
+        m = p == DRIFT_SCAN_SPEED
+        self.scan_speed[m] = np.clip(self.scan_speed[m] + d[m], 0.0, 20.0)
+        # quench_water_temp is a virtual sensor, handled in step()
+
+    def _update_thermal(self, water_temp: np.ndarray):
+        """ThermalModel.update for every machine at once."""
+        heat_gain = self.C_HEAT * self.power
+        delta_t_factor = np.maximum(0.0, (self.temp - water_temp) / (850.0 - 25.0))
+        heat_loss_quench = self.C_COOL * self.flow * delta_t_factor
+        natural_cooling = self.C_LOSS * (self.temp - self.ambient_temp)
+
+        self.temp += heat_gain - heat_loss_quench - natural_cooling
+        if self.noise_enabled:
+            self.temp += self.rng.uniform(-0.5, 0.5, self.n)
+        np.maximum(self.temp, self.ambient_temp, out=self.temp)
+
+    # --- Sensors ---
+
+    def _sensor_values(self, idx: np.ndarray) -> Dict[str, np.ndarray]:
+        """Noisy, rounded readings as produced by MachineState.get_telemetry_dict."""
+        k = idx.size
+        power, flow, pressure = self.power[idx], self.flow[idx], self.pressure[idx]
+        if self.noise_enabled:
+            w = np.where(power > 0, self.rng.normal(0, 0.5, k), 0.0)
+            f = np.where(flow > 0, self.rng.normal(0, 2.0, k), 0.0)
+            p = np.where(pressure > 0, self.rng.normal(0, 0.05, k), 0.0)
+            q_noise = self.rng.uniform(-0.2, 0.2, k)
+        else:
+            w = f = p = q_noise = np.zeros(k)
+
+        drift_qwt = self.drift_param[idx] == DRIFT_QUENCH_WATER_TEMP
+        q_temp = self.quench_water_temp_base[idx] + np.where(drift_qwt, self.accumulated_drift[idx], 0.0)
+        override = self.override_quench_temp[idx]
+        q_temp = np.where(np.isnan(override), q_temp + q_noise, override)
+
+        # Update Peak (Internal tracking, like every MachineState.read_telemetry)
+        self.peak_quench_temp[idx] = np.maximum(self.peak_quench_temp[idx], q_temp)
+
+        return {
+            "temp": np.round(self.temp[idx], 2),
+            "quench_water_temp": np.round(q_temp, 2),
+            "power": np.round(power + w, 1),
+            "flow": np.round(flow + f, 1),
+            "pressure": np.round(pressure + p, 2),
+            "coil_scan_speed": self.scan_speed[idx],
+        }
+
+    def _telemetry_row(self, i: int, sensors: Dict[str, np.ndarray], j: int) -> Dict:
+        """Builds one MachineState-style telemetry dict (only for emitted rows)."""
+        shift_info = self.time_manager.get_shift_info()
+        is_down = self.state[i] == DOWN
+        return {
+            "timer": int(self.timer[i]),
+            "temp": float(sensors["temp"][j]),
+            "quench_water_temp": float(sensors["quench_water_temp"][j]),
+            "peak_part_temp": float(self.peak_part_temp[i]),
+            "power": float(sensors["power"][j]),
+            "flow": float(sensors["flow"][j]),
+            "pressure": float(sensors["pressure"][j]),
+            "coil_scan_speed": float(self.scan_speed[i]),
+            "tempering_speed": float(self.temp_speed[i]),
+            "state": STATE_NAMES[self.state[i]],
+            "timestamp_sim_raw": self.time_manager.current_time,
+            "shift_id": shift_info["shift_id"],
+            "operator_id": shift_info["operator_id"],
+            "part_id": self.part_id[i],
+            "ok_count": int(self.ok_count[i]),
+            "ng_count": int(self.ng_count[i]),
+            "coil_life": int(self.coil_life[i]),
+            "downtime_reason": self.downtime_reason[i] if is_down else None,
+            "repair_time": float(self.repair_time_remaining[i]) if is_down else 0.0,
+            "ng_reason": self.ng_reason[i],
+        }
+
+    def _apply_peaks(self, row: Dict, i: int):
+        row['power'] = float(self.peak_power[i])
+        row['flow'] = float(self.peak_flow[i])
+        row['pressure'] = float(self.peak_pressure[i])
+        row['coil_scan_speed'] = float(self.peak_scan_speed[i])
+        row['tempering_speed'] = float(self.peak_temp_speed[i])
+        row['peak_part_temp'] = float(self.peak_part_temp[i])
+        row['quench_water_temp'] = float(self.peak_quench_temp[i])
+        row['coil_life'] = int(self.coil_life[i])
+
+    def _emit(self, i: int, row: Dict):
+        self._completed.append(telemetry_row(row, self.sim_run_ids[i], timestamp=row['timestamp_sim_raw']))
+
+    def _break_down(self, i: int, report: HealthBatch, j: int, reason: str):
+        """Machine i goes DOWN on row j of a check_health_batch report."""
+        self.failure_managers[i].record(STATUS_DOWN, reason)
+        self.downtime_reason[i] = reason
+        self.repair_time_remaining[i] = float(report.rules.down[int(report.reason_code[j])].repair_time)
+        self.ng_count[i] += 1
+
+    # --- Quality / Safety ---
+
+    def _finish_parts(self, idx: np.ndarray):
+        """UNLOADING branch: count the part, grade it, loop back to LOADING."""
+        self.cycle_count[idx] += 1
+        self.coil_life[idx] -= 1
+
+        sensors = self._sensor_values(idx)
+        # Graded on PEAK values, like MachineState (one batch for every finished part)
+        report = self.health.check_health_batch({
+            "state": _STATE_NAME_ARRAY[self.state[idx]],
+            "timer": self.timer[idx],
+            "temp": sensors["temp"],
+            "power": self.peak_power[idx],
+            "flow": self.peak_flow[idx],
+            "pressure": self.peak_pressure[idx],
+            "coil_scan_speed": self.peak_scan_speed[idx],
+            "peak_part_temp": self.peak_part_temp[idx],
+            "quench_water_temp": self.peak_quench_temp[idx],
+            "coil_life": self.coil_life[idx],
+        })
+
+        next_loading, down = [], []
+        for j, i in enumerate(idx):
+            status = report.status[j]
+            reason = report.reason(j) if status else None
+            finished_part_id = self.part_id[i]
+
+            if status == STATUS_DOWN:
+                self._break_down(i, report, j, reason)
+                down.append(i)
+                continue
+            self.failure_managers[i].record(status, reason)
+            if status == STATUS_NG:
+                self.ng_count[i] += 1
+                self.ng_reason[i] = reason
+            else:
+                self.ok_count[i] += 1
+
+            row = self._telemetry_row(i, sensors, j)
+            self._apply_peaks(row, i)
+            row['state'] = "COMPLETED"
+            row['part_id'] = finished_part_id
+            row['ng_reason'] = self.ng_reason[i]
+            self._emit(i, row)
+
+            self.part_id[i] = self._new_part_id()
+            next_loading.append(i)
+
+        self._transition(np.asarray(down, dtype=np.int64), DOWN)
+        self._transition(np.asarray(next_loading, dtype=np.int64), LOADING)
+
+    def _critical_check(self):
+        """
+        FailureManager's E-Stop rules for every machine in HEATING/QUENCH in
+        one check_health_batch pass; reasons are formatted only for machines
+        going DOWN.
+        """
+        active = np.flatnonzero((self.state == HEATING) | (self.state == QUENCH))
+        if active.size == 0:
+            return
+        s = self._sensor_values(active)
+        report = self.health.check_health_batch({
+            **s,
+            "state": _STATE_NAME_ARRAY[self.state[active]],
+            "timer": self.timer[active],
+            "peak_part_temp": self.peak_part_temp[active],
+            "coil_life": self.coil_life[active],
+        })
+        for j in report.down:
+            i = active[j]
+            reason = report.reason(j)
+            self._break_down(i, report, j, reason)
+            self._transition(np.array([i]), DOWN)
+
+            row = self._telemetry_row(i, s, j)
+            self._apply_peaks(row, i)
+            row['state'] = "DOWN"
+            row['downtime_reason'] = reason
+            row['ng_reason'] = f"PROCESS FAILURE: {reason}"
+            self._emit(i, row)
+
+    # --- Output ---
+
+    def drain_completed(self) -> List[Dict]:
+        """
+        Returns (and clears) the finished-part / breakdown rows since the last
+        call, as Telemetry rows stamped with the simulation clock.
+        """
+        rows, self._completed = self._completed, []
+        return rows
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Column view of the current fleet state (copies)."""
+        return {
+            "state": self.state.copy(),
+            "timer": self.timer.copy(),
+            "temp": self.temp.copy(),
+            "power": self.power.copy(),
+            "flow": self.flow.copy(),
+            "pressure": self.pressure.copy(),
+            "coil_scan_speed": self.scan_speed.copy(),
+            "tempering_speed": self.temp_speed.copy(),
+            "accumulated_drift": self.accumulated_drift.copy(),
+            "ok_count": self.ok_count.copy(),
+            "ng_count": self.ng_count.copy(),
+            "coil_life": self.coil_life.copy(),
+        }
+
+    def state_names(self) -> List[str]:
+        return [STATE_NAMES[s] for s in self.state]
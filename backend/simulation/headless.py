@@ -0,0 +1,332 @@
+"""
+Headless Runner
+Drives the real MachineState / ThermalModel / FailureManager loop without the
+live thread's 0.2 s sleep, so physics-faithful telemetry is produced at CPU
+speed instead of wall-clock speed.
+
+- Each tick still advances the simulation clock by one second; rows are
+  stamped with that clock (not datetime.now()).
+- `speed` sets the time compression in simulated seconds per wall second
+  (the live dashboard runs at 5). None runs as fast as possible.
+- Breakdowns are auto-repaired after the FailureManager's repair time has
+  elapsed on the simulation clock, then production restarts.
+- Discrete-event clock: repairs, optional random fault arrivals and optional
+  fixed-rate telemetry samples are events on an EventQueue. While the machine
+  is DOWN nothing else happens, so the clock jumps straight to the next event
+  (MachineState.skip_ticks) instead of ticking through the repair time: run
+  cost follows production ticks and events, not simulated downtime.
+- Finished parts and breakdowns go through insert_telemetry_rows (the same
+  chunked bulk path as the live persistence worker). Writing a batch overlaps
+  with simulating the next one.
+- FleetRunner does the same for N machines at once on a FleetEngine (one
+  array step per tick for the whole fleet), machine k writing under
+  sim_run_id + k.
+"""
+
+import asyncio
+import logging
+import math
+import random
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from backend.database import engine
+from backend.simulation.bulk_insert import insert_telemetry_rows
+from backend.simulation.events import FAULT, REPAIR_DONE, SAMPLE, Event, EventQueue
+from backend.simulation.fleet import DOWN, FleetEngine
+from backend.simulation.machine import MachineState
+from backend.simulation.persistence import telemetry_row
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_TICKS = 5000  # Ticks simulated between DB writes
+TICKS_PER_MINUTE = 60  # One tick = one simulated second; repair times are in minutes
+FAULT_TYPES = ('hose_burst', 'pump_failure', 'power_surge', 'servo_jam', 'cooling_fail')
+
+
+class RowCollector:
+    """
+    Stands in for SimulationPersistence on a headless machine: buffers rows
+    stamped with the simulation clock until the runner writes them.
+    """
+    def __init__(self, sim_run_id: int = 1):
+        self.sim_run_id = sim_run_id
+        self.rows: List[Dict] = []
+
+    def enqueue_telemetry(self, telemetry_data):
+        self.rows.append(telemetry_row(
+            telemetry_data, self.sim_run_id, timestamp=telemetry_data.get('timestamp_sim_raw')
+        ))
+
+    def drain(self) -> List[Dict]:
+        rows, self.rows = self.rows, []
+        return rows
+
+
+class HeadlessRunner:
+    """
+    Runs a private MachineState (independent of the live dashboard machine).
+    """
+    def __init__(self, sim_run_id: int = 1, start_time: Optional[datetime] = None,
+                 speed: Optional[float] = None, auto_repair: bool = True,
+                 seed: Optional[int] = None, fault_every: Optional[float] = None,
+                 sample_every: Optional[int] = None,
+                 sampler: Optional[Callable[[Dict], None]] = None):
+        """
+        fault_every:  mean simulated seconds between random injected faults
+                      (Poisson arrivals; None = no faults)
+        sample_every: call `sampler` with a telemetry snapshot every this many
+                      ticks (None = only finished parts / breakdowns are emitted)
+        """
+        if seed is not None:
+            # MachineState draws its noise from the module-level RNG
+            random.seed(seed)
+
+        self.machine = MachineState()
+        self.collector = RowCollector(sim_run_id)
+        self.machine.persistence = self.collector
+        self.machine.risk.tick_seconds = 1.0  # One tick = one simulated second here
+        if start_time is not None:
+            self.machine.time_manager.sim_start_time = start_time
+            self.machine.time_manager.current_time = start_time
+
+        self.speed = speed
+        self.auto_repair = auto_repair
+        self.fault_every = fault_every
+        self.sample_every = sample_every
+        self.sampler = sampler
+
+        # Run Metrics
+        self.ticks = 0
+        self.rows_written = 0
+        self.repairs = 0
+        self.faults = 0
+        self.events_fired = 0
+        self.down_ticks = 0
+        self.skipped_ticks = 0
+        self.sim_elapsed = 0.0
+        self.write_seconds = 0.0
+
+        # Event Schedule
+        self.events = EventQueue()
+        if fault_every:
+            self._schedule_fault()
+        if sample_every and sampler is not None:
+            self.events.schedule(sample_every, SAMPLE)
+
+    @property
+    def time_manager(self):
+        return self.machine.time_manager
+
+    def _schedule_fault(self):
+        self.events.schedule(self.ticks + max(1, math.ceil(random.expovariate(1.0 / self.fault_every))), FAULT)
+
+    def _fire(self, event: Event):
+        m = self.machine
+        self.events_fired += 1
+        if event.kind == REPAIR_DONE:
+            if m.state == m.DOWN:
+                self.down_ticks += 1  # The repair tick itself
+                m.repair()
+                self.repairs += 1
+        elif event.kind == FAULT:
+            if m.state != m.DOWN:
+                m.inject_fault(random.choice(FAULT_TYPES))
+                self.faults += 1
+            self._schedule_fault()
+        elif event.kind == SAMPLE:
+            self.sampler(m.get_telemetry_dict())
+            self.events.schedule(self.ticks + self.sample_every, SAMPLE)
+
+    def run_ticks(self, n: int) -> List[Dict]:
+        """Advances the machine `n` ticks (synchronously). Returns the rows produced."""
+        m = self.machine
+        events = self.events
+        end = self.ticks + n
+        while self.ticks < end:
+            # 1. Fire every event due now
+            event = events.pop_due(self.ticks)
+            while event is not None:
+                self._fire(event)
+                event = events.pop_due(self.ticks)
+
+            # 2. DOWN: nothing happens until the next event, jump straight to it
+            if m.state == m.DOWN:
+                k = int(min(events.next_time(), end)) - self.ticks
+                if k > 0:
+                    m.skip_ticks(k)
+                    if self.auto_repair:
+                        m.repair_time_remaining -= k / TICKS_PER_MINUTE  # Minutes left, as persisted
+                    self.ticks += k
+                    self.down_ticks += k
+                    self.skipped_ticks += k
+                    continue
+
+            # 3. Producing: one tick
+            if m.state == m.IDLE:
+                m.start_cycle()
+            m.update()
+            self.ticks += 1
+            if m.state == m.DOWN and self.auto_repair:
+                # Repaired at the start of the tick its repair time runs out on
+                events.cancel(REPAIR_DONE)
+                repair_ticks = math.ceil(m.repair_time_remaining * TICKS_PER_MINUTE)
+                events.schedule(self.ticks + repair_ticks - 1, REPAIR_DONE)
+        return self.collector.drain()
+
+    async def _write(self, rows: List[Dict]):
+        start = time.perf_counter()
+        async with engine.begin() as conn:
+            self.rows_written += await insert_telemetry_rows(conn, rows)
+        self.write_seconds += time.perf_counter() - start
+
+    async def run(self, ticks: int, batch_ticks: int = DEFAULT_BATCH_TICKS, persist: bool = True) -> Dict:
+        """
+        Simulates `ticks` ticks (= simulated seconds) and persists the output.
+        Returns a report with ticks/sec and row counts.
+        """
+        start_clock = self.time_manager.current_time
+        start_ticks = self.ticks
+        logger.info("🏎️ HEADLESS RUN: %s ticks (speed=%s, batch=%s ticks)",
+                    ticks, f"{self.speed}x" if self.speed else "max", batch_ticks)
+
+        if self.speed:
+            # Paced runs simulate about one wall second's worth of ticks per batch
+            batch_ticks = max(1, min(batch_ticks, int(self.speed)))
+
+        pending: Optional[asyncio.Task] = None
+        start = time.perf_counter()
+        done = 0
+        try:
+            while done < ticks:
+                n = min(batch_ticks, ticks - done)
+                # 1. Simulate off the event loop so the previous write can proceed
+                rows = await asyncio.to_thread(self.run_ticks, n)
+                done += n
+
+                # 2. Hand the batch to the writer (one batch in flight at a time)
+                if pending is not None:
+                    await pending
+                    pending = None
+                if persist and rows:
+                    pending = asyncio.create_task(self._write(rows))
+
+                # 3. Time compression: hold back to `speed` simulated seconds per wall second
+                if self.speed:
+                    ahead = done / self.speed - (time.perf_counter() - start)
+                    if ahead > 0:
+                        await asyncio.sleep(ahead)
+        finally:
+            if pending is not None:
+                await pending
+
+        elapsed = time.perf_counter() - start
+        self.sim_elapsed = (self.time_manager.current_time - start_clock).total_seconds()
+        report = self.get_report(elapsed, self.ticks - start_ticks)
+        logger.info("🏁 HEADLESS RUN COMPLETE: %s ticks in %.2fs (%s ticks/sec)",
+                    report['ticks'], elapsed, f"{report['ticks_per_sec']:,.0f}")
+        return report
+
+    def get_report(self, elapsed: float, ticks: int) -> Dict:
+        m = self.machine
+        return {
+            "ticks": ticks,
+            "wall_seconds": round(elapsed, 3),
+            "ticks_per_sec": round(ticks / elapsed, 1) if elapsed > 0 else 0.0,
+            "sim_seconds": self.sim_elapsed,
+            "compression": round(self.sim_elapsed / elapsed, 1) if elapsed > 0 else 0.0,
+            "cycles": m.cycle_count,
+            "ok_count": m.ok_count,
+            "ng_count": m.ng_count,
+            "repairs": self.repairs,
+            "faults": self.faults,
+            "events": self.events_fired,
+            "down_ticks": self.down_ticks,
+            "skipped_ticks": self.skipped_ticks,
+            "rows_written": self.rows_written,
+            "write_seconds": round(self.write_seconds, 3),
+            "end_time": m.time_manager.current_time,
+        }
+
+
+class FleetRunner(HeadlessRunner):
+    """
+    Runs N private machines together on a FleetEngine, with the same clock,
+    auto-restart, auto-repair, pacing and write path as HeadlessRunner.
+    Random faults, samples and risk scoring stay single-machine features.
+    """
+    def __init__(self, n_machines: int, sim_run_id: int = 1, start_time: Optional[datetime] = None,
+                 speed: Optional[float] = None, auto_repair: bool = True, seed: Optional[int] = None):
+        self.fleet = FleetEngine(n_machines, seed=seed,
+                                 sim_run_ids=range(sim_run_id, sim_run_id + n_machines))
+        if start_time is not None:
+            self.fleet.time_manager.sim_start_time = start_time
+            self.fleet.time_manager.current_time = start_time
+
+        self.speed = speed
+        self.auto_repair = auto_repair
+        self.repair_ticks_left = np.zeros(self.fleet.n, dtype=np.int64)
+
+        # Run Metrics
+        self.ticks = 0
+        self.rows_written = 0
+        self.repairs = 0
+        self.down_ticks = 0
+        self.sim_elapsed = 0.0
+        self.write_seconds = 0.0
+
+    @property
+    def time_manager(self):
+        return self.fleet.time_manager
+
+    def run_ticks(self, n: int) -> List[Dict]:
+        """Advances every machine `n` ticks (synchronously). Returns the rows produced."""
+        fleet = self.fleet
+        for _ in range(n):
+            # 1. Repairs due this tick (same tick as HeadlessRunner's REPAIR_DONE)
+            down = fleet.state == DOWN
+            self.down_ticks += int(down.sum())
+            if self.auto_repair and down.any():
+                self.repair_ticks_left[down] -= 1
+                fleet.repair_time_remaining[down] -= 1 / TICKS_PER_MINUTE  # Minutes left, as persisted
+                due = np.flatnonzero(down & (self.repair_ticks_left <= 0))
+                if due.size:
+                    fleet.repair(due)
+                    self.repairs += int(due.size)
+
+            # 2. Producing: restart anything idle, one array step for the fleet
+            fleet.start()
+            was_down = fleet.state == DOWN
+            fleet.step()
+            self.ticks += 1
+
+            # 3. New breakdowns: repair time (minutes) -> ticks
+            if self.auto_repair:
+                broke = np.flatnonzero((fleet.state == DOWN) & ~was_down)
+                self.repair_ticks_left[broke] = np.ceil(fleet.repair_time_remaining[broke] * TICKS_PER_MINUTE)
+        return fleet.drain_completed()
+
+    def get_report(self, elapsed: float, ticks: int) -> Dict:
+        fleet = self.fleet
+        return {
+            "machines": fleet.n,
+            "ticks": ticks,
+            "wall_seconds": round(elapsed, 3),
+            "ticks_per_sec": round(ticks / elapsed, 1) if elapsed > 0 else 0.0,
+            "sim_seconds": self.sim_elapsed,
+            "compression": round(self.sim_elapsed / elapsed, 1) if elapsed > 0 else 0.0,
+            "cycles": int(fleet.cycle_count.sum()),
+            "ok_count": int(fleet.ok_count.sum()),
+            "ng_count": int(fleet.ng_count.sum()),
+            "repairs": self.repairs,
+            "faults": 0,
+            "events": 0,
+            "down_ticks": self.down_ticks,
+            "skipped_ticks": 0,
+            "rows_written": self.rows_written,
+            "write_seconds": round(self.write_seconds, 3),
+            "end_time": fleet.time_manager.current_time,
+        }
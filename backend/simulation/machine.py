@@ -1,10 +1,15 @@
 from backend.simulation.physics import ThermalModel
 from backend.simulation.time_manager import TimeManager
 from backend.simulation.failure_manager import FailureManager
+from backend.simulation.telemetry import TelemetryRecord
+from backend.ai.risk import RiskScorer
 from collections import deque
+import logging
 import random
 import uuid
 
+logger = logging.getLogger(__name__)
+
 class MachineState:
     """
     Manages the operational lifecycle of the machine (The Conductor).
@@ -23,11 +28,13 @@ class MachineState:
         self.physics = ThermalModel()
         self.time_manager = TimeManager() 
         self.failure_manager = FailureManager() 
+        self.risk = RiskScorer()  # Online drift detection -> ai_risk_score / ai_status
         
         # Live Event Log (FR-11)
         self.event_log = deque(maxlen=10) # Stores last 10 NG/DOWN events
         
         # Telemetry Snapshot
+        self.telemetry = TelemetryRecord()  # Reused for every check / row (see read_telemetry)
         self.current_power = 0.0
         self.current_flow = 0.0
         self.current_pressure = 0.0
@@ -71,13 +78,17 @@ class MachineState:
         # Override for Fault Injection
         self.override_quench_temp = None
         
+        # Registry id and live stream fan-out (set by MachineRegistry)
+        self.machine_id = 1
+        self.broadcaster = None
+        
     @property
     def current_part_id(self):
         return self._current_part_id
         
     @current_part_id.setter
     def current_part_id(self, value):
-        print(f"🕵️ PART ID CHANGED: {self._current_part_id} -> {value}")
+        logger.debug("🕵️ PART ID CHANGED: %s -> %s", self._current_part_id, value)
         self._current_part_id = value
     
     def update(self):
@@ -85,11 +96,53 @@ class MachineState:
         if self.is_fast_forwarding:
             return  # Do nothing - Fast Forward is generating data
         
+        self._step()
+        
+        # Push this tick's snapshot once to all stream subscribers
+        if self.broadcaster is not None and self.broadcaster.has_subscribers():
+            self.broadcaster.publish(self.get_status())
+
+    def skip_ticks(self, ticks: int):
+        """
+        Advances an IDLE / DOWN machine by `ticks` ticks at once, as `ticks`
+        update() calls would (clock, timer, drift, part cooling), in O(1).
+        Nothing else can happen in those states until something outside the
+        machine acts (repair, start_cycle), so discrete-event runners jump
+        straight to that event.
+        """
+        if self.state not in (self.IDLE, self.DOWN):
+            raise ValueError(f"skip_ticks needs an IDLE or DOWN machine, not {self.state}")
+        if self.is_fast_forwarding or ticks <= 0:
+            return
+
+        # Power / flow drift keeps feeding the physics while stopped: step it exactly
+        if self.active_drift['param'] in ('power', 'flow'):
+            for _ in range(ticks):
+                self._step()
+        else:
+            # 1. Clock
+            self.timer += ticks
+            self.time_manager.tick(ticks)
+
+            # 2. Inputs (all off) + drift keeps accumulating
+            self._apply_physics_inputs()
+            if self.active_drift['param']:
+                self.accumulated_drift += self.active_drift['rate'] * (ticks - 1)
+                self._apply_drift()
+
+            # 3. Part cools towards ambient (closed form)
+            self.physics.advance(ticks, self.current_power, self.current_flow)
+            self.risk.advance(ticks)
+
+        if self.broadcaster is not None and self.broadcaster.has_subscribers():
+            self.broadcaster.publish(self.get_status())
+
+    def _step(self):
         self.timer += 1
         self.time_manager.tick() 
         
         # DEBUG: Trace the heartbeat of the physics
-        print(f"💓 TICK: State={self.state} | Temp={self.physics.temp:.1f} | Power={self.current_power} | Timer={self.timer}", flush=True)
+        logger.debug("💓 TICK: State=%s | Temp=%.1f | Power=%s | Timer=%s", self.state, self.physics.temp, self.current_power, self.timer)
         
         # --- 1. State Logic ---
         if self.state == self.DOWN:
@@ -127,21 +180,14 @@ class MachineState:
                 self.transition_to(self.UNLOADING)
 
         elif self.state == self.UNLOADING:
-            print(f"🔄 CYCLE COMPLETE. Counters - OK: {self.ok_count}, NG: {self.ng_count}")
+            logger.debug("🔄 CYCLE COMPLETE. Counters - OK: %s, NG: %s", self.ok_count, self.ng_count)
             # Instant Unloading (Counter Increment)
             self.cycle_count += 1
             self.coil_life_counter -= 1 # REVERSED: Count DOWN from 200,000
             
             # Phase 7: Check Quality of the COMPLETED part using PEAK (Process) values
             # We must verify the parameters that were active DURING the cycle, not the 0.0s now.
-            final_check_data = self.get_telemetry_dict()
-            final_check_data['power'] = self.peak_power
-            final_check_data['flow'] = self.peak_flow
-            final_check_data['pressure'] = self.peak_pressure
-            final_check_data['coil_scan_speed'] = self.peak_scan_speed
-            final_check_data['tempering_speed'] = self.peak_temp_speed
-            final_check_data['peak_part_temp'] = self.peak_part_temp
-            final_check_data['quench_water_temp'] = self.peak_quench_temp
+            final_check_data = self._apply_peaks(self.read_telemetry())
             
             health_report = self.failure_manager.check_health(final_check_data, commit=True)
             
@@ -151,8 +197,9 @@ class MachineState:
             # --- SIMPLIFIED LOGIC: Continuous Flow ---
             # 1. Update Counters based on health
             if health_report['status'] == 'DOWN':
-                print(f"🛑 CRITICAL STOP: {health_report['reason']}")
+                logger.warning("🛑 CRITICAL STOP: %s", health_report['reason'])
                 self.downtime_reason = health_report['reason']
+                self.repair_time_remaining = float(health_report.get('repair_time', 0))  # minutes
                 self.ng_count += 1
                 
                 # LOG EVENT
@@ -167,7 +214,7 @@ class MachineState:
                 return # Stop here
                 
             elif health_report['status'] == 'NG':
-                print(f"⚠️ NG PART PRODUCED: {health_report['reason']}")
+                logger.info("⚠️ NG PART PRODUCED: %s", health_report['reason'])
                 self.ng_count += 1
                 self.ng_reason = health_report['reason']  # Store NG reason for DB
                 
@@ -191,33 +238,27 @@ class MachineState:
             # --- 4. PERSISTENCE & DEBUGGING ---
             
             # Detailed Console Report (User Request)
-            print(f"\n⚡ CYCLE FINISHED: {finished_part_id}")
-            print(f"   ├─ Status:  {health_report['status']}")
-            if health_report['reason']:
-                print(f"   ├─ Reason:  {health_report['reason']}")
-            print(f"   ├─ Stats:   OK={self.ok_count} | NG={self.ng_count}")
-            print(f"   └─ Params:  Temp={self.physics.temp:.1f}C | Press={self.current_pressure:.1f}Bar\n")
+            if logger.isEnabledFor(logging.INFO):
+                reason_line = f"\n   ├─ Reason:  {health_report['reason']}" if health_report['reason'] else ""
+                logger.info(
+                    "⚡ CYCLE FINISHED: %s\n   ├─ Status:  %s%s\n   ├─ Stats:   OK=%s | NG=%s\n   └─ Params:  Temp=%.1fC | Press=%.1fBar",
+                    finished_part_id, health_report['status'], reason_line,
+                    self.ok_count, self.ng_count, self.physics.temp, self.current_pressure
+                )
 
             if hasattr(self, 'persistence') and self.persistence:
                 # Capture the state at the moment of completion
-                data = self.get_telemetry_dict()
+                data = self.read_telemetry()
                 # Ensure it's marked as the finalized state
-                data['state'] = "COMPLETED" 
+                data.state = "COMPLETED" 
                 # FIX: Use the ID of the part that actually finished, not the new one
-                data['part_id'] = finished_part_id 
+                data.part_id = finished_part_id 
                 
                 # Override with PEAK values (captured during cycle, not end-of-cycle zeros)
-                data['power'] = self.peak_power
-                data['flow'] = self.peak_flow
-                data['pressure'] = self.peak_pressure
-                data['coil_scan_speed'] = self.peak_scan_speed
-                data['tempering_speed'] = self.peak_temp_speed
-                data['peak_part_temp'] = self.peak_part_temp # NEW: Pass this to check_health
-                data['quench_water_temp'] = self.peak_quench_temp
-                data['coil_life'] = self.coil_life_counter
+                self._apply_peaks(data)
                 
                 # Add NG Reason for parts that failed
-                data['ng_reason'] = self.ng_reason
+                data.ng_reason = self.ng_reason
                 
                 self.persistence.enqueue_telemetry(data)
 
@@ -264,6 +305,18 @@ class MachineState:
 
         self.physics.update(self.current_power, self.current_flow, water_temp=q_temp)
         
+        # AI: Score drift on the process values of this tick (O(1), active phases only)
+        if self.state == self.QUENCH or self.state == self.HEATING:
+            self.risk.update(self.state, {
+                "pressure": self.current_pressure,
+                "flow": self.current_flow,
+                "quench_water_temp": q_temp,
+                "power": self.current_power,
+                "scan_speed": self.current_scan_speed,
+            })
+        else:
+            self.risk.advance()  # Keep the scorer's clock on machine ticks
+        
         # MANUAL OVERRIDE: Clamp Temperature
         if self.manual_mode:
              # If physics put us over the limit, snap back down.
@@ -275,20 +328,21 @@ class MachineState:
         # If in HEATING/QUENCH for > 50 ticks (10s), something is wrong with physics (or manual limit stuck)
         if self.state in [self.HEATING, self.QUENCH] and self.timer > 50:
              msg = "⚠️ WATCHDOG" if not self.manual_mode else "ℹ️ MANUAL LIMIT TIMEOUT"
-             print(f"{msg}: Stuck in {self.state} for 10s. Forcing transition...")
+             logger.warning("%s: Stuck in %s for 10s. Forcing transition...", msg, self.state)
              if self.state == self.HEATING: self.transition_to(self.QUENCH)
              elif self.state == self.QUENCH: self.transition_to(self.UNLOADING)
 
         # Defensive: Ensure Part ID exists if we are running
         if self.state in [self.HEATING, self.QUENCH] and not self.current_part_id:
-             print("⚠️ DETECTED RUNNING STATE WITHOUT PART ID. REGENERATING...")
+             logger.warning("⚠️ DETECTED RUNNING STATE WITHOUT PART ID. REGENERATING...")
              self.current_part_id = f"PART-{str(uuid.uuid4())[:8].upper()}"
         
         if self.state in [self.HEATING, self.QUENCH]:
-             critical_check = self.failure_manager.check_health(self.get_telemetry_dict())
+             critical_check = self.failure_manager.check_health(self.read_telemetry(), safety_only=True)
              if critical_check['status'] == 'DOWN':
-                 print(f"🛑 E-STOP TRIGGERED: {critical_check['reason']}")
+                 logger.warning("🛑 E-STOP TRIGGERED: %s", critical_check['reason'])
                  self.downtime_reason = critical_check['reason']
+                 self.repair_time_remaining = float(critical_check.get('repair_time', 0))  # minutes
                  self.ng_count += 1 # FIX: Count this as a failed part
                  
                  # LOG EVENT
@@ -303,25 +357,17 @@ class MachineState:
                  
                  # FIX: Log the breakdown to the database immediately
                  if hasattr(self, 'persistence') and self.persistence:
-                     data = self.get_telemetry_dict()
-                     data['state'] = "DOWN"  # Ensure state is DOWN for the log
-                     data['downtime_reason'] = self.downtime_reason  # Explicitly include reason
-                     data['ng_reason'] = f"PROCESS FAILURE: {self.downtime_reason}"  # Assign reason to part
-                     data['power'] = self.peak_power
-                     data['flow'] = self.peak_flow
-                     data['pressure'] = self.peak_pressure
-                     data['coil_scan_speed'] = self.peak_scan_speed
-                     data['tempering_speed'] = self.peak_temp_speed
-                     data['peak_part_temp'] = self.peak_part_temp
-                     data['quench_water_temp'] = self.peak_quench_temp
-                     data['coil_life'] = self.coil_life_counter
+                     data = self.read_telemetry()
+                     data.state = "DOWN"  # Ensure state is DOWN for the log
+                     data.downtime_reason = self.downtime_reason  # Explicitly include reason
+                     data.ng_reason = f"PROCESS FAILURE: {self.downtime_reason}"  # Assign reason to part
+                     self._apply_peaks(data)
                      self.persistence.enqueue_telemetry(data)
-                     print(f"📝 BREAKDOWN LOGGED: {self.downtime_reason}")
+                     logger.info("📝 BREAKDOWN LOGGED: %s", self.downtime_reason)
 
     def _apply_physics_inputs(self):
         # DEBUG INPUTS (Verbose)
-        is_heating = (self.state == self.HEATING)
-        print(f"🔌 INPUTS: State='{self.state}' | MatchHEATING={is_heating} | PowerBefore={self.current_power}", flush=True)
+        logger.debug("🔌 INPUTS: State='%s' | MatchHEATING=%s | PowerBefore=%s", self.state, self.state == self.HEATING, self.current_power)
         
         if self.state == self.HEATING:
             self.current_power = 50.0 
@@ -354,7 +400,7 @@ class MachineState:
             
         # DEBUG: Ensure Flow is 0 in HEATING
         if self.state == self.HEATING and self.current_flow > 0.1:
-            print(f"⚠️ LEAK DETECTED: Flow={self.current_flow} in HEATING! Forcing to 0.")
+            logger.warning("⚠️ LEAK DETECTED: Flow=%s in HEATING! Forcing to 0.", self.current_flow)
             self.current_flow = 0.0
 
     def _apply_drift(self):
@@ -395,7 +441,7 @@ class MachineState:
         self.accumulated_drift = 0.0
         
         dir_str = "INCREASING" if direction > 0 else "DECREASING"
-        print(f"📉 DRIFT STARTED: {param} is {dir_str} at {rate}/tick...")
+        logger.info("📉 DRIFT STARTED: %s is %s at %s/tick...", param, dir_str, rate)
 
     def inject_fault(self, fault_type=None):
         """
@@ -407,28 +453,28 @@ class MachineState:
             # Jump to 4.2 -> Offset = 4.2 - 3.5 = +0.7
             self.active_drift = {"param": "pressure", "rate": 0.02}
             self.accumulated_drift = 0.7
-            print(f"💥 FAULT INJECTED: HOSE BURST (Offset +0.7 bar)")
+            logger.info("💥 FAULT INJECTED: HOSE BURST (Offset +0.7 bar)")
 
         elif fault_type == 'pump_failure':
             # Target: 120 LPM. NG < 80. DOWN < 50.
             # Jump to 75 -> Offset = 75 - 120 = -45
             self.active_drift = {"param": "flow", "rate": -0.5}
             self.accumulated_drift = -45.0
-            print(f"📉 FAULT INJECTED: PUMP FAILURE (Offset -45 LPM)")
+            logger.info("📉 FAULT INJECTED: PUMP FAILURE (Offset -45 LPM)")
 
         elif fault_type == 'power_surge':
             # Target: 50 kW. NG (unsafe high). DOWN > 80.
             # Jump to 65 -> Offset = 65 - 50 = +15
             self.active_drift = {"param": "power", "rate": 0.3}
             self.accumulated_drift = 15.0
-            print(f"⚡ FAULT INJECTED: POWER SURGE (Offset +15 kW)")
+            logger.info("⚡ FAULT INJECTED: POWER SURGE (Offset +15 kW)")
 
         elif fault_type == 'servo_jam':
             # Target: 10 (HEATING) or 8 (QUENCH). NG < 8. DOWN < 5.
             # Jump to 7 -> Offset = 7 - 10 = -3
             self.active_drift = {"param": "scan_speed", "rate": -0.05}
             self.accumulated_drift = -3.0
-            print(f"🛑 FAULT INJECTED: SERVO JAM (Offset -3 mm/s)")
+            logger.info("🛑 FAULT INJECTED: SERVO JAM (Offset -3 mm/s)")
 
         elif fault_type == 'cooling_fail':
             # Target: 26.5 C. NG > 32. DOWN > 50.
@@ -436,7 +482,7 @@ class MachineState:
             self.active_drift = {"param": "quench_water_temp", "rate": 0.3}
             self.accumulated_drift = 7.5
             self.override_quench_temp = None 
-            print(f"🔥 FAULT INJECTED: COOLING FAIL (Offset +7.5 C)")
+            logger.info("🔥 FAULT INJECTED: COOLING FAIL (Offset +7.5 C)")
             
         else:
             # Legacy Random Behavior
@@ -464,10 +510,12 @@ class MachineState:
         self.active_drift = {"param": "pressure", "rate": drift_rate}
         self.accumulated_drift = 0.0  # Start from normal (no jump)
         
-        print(f"🔴 SLOW LEAK STARTED (DEMO MODE): Pressure will decay at -0.75 Bar/min")
-        print(f"   ├─ Expected NG:   ~1 minute (pressure < 3.0 Bar)")
-        print(f"   ├─ Expected DOWN: ~2 minutes (pressure < 2.0 Bar)")
-        print(f"   └─ Drift Rate:    {drift_rate} Bar/tick")
+        logger.info(
+            "🔴 SLOW LEAK STARTED (DEMO MODE): Pressure will decay at -0.75 Bar/min\n"
+            "   ├─ Expected NG:   ~1 minute (pressure < 3.0 Bar)\n"
+            "   ├─ Expected DOWN: ~2 minutes (pressure < 2.0 Bar)\n"
+            "   └─ Drift Rate:    %s Bar/tick", drift_rate
+        )
 
     def repair(self):
         """
@@ -478,17 +526,19 @@ class MachineState:
         self.accumulated_drift = 0.0
         self.override_quench_temp = None # Clear override
         self.failure_manager.reset() # Clears consecutive NG count
+        self.risk.reset_trends() # Drift is gone; keep the learned baseline
         
         # If machine was DOWN, return to IDLE to allow restart.
         # If machine was RUNNING, it continues running but with corrected values.
         if self.state == self.DOWN:
             self.state = self.IDLE
-            print("🛠️ SIMULATION REPAIRED: Machine is now IDLE.")
+            self.repair_time_remaining = 0.0
+            logger.info("🛠️ SIMULATION REPAIRED: Machine is now IDLE.")
         else:
-            print("🛠️ SIMULATION REPAIRED: Hot Fix applied. Drift cleared.")
+            logger.info("🛠️ SIMULATION REPAIRED: Hot Fix applied. Drift cleared.")
 
     def transition_to(self, new_state):
-        print(f"🔀 TRANSITION: {self.state} -> {new_state}")
+        logger.debug("🔀 TRANSITION: %s -> %s", self.state, new_state)
         self.state = new_state
         self.timer = 0
         
@@ -508,11 +558,12 @@ class MachineState:
         Preserves counters (OK/NG) and Coil Life.
         Resets physics and active drifts.
         """
-        print("🛑 STOP COMMAND RECEIVED. Halting machine...")
+        logger.info("🛑 STOP COMMAND RECEIVED. Halting machine...")
         self.state = self.IDLE
         self.timer = 0
         self.physics = ThermalModel() # cool down
         self.active_drift = {"param": None, "rate": 0.0}
+        self.risk.reset_trends()
         self.current_power = 0.0
         self.current_flow = 0.0
         self.current_pressure = 0.0
@@ -527,6 +578,7 @@ class MachineState:
         self.timer = 0
         self.time_manager.reset()
         self.failure_manager.reset()
+        self.risk.reset()
         self.physics = ThermalModel()
         self.active_drift = {"param": None, "rate": 0.0}
         self.coil_life_counter = 200000
@@ -539,12 +591,12 @@ class MachineState:
         self.current_pressure = 0.0
         self.current_part_id = "READY"
         self.downtime_reason = None
-        print("SYSTEM RESET: Machine state and counters fully cleared.")
+        logger.info("SYSTEM RESET: Machine state and counters fully cleared.")
 
     def start_cycle(self):
         if self.state == self.IDLE:
             self.current_part_id = f"PART-{str(uuid.uuid4())[:8].upper()}"
-            print(f"🟢 STARTING NEW CYCLE. Part ID: {self.current_part_id}")
+            logger.info("🟢 STARTING NEW CYCLE. Part ID: %s", self.current_part_id)
             self.transition_to(self.LOADING)
 
     def get_status(self):
@@ -552,21 +604,26 @@ class MachineState:
         return {
             "state": self.state,
             "telemetry": self.get_telemetry_dict(shift_info),
+            "risk": self.risk.snapshot(),
             "event_log": list(self.event_log) # FR-11: Expose Live Log
         }
 
     def get_telemetry_dict(self, shift_info=None):
+        """Current telemetry as a plain dict (API / JSON boundary)."""
+        return self.read_telemetry(shift_info).to_dict()
+
+    def read_telemetry(self, shift_info=None) -> TelemetryRecord:
+        """
+        Refills this machine's TelemetryRecord with the current (noisy) readings
+        and returns it. The record is reused: callers that keep it past the
+        current tick must copy() it.
+        """
         if not shift_info: shift_info = self.time_manager.get_shift_info()
         
-        noise = {
-            "p": random.gauss(0, 0.05) if self.current_pressure > 0 else 0, 
-            "f": random.gauss(0, 2.0) if self.current_flow > 0 else 0,     
-            "w": random.gauss(0, 0.5) if self.current_power > 0 else 0      
-        }
+        noise_p = random.gauss(0, 0.05) if self.current_pressure > 0 else 0
+        noise_f = random.gauss(0, 2.0) if self.current_flow > 0 else 0
+        noise_w = random.gauss(0, 0.5) if self.current_power > 0 else 0
 
-        # Calculate Virtual Quench Temp (Base + Drift)
-        # Telemetry Construction
-        
         # Calculate Quench Water Temp (Virtual)
         # Base + Drift + Noise
         q_temp = self.quench_water_temp_base
@@ -582,38 +639,54 @@ class MachineState:
         # Update Peak (Internal tracking)
         if q_temp > self.peak_quench_temp: self.peak_quench_temp = q_temp
 
-        return {
-                "timer": self.timer,
-                "temp": round(self.physics.temp, 2),
-                "quench_water_temp": round(q_temp, 2), # Virtual sensor
-                "peak_part_temp": self.peak_part_temp, 
-                "power": round(self.current_power + noise['w'], 1),
-                "flow": round(self.current_flow + noise['f'], 1),
-                "pressure": round(self.current_pressure + noise['p'], 2),
-                "coil_scan_speed": self.current_scan_speed, 
-                "tempering_speed": self.current_temp_speed,
-                "state": self.state,
-                "sim_run_id": "LIVE-VIEW",
-                "timestamp_sim": self.time_manager.get_clock(),
-                "timestamp_sim_raw": self.time_manager.current_time,
-                "shift_id": shift_info["shift_id"],
-                "operator_id": shift_info["operator_id"],
-                "part_id": self.current_part_id,
-                "ok_count": self.ok_count,
-                "ng_count": self.ng_count,
-                "coil_life": int(self.coil_life_counter),
-                
-                "downtime_reason": self.downtime_reason if self.state == self.DOWN else None,
-                "repair_time": self.repair_time_remaining if self.state == self.DOWN else 0.0,
-                "ng_reason": self.ng_reason
-        }
+        # Telemetry Construction (in place)
+        is_down = self.state == self.DOWN
+        t = self.telemetry
+        t.timer = self.timer
+        t.temp = round(self.physics.temp, 2)
+        t.quench_water_temp = round(q_temp, 2) # Virtual sensor
+        t.peak_part_temp = self.peak_part_temp
+        t.power = round(self.current_power + noise_w, 1)
+        t.flow = round(self.current_flow + noise_f, 1)
+        t.pressure = round(self.current_pressure + noise_p, 2)
+        t.coil_scan_speed = self.current_scan_speed
+        t.tempering_speed = self.current_temp_speed
+        t.state = self.state
+        t.timestamp_sim_raw = self.time_manager.current_time
+        t.day_count = self.time_manager.day_count
+        t.shift_id = shift_info["shift_id"]
+        t.operator_id = shift_info["operator_id"]
+        t.part_id = self.current_part_id
+        t.ok_count = self.ok_count
+        t.ng_count = self.ng_count
+        t.coil_life = int(self.coil_life_counter)
+        t.downtime_reason = self.downtime_reason if is_down else None
+        t.repair_time = self.repair_time_remaining if is_down else 0.0
+        t.ng_reason = self.ng_reason
+
+        # AI Prediction (Early Downtime Detection)
+        t.ai_risk_score = round(self.risk.score, 4)
+        t.ai_status = self.risk.status
+        return t
+
+    def _apply_peaks(self, data: TelemetryRecord) -> TelemetryRecord:
+        """Swaps the end-of-cycle readings for the PEAK values captured during the cycle."""
+        data.power = self.peak_power
+        data.flow = self.peak_flow
+        data.pressure = self.peak_pressure
+        data.coil_scan_speed = self.peak_scan_speed
+        data.tempering_speed = self.peak_temp_speed
+        data.peak_part_temp = self.peak_part_temp
+        data.quench_water_temp = self.peak_quench_temp
+        data.coil_life = self.coil_life_counter
+        return data
 
     def force_sync_counters(self, ok_count, ng_count, coil_life):
         """
         Explicitly updates internal counters to match an external source (e.g. Fast Forward).
         Prevents the machine from reverting to old counts when it resumes.
         """
-        print(f"🔄 SYNCING COUNTERS: OK {self.ok_count}->{ok_count} | NG {self.ng_count}->{ng_count} | Coil {self.coil_life_counter}->{coil_life}")
+        logger.info("🔄 SYNCING COUNTERS: OK %s->%s | NG %s->%s | Coil %s->%s", self.ok_count, ok_count, self.ng_count, ng_count, self.coil_life_counter, coil_life)
         self.ok_count = int(ok_count)
         self.ng_count = int(ng_count)
         self.coil_life_counter = int(coil_life)
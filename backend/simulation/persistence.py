@@ -1,97 +1,193 @@
-from sqlalchemy.ext.asyncio import AsyncSession
-from backend.database import get_db, AsyncSessionLocal
-from backend.models import SimRun, Telemetry
+from backend.database import engine
+from backend.simulation.bulk_insert import insert_telemetry_rows
 from datetime import datetime
+from typing import Dict, List, Optional
 import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Micro-batch triggers: whichever comes first
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_FLUSH_INTERVAL = 0.25  # seconds
+
+
+def telemetry_row(data: Dict, sim_run_id: int = 1, timestamp: Optional[datetime] = None) -> Dict:
+    """
+    Maps a MachineState telemetry dict onto Telemetry column names,
+    ready for insert_telemetry_rows. `timestamp` defaults to wall-clock now
+    (live mode); headless runs pass the simulation clock instead.
+    """
+    return {
+        # Using a fixed ID=1 for "Live Dashboard" bucket
+        'sim_run_id': sim_run_id,
+        'timestamp_sim': timestamp or datetime.now(),  # Use Local System Time (matches UI)
+        'induction_power': float(data.get('power', 0.0)),
+        'quench_water_temp': float(data.get('quench_water_temp', 25.0)),
+        'quench_water_flow': float(data.get('flow', 0.0)),
+        'quench_pressure': float(data.get('pressure', 0.0)),
+        'coil_scan_speed': float(data.get('coil_scan_speed', 0.0)),
+        'tempering_speed': float(data.get('tempering_speed', 0.0)),
+        'part_temp': float(data.get('peak_part_temp', 0.0)),
+        'state': data.get('state', 'UNKNOWN'),
+
+        # Identity
+        'part_id': data.get('part_id'),
+        'shift_id': data.get('shift_id'),
+        'operator_id': data.get('operator_id'),
+
+        # Counters
+        'coil_life_counter': int(data.get('coil_life', 0)),
+        'ok_count': int(data.get('ok_count', 0)),
+        'ng_count': int(data.get('ng_count', 0)),
+
+        # Failure - NG Reason is the physical defect reason
+        'is_anomaly': data.get('ng_reason') is not None or data.get('downtime_reason') is not None,
+        'downtime_reason': data.get('downtime_reason'),
+        'ng_reason': data.get('ng_reason'),
+        'repair_time': float(data.get('repair_time', 0.0)),
+
+        # AI Prediction (online risk scorer)
+        'ai_risk_score': data.get('ai_risk_score'),
+        'ai_status': data.get('ai_status'),
+    }
+
 
 class SimulationPersistence:
     """
     Bridge between Sync Simulation Logic and Async Database.
-    Runs a worker loop to consume telemetry/events from a queue.
+    Runs a worker loop that drains the queue into micro-batches
+    (up to `batch_size` rows or `flush_interval` seconds) and writes each
+    batch with a single chunked executemany in one transaction.
     """
-    def __init__(self):
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
         self.queue = asyncio.Queue()
         self.is_running = False
         self._main_loop = None  # Store reference to main event loop
-        
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # Worker Metrics
+        self.rows_written = 0
+        self.batches_written = 0
+        self.failed_rows = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.last_commit_ms = 0.0
+        self.max_commit_ms = 0.0
+        self.total_commit_ms = 0.0
+        self.max_queue_depth = 0
+
     async def start_worker(self):
         self.is_running = True
         self._main_loop = asyncio.get_running_loop()  # Capture the correct loop
-        print("💾 DB WORKER STARTED (Event Loop captured)")
+        logger.info("💾 DB WORKER STARTED (Event Loop captured, batch=%s, interval=%.0fms)",
+                    self.batch_size, self.flush_interval * 1000)
         while self.is_running:
-            item = await self.queue.get()
-            if item is None: break
-            
+            batch, stop = await self._next_batch()
+
+            if batch:
+                try:
+                    await self._save_batch(batch)
+                    logger.debug("💾 SAVED BATCH TO DB: %s rows", len(batch))
+                except Exception as e:
+                    self.failed_rows += len(batch)
+                    logger.exception("❌ DB SAVE ERROR (%s rows dropped): %s", len(batch), e)
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
+
+            if stop:
+                break
+
+    async def _next_batch(self):
+        """
+        Blocks for the first row, then keeps collecting until the batch is
+        full or the flush interval has elapsed. Returns (rows, stop_requested).
+        """
+        item = await self.queue.get()
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize() + 1)
+        if item is None:
+            self.queue.task_done()
+            return [], True
+
+        batch = [item]
+        deadline = self._main_loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
             try:
-                await self._save_to_db(item)
-                print(f"💾 SAVED TO DB: {item.get('part_id', 'unknown')}")
-            except Exception as e:
-                print(f"❌ DB SAVE ERROR: {e}")
-                import traceback
-                traceback.print_exc()
-            finally:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - self._main_loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            if item is None:
                 self.queue.task_done()
-                
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
     async def stop_worker(self):
         self.is_running = False
         await self.queue.put(None)
-    
+
     async def flush(self):
         """Wait for all queued items to be processed."""
         if self.queue.qsize() > 0:
-            print(f"🔄 FLUSH: Waiting for {self.queue.qsize()} items to drain...")
+            logger.info("🔄 FLUSH: Waiting for %s items to drain...", self.queue.qsize())
             await self.queue.join()
-            print("✅ FLUSH: Queue drained")
-        
-    def enqueue_telemetry(self, telemetry_data):
+            logger.info("✅ FLUSH: Queue drained")
+
+    def enqueue_telemetry(self, telemetry_data, sim_run_id: int = 1):
         # Called from Sync Logic (potentially from another thread)
         try:
             if self._main_loop and self._main_loop.is_running():
+                # Convert now so the row carries the completion timestamp, not the write time
+                row = telemetry_row(telemetry_data, sim_run_id)
                 # Use the stored main loop reference for thread-safe queueing
-                self._main_loop.call_soon_threadsafe(self.queue.put_nowait, telemetry_data)
-                print(f"📤 QUEUED FOR DB: {telemetry_data.get('part_id', 'unknown')}")
+                self._main_loop.call_soon_threadsafe(self.queue.put_nowait, row)
+                logger.debug("📤 QUEUED FOR DB: %s", telemetry_data.get('part_id', 'unknown'))
             else:
-                print("⚠️ PERSISTENCE: Main loop not available yet")
+                logger.warning("⚠️ PERSISTENCE: Main loop not available yet")
         except Exception as e:
-            print(f"⚠️ PERSISTENCE QUEUE FAIL: {e}")
-            import traceback
-            traceback.print_exc()
-        
-    async def _save_to_db(self, data):
-        async with AsyncSessionLocal() as session:
-             async with session.begin():
-                 # Create Telemetry Record
-                 # Ensure we have a valid SimRun ID first (Assuming ID 1 for Live View for now)
-                 # In a full app, we would manage Run IDs dynamically.
-                 
-                 # Using a fixed ID=1 for "Live Dashboard" bucket
-                 entry = Telemetry(
-                     sim_run_id=1, 
-                     timestamp_sim=datetime.now(), # Use Local System Time (matches UI)
-                     induction_power=float(data.get('power', 0.0)),
-                     quench_water_temp=float(data.get('quench_water_temp', 25.0)),  # Use correct field
-                     quench_water_flow=float(data.get('flow', 0.0)),
-                     quench_pressure=float(data.get('pressure', 0.0)),
-                     coil_scan_speed=float(data.get('coil_scan_speed', 0.0)),
-                     tempering_speed=float(data.get('tempering_speed', 0.0)),
-                     part_temp=float(data.get('peak_part_temp', 0.0)), # NEW: Persist Part Temp
-                     state=data.get('state', 'UNKNOWN'),
-                     
-                     # Identity
-                     part_id=data.get('part_id'),
-                     shift_id=data.get('shift_id'),
-                     operator_id=data.get('operator_id'),
-                     
-                     # Counters
-                     coil_life_counter=int(data.get('coil_life', 0)),
-                     ok_count=int(data.get('ok_count', 0)),
-                     ng_count=int(data.get('ng_count', 0)),
-
-                     # Failure - NG Reason is the physical defect reason
-                     is_anomaly=data.get('ng_reason') is not None or data.get('downtime_reason') is not None,
-                     downtime_reason=data.get('downtime_reason'),
-                     ng_reason=data.get('ng_reason'),  # NEW: Why part was NG
-                     repair_time=float(data.get('repair_time', 0.0))
-                 )
-                 session.add(entry)
-                 # print(f"💾 SAVED: {data['part_id']}")
+            logger.exception("⚠️ PERSISTENCE QUEUE FAIL: %s", e)
+
+    async def _save_batch(self, rows: List[Dict]):
+        start = time.perf_counter()
+        async with engine.begin() as conn:
+            await insert_telemetry_rows(conn, rows, chunk_size=self.batch_size)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.rows_written += len(rows)
+        self.batches_written += 1
+        self.last_batch_size = len(rows)
+        self.max_batch_size = max(self.max_batch_size, len(rows))
+        self.last_commit_ms = elapsed_ms
+        self.max_commit_ms = max(self.max_commit_ms, elapsed_ms)
+        self.total_commit_ms += elapsed_ms
+
+    def get_metrics(self) -> Dict:
+        """Queue depth, batch size and commit latency of the write worker."""
+        batches = self.batches_written
+        return {
+            "is_running": self.is_running,
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "batch_size_limit": self.batch_size,
+            "flush_interval_ms": self.flush_interval * 1000,
+            "rows_written": self.rows_written,
+            "batches_written": batches,
+            "failed_rows": self.failed_rows,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "avg_batch_size": round(self.rows_written / batches, 1) if batches else 0.0,
+            "last_commit_ms": round(self.last_commit_ms, 2),
+            "max_commit_ms": round(self.max_commit_ms, 2),
+            "avg_commit_ms": round(self.total_commit_ms / batches, 2) if batches else 0.0,
+        }
@@ -1,9 +1,23 @@
+import logging
+import math
 import random
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 class ThermalModel:
     """
     Simulates the thermal dynamics of the part using a simplified discrete 
     implementation of Newton's Law of Cooling / Heating.
+
+    While the part is hotter than the quench water and the inputs are held
+    (a whole HEATING or QUENCH phase), one update() step is the linear map
+        T_next = r * T + (1 - r) * T_eq
+    so n steps have the exact closed form T_n = T_eq + (T0 - T_eq) * r**n.
+    temp_after / ticks_to / advance / cycle_profile use it to jump a phase
+    in O(1) instead of stepping it tick by tick.
     """
     def __init__(self, ambient_temp: float = 25.0):
         self.temp = ambient_temp
@@ -45,7 +59,7 @@ class ThermalModel:
         delta_temp = heat_gain - heat_loss_quench - natural_cooling
         
         # DEBUG PHYSICS KERNEL
-        print(f"🧮 PHYSICS: Pwr={power_kw} -> Gain={heat_gain} | Loss={natural_cooling} | Delta={delta_temp}", flush=True)
+        logger.debug("🧮 PHYSICS: Pwr=%s -> Gain=%s | Loss=%s | Delta=%s", power_kw, heat_gain, natural_cooling, delta_temp)
 
         self.temp += delta_temp
         
@@ -62,3 +76,104 @@ class ThermalModel:
              self.temp = max(self.temp, self.ambient_temp)
 
         return self.temp
+
+    # === CLOSED FORM (whole phases in O(1)) ===
+
+    def coefficients(self, power_kw: float, water_flow_lpm: float, water_temp: float = 25.0):
+        """(r, T_eq) of the update() map for held inputs, valid while temp > water_temp."""
+        k_quench = self.C_COOL * water_flow_lpm / (850.0 - 25.0)
+        decay = k_quench + self.C_LOSS
+        t_eq = (self.C_HEAT * power_kw + k_quench * water_temp + self.C_LOSS * self.ambient_temp) / decay
+        return 1.0 - decay, t_eq
+
+    def temp_after(self, ticks, power_kw: float, water_flow_lpm: float,
+                   water_temp: float = 25.0, start: Optional[float] = None):
+        """
+        Noise-free temperature `ticks` update() steps from `start` (default: now).
+        `ticks` may be fractional or an array (telemetry at any resolution);
+        fractional ticks need r > 0, i.e. flow below ~157 lpm.
+        """
+        r, t_eq = self.coefficients(power_kw, water_flow_lpm, water_temp)
+        t0 = self.temp if start is None else start
+        if isinstance(ticks, (int, float)):
+            return max(t_eq + (t0 - t_eq) * r ** ticks, self.ambient_temp)
+        return np.maximum(t_eq + (t0 - t_eq) * np.power(r, ticks), self.ambient_temp)
+
+    def ticks_to(self, target: float, power_kw: float, water_flow_lpm: float,
+                 water_temp: float = 25.0, start: Optional[float] = None) -> Optional[int]:
+        """
+        Steps until the noise-free temperature first reaches `target` (>= when
+        it is above `start`, <= when below), or None if it never does.
+        """
+        t0 = self.temp if start is None else start
+        rising = target > t0
+        if target == t0:
+            return 0
+        r, t_eq = self.coefficients(power_kw, water_flow_lpm, water_temp)
+        if (rising and t_eq <= target) or (not rising and max(t_eq, self.ambient_temp) > target):
+            return None
+
+        ambient = self.ambient_temp
+
+        def reached(n):
+            temp = max(t_eq + (t0 - t_eq) * r ** n, ambient)
+            return temp >= target if rising else temp <= target
+
+        if not 0.0 < r < 1.0:
+            # Overshooting map (huge flow): short, so just step it
+            n = 1
+            while not reached(n):
+                n += 1
+            return n
+        if not rising and target <= ambient:
+            ratio = (ambient - t_eq) / (t0 - t_eq)
+        else:
+            ratio = (target - t_eq) / (t0 - t_eq)
+        n = max(1, math.ceil(math.log(ratio) / math.log(r)))
+        # Settle float rounding at the boundary
+        while n > 1 and reached(n - 1):
+            n -= 1
+        while not reached(n):
+            n += 1
+        return n
+
+    def advance(self, ticks: int, power_kw: float, water_flow_lpm: float, **kwargs) -> float:
+        """
+        `ticks` update() steps at once. With noise on, the flicker they would
+        have added (sum of r**k * U(-0.5, 0.5)) is drawn as one Gaussian of the
+        same variance.
+        """
+        water_temp = kwargs.get('water_temp', 25.0)
+        if ticks <= 0:
+            return self.temp
+        temp = self.temp_after(ticks, power_kw, water_flow_lpm, water_temp)
+        if self.noise_enabled:
+            r, _ = self.coefficients(power_kw, water_flow_lpm, water_temp)
+            variance = ticks / 12.0 if abs(r) >= 1.0 else (1.0 - r ** (2 * ticks)) / (1.0 - r * r) / 12.0
+            temp = max(temp + random.gauss(0.0, math.sqrt(variance)), self.ambient_temp)
+        self.temp = temp
+        return self.temp
+
+    def cycle_profile(self, power_kw: float, water_flow_lpm: float, water_temp: float = 25.0,
+                      target_temp: float = 850.0, unload_temp: float = 50.0,
+                      start: Optional[float] = None) -> Optional[Dict]:
+        """
+        One HEATING -> QUENCH cycle from `start` (default: now), noise-free:
+        heating steps to target_temp, the peak reached, quench steps down to
+        unload_temp (the phase lengths MachineState runs). None if either
+        phase never ends (too little power / flow).
+        """
+        t0 = self.temp if start is None else start
+        heating_ticks = self.ticks_to(target_temp, power_kw, 0.0, water_temp, t0)
+        if heating_ticks is None:
+            return None
+        peak = self.temp_after(heating_ticks, power_kw, 0.0, water_temp, t0)
+        quench_ticks = self.ticks_to(unload_temp, 0.0, water_flow_lpm, water_temp, peak)
+        if quench_ticks is None:
+            return None
+        return {
+            "heating_ticks": heating_ticks,
+            "peak_temp": peak,
+            "quench_ticks": quench_ticks,
+            "end_temp": self.temp_after(quench_ticks, 0.0, water_flow_lpm, water_temp, peak),
+        }
@@ -0,0 +1,152 @@
+"""
+Machine Registry & Scheduler
+Holds every simulated hardening cell keyed by machine id and ticks them all
+from ONE asyncio task, replacing the thread-per-/start live loop.
+
+- Each machine writes to its own SimRun (sim_run_id == machine id) through the
+  shared SimulationPersistence worker, and has its own stream broadcaster.
+- The scheduler runs on the event loop, so ticks and route handlers (start,
+  stop, repair, ...) never interleave mid-update: no locks needed.
+- Ticks are fixed-rate (period measured against the loop clock), so a slow
+  tick shortens the next sleep instead of drifting the whole line.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from backend.simulation.broadcaster import TelemetryBroadcaster
+from backend.simulation.machine import MachineState
+from backend.simulation.persistence import SimulationPersistence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TICK_PERIOD = 0.2  # seconds (5Hz, same as the old live thread)
+
+
+class RunPersistence:
+    """Binds a machine to its SimRun on the shared persistence worker."""
+    def __init__(self, persistence: SimulationPersistence, sim_run_id: int):
+        self.persistence = persistence
+        self.sim_run_id = sim_run_id
+
+    def enqueue_telemetry(self, telemetry_data):
+        self.persistence.enqueue_telemetry(telemetry_data, sim_run_id=self.sim_run_id)
+
+
+class MachineRegistry:
+    """
+    Machines keyed by integer id (1..N). Machine 1 is the legacy
+    /simulation "active machine".
+    """
+    def __init__(self, persistence: SimulationPersistence):
+        self.persistence = persistence
+        self._machines: Dict[int, MachineState] = {}
+
+    def add(self, machine_id: int) -> MachineState:
+        if machine_id in self._machines:
+            return self._machines[machine_id]
+        machine = MachineState()
+        machine.machine_id = machine_id
+        machine.persistence = RunPersistence(self.persistence, sim_run_id=machine_id)
+        machine.broadcaster = TelemetryBroadcaster()
+        self._machines[machine_id] = machine
+        logger.info("🏭 MACHINE REGISTERED: #%s (%s total)", machine_id, len(self._machines))
+        return machine
+
+    def get(self, machine_id: int) -> Optional[MachineState]:
+        return self._machines.get(machine_id)
+
+    def ids(self) -> List[int]:
+        return sorted(self._machines)
+
+    def items(self):
+        return sorted(self._machines.items())
+
+    def __len__(self):
+        return len(self._machines)
+
+    def __contains__(self, machine_id: int):
+        return machine_id in self._machines
+
+
+class MachineScheduler:
+    """
+    Single periodic task that ticks every running machine in the registry.
+    IDLE and DOWN machines are skipped (the live loop never ticked them either).
+    """
+    def __init__(self, registry: MachineRegistry, period: float = DEFAULT_TICK_PERIOD):
+        self.registry = registry
+        self.period = period
+        self._task: Optional[asyncio.Task] = None
+
+        # Scheduler Metrics
+        self.ticks = 0
+        self.overruns = 0
+        self.last_tick_ms = 0.0
+        self.max_tick_ms = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def ensure_running(self):
+        """Starts the tick task on the current loop if it isn't running yet."""
+        if not self.is_running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info("⏱️ SCHEDULER STARTED (period=%.0fms)", self.period * 1000)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("⏱️ SCHEDULER STOPPED")
+
+    def tick_all(self) -> int:
+        """Advances every running machine by one tick. Returns how many ticked."""
+        ticked = 0
+        for machine_id, machine in self.registry.items():
+            if machine.state in (MachineState.IDLE, MachineState.DOWN):
+                continue
+            try:
+                machine.update()
+                ticked += 1
+            except Exception as e:
+                logger.exception("❌ CRITICAL SIMULATION CRASH on machine #%s: %s", machine_id, e)
+                machine.transition_to(MachineState.DOWN)  # Safe Fallback
+        return ticked
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            start = loop.time()
+            self.tick_all()
+            self.ticks += 1
+            elapsed = loop.time() - start
+            self.last_tick_ms = elapsed * 1000
+            self.max_tick_ms = max(self.max_tick_ms, self.last_tick_ms)
+
+            next_tick += self.period
+            delay = next_tick - loop.time()
+            if delay < 0:
+                # Fell behind: skip the missed slots rather than bursting to catch up
+                self.overruns += 1
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def get_metrics(self) -> Dict:
+        return {
+            "is_running": self.is_running,
+            "machines": len(self.registry),
+            "period_ms": self.period * 1000,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "last_tick_ms": round(self.last_tick_ms, 3),
+            "max_tick_ms": round(self.max_tick_ms, 3),
+        }
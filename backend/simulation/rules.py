@@ -0,0 +1,227 @@
+"""
+Failure Rule Table
+Declarative E-Stop / quality rules for FailureManager, compiled once.
+
+Each rule is one bound on one telemetry value:
+  param        telemetry key ('pressure', 'flow', 'coil_life', ...)
+  states       machine states it applies in (omitted = every state)
+  min / max    exactly one: violated when value < min or value > max
+  active_above only checked while value > this (sensor idle at 0)
+  min_timer    only checked once the state timer has reached this tick
+  severity     'DOWN' (first violated rule stops the machine) or
+               'NG' (every violated rule is listed in the part's reason)
+  code / repair_time / reason   breakdown code, minutes, and reason
+               template ('{value:.1f}' is the offending value)
+  default      value used when the telemetry key is missing
+  name         limit key exposed in SAFETY_LIMITS ('DOWN') / THRESHOLDS ('NG')
+
+The shipped table (failure_rules.json, or $FAILURE_RULES_PATH) reproduces the
+original hand-written checks. When built, a RuleSet compiles, for every
+machine state, the rules active in it into one straight-line Python function
+(no loop, no lookups of inactive rules), so a check costs what the old
+hand-written branches did and scales with the rules of that state only, and a
+table that does not compile is rejected before it can go live.
+Swap the shared table at runtime with set_active_rules() / reload_rules()
+(PUT /simulation/rules, POST /simulation/rules/reload).
+"""
+
+import json
+import math
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("failure_rules.json")
+SEVERITIES = ("DOWN", "NG")
+# MachineState states, plus the COMPLETED label of finished-part rows
+STATES = ("IDLE", "LOADING", "HEATING", "QUENCH", "UNLOADING", "DOWN", "COMPLETED")
+MAX_NG_RULES = 63  # check_health_batch keeps a row's violated NG rules in one int64 bitmask
+
+
+class Rule:
+    __slots__ = ('name', 'param', 'states', 'lo', 'hi', 'floor', 'min_timer',
+                 'severity', 'code', 'repair_time', 'template', 'default', 'spec', '_format')
+
+    def __init__(self, spec: Dict):
+        if not isinstance(spec, dict):
+            raise ValueError(f"Rule must be an object, got {type(spec).__name__}")
+        missing = [k for k in ('name', 'param', 'severity', 'reason') if not spec.get(k)]
+        if missing:
+            raise ValueError(f"Rule {spec.get('name', '?')}: missing {', '.join(missing)}")
+        if spec['severity'] not in SEVERITIES:
+            raise ValueError(f"Rule {spec['name']}: severity must be one of {SEVERITIES}")
+        if (spec.get('min') is None) == (spec.get('max') is None):
+            raise ValueError(f"Rule {spec['name']}: set exactly one of min / max")
+        try:
+            spec['reason'].format(value=0.0)
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"Rule {spec['name']}: bad reason template ({e})")
+        states = spec.get('states')
+        if states is not None:
+            if not isinstance(states, (list, tuple)) or not all(isinstance(s, str) for s in states):
+                raise ValueError(f"Rule {spec['name']}: states must be a list of state names")
+            unknown = sorted(set(states) - set(STATES))
+            if unknown:
+                raise ValueError(f"Rule {spec['name']}: unknown states {', '.join(unknown)} (known: {', '.join(STATES)})")
+
+        self.spec = dict(spec)
+        self.name = spec['name']
+        self.param = spec['param']
+        self.states = frozenset(states) if states else None
+        self.lo = self._bound(spec, 'min', -math.inf)
+        self.hi = self._bound(spec, 'max', math.inf)
+        self.floor = self._bound(spec, 'active_above', -math.inf)
+        self.min_timer = int(spec.get('min_timer', 0))
+        self.severity = spec['severity']
+        self.code = spec.get('code', 'QL')
+        self.repair_time = spec.get('repair_time', 0)
+        self.template = spec['reason']
+        self._format = self.template.format
+        self.default = self._bound(spec, 'default', 0.0)
+
+    @staticmethod
+    def _bound(spec: Dict, key: str, unset: float) -> float:
+        if spec.get(key) is None:
+            return unset
+        value = float(spec[key])
+        if not math.isfinite(value):
+            raise ValueError(f"Rule {spec['name']}: {key} must be a finite number, got {spec[key]!r}")
+        return value
+
+    @property
+    def limit(self) -> float:
+        return self.spec['min'] if self.spec.get('min') is not None else self.spec['max']
+
+    def applies_to(self, state: str) -> bool:
+        return self.states is None or state in self.states
+
+    def reason(self, value) -> str:
+        return self._format(value=value)
+
+    def condition(self) -> str:
+        """Python expression (of v = value, timer) that is True when the rule is violated."""
+        parts = [f"timer >= {self.min_timer}"] if self.min_timer > 0 else []
+        # Bounds are finite (checked in __init__), so repr() is valid source
+        if self.lo > -math.inf:
+            parts.append(f"v < {self.lo!r}")
+        else:
+            parts.append(f"v > {self.hi!r}")
+        if self.floor > -math.inf:
+            parts.append(f"v > {self.floor!r}")
+        return " and ".join(parts)
+
+
+class RuleSet:
+    """An ordered, validated rule table with per-state compiled views."""
+
+    def __init__(self, specs: Iterable[Dict], source: str = "inline"):
+        rules = [Rule(spec) for spec in specs]
+        self.down: Tuple[Rule, ...] = tuple(r for r in rules if r.severity == 'DOWN')
+        self.ng: Tuple[Rule, ...] = tuple(r for r in rules if r.severity == 'NG')
+        if len(self.ng) > MAX_NG_RULES:
+            raise ValueError(f"At most {MAX_NG_RULES} NG rules are supported, got {len(self.ng)}")
+        self.source = source
+        self.loaded_at = datetime.now()
+        # Compiled up front so a bad table fails here, never on a live tick
+        self._by_state: Dict[Tuple[str, bool], Callable] = {
+            (state, safety_only): self._compile(state, safety_only)
+            for state in STATES for safety_only in (False, True)
+        }
+
+    def for_state(self, state: str, safety_only: bool = False) -> Callable:
+        """
+        Compiled check for `state`: check(get, timer) -> (k, v) for the first
+        violated DOWN rule self.down[k], else (-1, [(k, v), ...] of violated
+        NG rules self.ng[k]). safety_only skips the NG rules entirely.
+        """
+        key = (state, safety_only)
+        check = self._by_state.get(key)
+        if check is None:
+            check = self._by_state[key] = self._compile(state, safety_only)
+        return check
+
+    def compiled_source(self, state: str, safety_only: bool = False) -> str:
+        """Python source of the compiled check for `state` (for debugging)."""
+        lines = ["def check(get, timer):"]
+        last_param = None
+
+        def load(rule):
+            nonlocal last_param
+            if rule.param != last_param:
+                lines.append(f"    v = get({rule.param!r}, {rule.default!r})")
+                last_param = rule.param
+
+        for k, rule in enumerate(self.down):
+            if rule.applies_to(state):
+                load(rule)
+                lines.append(f"    if {rule.condition()}: return {k}, v")
+        lines.append("    ng = []")
+        for k, rule in enumerate(self.ng if not safety_only else ()):
+            if rule.applies_to(state):
+                load(rule)
+                lines.append(f"    if {rule.condition()}: ng.append(({k}, v))")
+        lines.append("    return -1, ng")
+        return "\n".join(lines)
+
+    def _compile(self, state: str, safety_only: bool) -> Callable:
+        namespace: Dict = {}
+        exec(compile(self.compiled_source(state, safety_only), f"<rules:{state}>", "exec"), namespace)
+        return namespace['check']
+
+    @property
+    def specs(self) -> List[Dict]:
+        return [r.spec for r in self.down + self.ng]
+
+    @property
+    def safety_limits(self) -> Dict[str, float]:
+        """{name: limit} of the DOWN rules (the old SAFETY_LIMITS dict)."""
+        return {r.name: r.limit for r in self.down}
+
+    @property
+    def thresholds(self) -> Dict[str, Dict[str, float]]:
+        """{param: {'min': x, 'max': y}} of the NG rules (the old THRESHOLDS dict)."""
+        out: Dict[str, Dict[str, float]] = {}
+        for r in self.ng:
+            bound = 'min' if r.spec.get('min') is not None else 'max'
+            key = r.name[:-4] if r.name.endswith('_' + bound) else r.name
+            out.setdefault(key, {})[bound] = r.limit
+        return out
+
+    def describe(self) -> Dict:
+        return {
+            "source": self.source,
+            "loaded_at": self.loaded_at.isoformat(),
+            "down_rules": len(self.down),
+            "ng_rules": len(self.ng),
+            "rules": self.specs,
+        }
+
+
+def rules_path() -> Path:
+    return Path(os.getenv("FAILURE_RULES_PATH", DEFAULT_RULES_PATH))
+
+
+def load_rules(path: Optional[Path] = None) -> RuleSet:
+    path = Path(path or rules_path())
+    with open(path, encoding="utf-8") as f:
+        return RuleSet(json.load(f), source=str(path))
+
+
+_active = load_rules()
+
+
+def get_active_rules() -> RuleSet:
+    return _active
+
+
+def set_active_rules(rules: RuleSet) -> RuleSet:
+    """Swaps the table used by every FailureManager without a per-machine override."""
+    global _active
+    _active = rules
+    return _active
+
+
+def reload_rules(path: Optional[Path] = None) -> RuleSet:
+    """Re-reads the rule file (e.g. after editing a recipe) and activates it."""
+    return set_active_rules(load_rules(path))
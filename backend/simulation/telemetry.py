@@ -0,0 +1,54 @@
+"""
+Telemetry Record
+Fixed-layout snapshot of one machine's sensors, counters and status
+(the keys of MachineState.get_telemetry_dict), filled in place.
+
+Each MachineState owns one record and refills it for every check / row
+instead of building a fresh ~25-key dict per tick. Readers that only look
+(FailureManager.check_health, telemetry_row, enqueue_telemetry) use it
+directly through get() / [key]; anything that keeps a snapshot past the
+current tick must copy() it. to_dict() is for API / JSON boundaries.
+"""
+
+from typing import Dict
+
+from backend.simulation.time_manager import format_clock
+
+FIELDS = (
+    "timer", "temp", "quench_water_temp", "peak_part_temp", "power", "flow", "pressure",
+    "coil_scan_speed", "tempering_speed", "state", "sim_run_id", "timestamp_sim",
+    "timestamp_sim_raw", "shift_id", "operator_id", "part_id", "ok_count", "ng_count",
+    "coil_life", "downtime_reason", "repair_time", "ng_reason", "ai_risk_score", "ai_status",
+)
+
+
+class TelemetryRecord:
+    __slots__ = tuple(f for f in FIELDS if f != "timestamp_sim") + ("day_count",)
+
+    def __init__(self):
+        self.sim_run_id = "LIVE-VIEW"
+        self.day_count = 1
+
+    @property
+    def timestamp_sim(self) -> str:
+        # Formatted on demand: most records are only checked, never displayed
+        return format_clock(self.timestamp_sim_raw, self.day_count)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def copy(self) -> "TelemetryRecord":
+        other = TelemetryRecord()
+        for name in TelemetryRecord.__slots__:
+            if hasattr(self, name):
+                setattr(other, name, getattr(self, name))
+        return other
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name, None) for name in FIELDS}
@@ -1,5 +1,11 @@
 from datetime import datetime, timedelta
 
+
+def format_clock(current_time: datetime, day_count: int = 1) -> str:
+    """'Day N, HH:MM:SS' as shown on the dashboard."""
+    return current_time.strftime("Day " + str(day_count) + ", %H:%M:%S")
+
+
 class TimeManager:
     """
     Manages the Simulation Clock (FR-03: Shift Logic).
@@ -27,7 +33,7 @@ class TimeManager:
         """
         Returns string formatted clock.
         """
-        return self.current_time.strftime("Day " + str(self.day_count) + ", %H:%M:%S")
+        return format_clock(self.current_time, self.day_count)
 
     def get_shift_info(self):
         """
@@ -1,11 +1,19 @@
-from backend.simulation.machine import MachineState
+import os
+
 from backend.simulation.persistence import SimulationPersistence
+from backend.simulation.registry import MachineRegistry, MachineScheduler
 
 # Global Singleton State
-# This ensures that both the Live Simulation Thread and Fast Forward logic
-# interact with the SAME machine instance.
-active_machine = MachineState()
+# Every machine lives in the registry and is ticked by the ONE scheduler task.
+# Machine 1 is the legacy "active machine" behind /simulation/* (Live View,
+# Fast Forward), so existing clients keep working unchanged.
+MACHINE_COUNT = int(os.getenv("MACHINE_COUNT", "1"))
+
 persistence_layer = SimulationPersistence()
+registry = MachineRegistry(persistence_layer)
+for _machine_id in range(1, max(1, MACHINE_COUNT) + 1):
+    registry.add(_machine_id)
+scheduler = MachineScheduler(registry)
 
-# Link persistence
-active_machine.persistence = persistence_layer
+active_machine = registry.get(1)
+broadcaster = active_machine.broadcaster
@@ -0,0 +1,45 @@
+import sys
+import os
+import time
+import asyncio
+import argparse
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+try:
+    from backend.database import engine
+    from backend.migrations import migrate
+    from backend.analytics.aggregates import rebuild_aggregates, BACKFILL_CHUNK
+    from backend.analytics.counters import rebuild_counters
+except ImportError as e:
+    print(f"❌ Error: Could not import backend modules. Make sure you are in the 'Machine-Simulator' root directory.")
+    print(f"Details: {e}")
+    sys.exit(1)
+
+
+async def main(args):
+    async with engine.begin() as conn:
+        await migrate(conn)
+
+    start = time.perf_counter()
+    scope = f"run {args.run_id}" if args.run_id is not None else "all runs"
+    print(f"🔢 REBUILDING TELEMETRY AGGREGATES ({scope})...")
+    async with engine.begin() as conn:
+        rows = await rebuild_aggregates(conn, sim_run_id=args.run_id, chunk_size=args.chunk_size)
+        if args.counters:
+            await rebuild_counters(conn)
+    await engine.dispose()
+
+    print(f"✅ DONE: {rows:,} telemetry rows folded in {time.perf_counter() - start:.1f}s"
+          + (" (counters rebuilt too)" if args.counters else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute the per-minute / per-shift telemetry aggregates from raw Telemetry.")
+    parser.add_argument("--run-id", type=int, default=None, help="Only rebuild this sim_run_id (default: all)")
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK, help="Telemetry rows read per batch")
+    parser.add_argument("--counters", action="store_true", help="Also rebuild the OK/NG/DOWN counters table")
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
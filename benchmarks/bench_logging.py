@@ -0,0 +1,56 @@
+"""
+Benchmark: MachineState ticks/sec with logging at INFO vs DEBUG.
+
+Usage (from the repo root):
+    python benchmarks/bench_logging.py [--ticks 20000] [--stderr] [--sample-every 1]
+
+By default log output goes to os.devnull so the numbers reflect the logging
+pipeline itself (record creation, queueing, formatting) rather than the speed
+of your terminal. Pass --stderr to include terminal I/O.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from backend.logging_config import setup_logging, shutdown_logging
+from backend.simulation.machine import MachineState
+
+
+def run_ticks(ticks: int) -> float:
+    machine = MachineState()
+    machine.start_cycle()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        machine.update()
+    return ticks / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--stderr", action="store_true", help="Log to stderr instead of os.devnull")
+    parser.add_argument("--sample-every", type=int, default=1)
+    args = parser.parse_args()
+
+    results = {}
+    sink = sys.stderr if args.stderr else open(os.devnull, "w")
+    for level in ("INFO", "DEBUG"):
+        setup_logging(level=level, module_levels={}, sample_every=args.sample_every, stream=sink)
+        results[level] = run_ticks(args.ticks)
+        shutdown_logging()
+
+    logging.getLogger().handlers.clear()
+    print(f"\n📊 LOGGING BENCHMARK ({args.ticks} ticks, sample_every={args.sample_every}, "
+          f"sink={'stderr' if args.stderr else 'devnull'})")
+    for level, tps in results.items():
+        print(f"   ├─ {level:<5}: {tps:>12,.0f} ticks/sec")
+    print(f"   └─ INFO/DEBUG speedup: {results['INFO'] / results['DEBUG']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Benchmark: hot telemetry queries vs the indexes in backend/models.py.
+
+Loads N synthetic telemetry rows (default 10M) into a scratch database, runs
+ANALYZE, then for each query the app issues:
+  - checks the plan (EXPLAIN) uses the index meant for it, and
+  - times it (median of --repeat runs).
+Exits non-zero if any query falls back to a full scan.
+
+Usage (from the repo root):
+    python benchmarks/query_bench.py [--rows 10000000] [--db /tmp/query_bench.db] [--reuse]
+    python benchmarks/query_bench.py --url postgresql+psycopg2://user:pw@localhost/bench
+
+SQLite plans are checked by index name. On PostgreSQL the table is created
+partitioned (as backend.migrations does) and plans are checked for index scans
+only, since partitions get their own auto-named child indexes.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine, desc, func, insert, select, text
+
+from backend.database import Base
+from backend.migrations import _create_partitioned_telemetry
+from backend.models import ANOMALY_FILTER, SimRun, Telemetry
+from backend.simulation.bulk_insert import TELEMETRY_COLUMNS, _SQLITE_INSERT_SQL, _sqlite_value
+
+RUNS = 3
+CHUNK = 50_000
+START = datetime(2025, 1, 1)
+
+
+def hot_queries(end_time: datetime):
+    """(name, statement, index expected on SQLite) for the app's hot paths."""
+    since = end_time - timedelta(days=1)
+    return [
+        ("export: run + time range",
+         select(Telemetry).where(Telemetry.sim_run_id == 2, Telemetry.timestamp_sim >= since)
+         .order_by(Telemetry.timestamp_sim),
+         "idx_telemetry_run_time"),
+        ("events: latest anomalies",
+         select(Telemetry).where(ANOMALY_FILTER).order_by(Telemetry.timestamp_sim.desc()).limit(10),
+         "idx_telemetry_anomaly_time"),
+        ("stats: NG count per run",
+         select(func.count()).select_from(Telemetry)
+         .where(Telemetry.sim_run_id == 2, Telemetry.ng_reason.isnot(None)),
+         "idx_telemetry_run_ng"),
+        ("stats: DOWN count per run",
+         select(func.count()).select_from(Telemetry)
+         .where(Telemetry.sim_run_id == 2, Telemetry.downtime_reason.isnot(None)),
+         "idx_telemetry_run_down"),
+        ("fast-forward: last timestamp",
+         select(func.max(Telemetry.timestamp_sim)),
+         "idx_telemetry_timestamp"),
+        ("telemetry: keyset page",
+         select(Telemetry).where(Telemetry.id > 1000, Telemetry.sim_run_id == 2)
+         .order_by(Telemetry.id).limit(1000),
+         "idx_telemetry_run_id"),
+        ("prediction: latest window",
+         select(Telemetry).order_by(desc(Telemetry.timestamp_sim)).limit(10000),
+         "idx_telemetry_timestamp"),
+    ]
+
+
+def generate_rows(n: int):
+    rng = random.Random(42)
+    per_run = [0] * (RUNS + 1)
+    for i in range(n):
+        run_id = i % RUNS + 1
+        per_run[run_id] += 1
+        ts = START + timedelta(seconds=25 * (i // RUNS))
+        roll = rng.random()
+        down = "Hose Burst" if roll < 0.005 else None
+        ng = f"PROCESS FAILURE: {down}" if down else ("SOFTNESS" if roll < 0.03 else None)
+        yield {
+            "sim_run_id": run_id, "timestamp_sim": ts,
+            "induction_power": 50.0, "quench_water_temp": 26.5, "quench_water_flow": 120.0,
+            "quench_pressure": 3.5, "coil_scan_speed": 10.0, "tempering_speed": 5.0, "part_temp": 850.0,
+            "state": "DOWN" if down else "COMPLETED", "part_id": f"PART-{i:08X}",
+            "shift_id": "Shift A", "operator_id": "OP_A",
+            "coil_life_counter": 200000 - per_run[run_id], "ok_count": 0, "ng_count": 0,
+            "is_anomaly": ng is not None, "downtime_reason": down, "ng_reason": ng, "repair_time": 0.0,
+        }
+
+
+def load(engine, n: int):
+    Base.metadata.drop_all(engine)
+    if engine.dialect.name == "postgresql":
+        # Same layout as a fresh production DB: RANGE-partitioned (one DEFAULT partition here)
+        with engine.begin() as conn:
+            _create_partitioned_telemetry(conn)
+            conn.execute(text("CREATE TABLE telemetry_default PARTITION OF telemetry DEFAULT"))
+    Base.metadata.create_all(engine)
+    # Bulk load into a bare table, then build the indexes once at the end
+    indexes = list(Telemetry.__table__.indexes)
+    for index in indexes:
+        index.drop(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(SimRun), [{"id": r, "status": "RUNNING", "total_rows": 0} for r in range(1, RUNS + 1)])
+
+    start = time.perf_counter()
+    rows = generate_rows(n)
+    done = 0
+    if engine.dialect.name == "sqlite":
+        raw = engine.raw_connection()
+        try:
+            raw.execute("PRAGMA synchronous=OFF")
+            raw.execute("PRAGMA journal_mode=MEMORY")
+            while True:
+                chunk = list(islice(rows, CHUNK))
+                if not chunk:
+                    break
+                raw.executemany(_SQLITE_INSERT_SQL, [
+                    tuple(_sqlite_value(r.get(c)) for c in TELEMETRY_COLUMNS) for r in chunk
+                ])
+                done += len(chunk)
+                print(f"\r   loading... {done:,}/{n:,}", end="", flush=True)
+            raw.commit()
+        finally:
+            raw.close()
+    else:
+        with engine.begin() as conn:
+            while True:
+                chunk = list(islice(rows, CHUNK))
+                if not chunk:
+                    break
+                conn.execute(insert(Telemetry), chunk)
+                done += len(chunk)
+                print(f"\r   loading... {done:,}/{n:,}", end="", flush=True)
+    print(f"\r   loaded {done:,} rows in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    for index in indexes:
+        index.create(engine)
+    print(f"   built {len(indexes)} indexes in {time.perf_counter() - start:.1f}s")
+
+
+def explain(conn, stmt) -> str:
+    compiled = stmt.compile(dialect=conn.dialect)
+    if conn.dialect.name == "sqlite":
+        params = compiled.construct_params()
+        args = tuple(_sqlite_value(params[k]) for k in compiled.positiontup)
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, args).fetchall()
+        return "\n".join(r[-1] for r in rows)
+    rows = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, compiled.construct_params()).fetchall()
+    return json.dumps(rows[0][0])
+
+
+def uses_index(dialect: str, plan: str, index_name: str) -> bool:
+    if dialect == "sqlite":
+        return f"INDEX {index_name}" in plan
+    return "Index" in plan and '"Seq Scan"' not in plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--db", default="/tmp/query_bench.db", help="SQLite file (ignored with --url)")
+    parser.add_argument("--url", default=None, help="Sync SQLAlchemy URL, e.g. a scratch PostgreSQL database")
+    parser.add_argument("--reuse", action="store_true", help="Skip loading; benchmark the existing data")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url or f"sqlite:///{args.db}")
+    dialect = engine.dialect.name
+    print(f"\n📊 QUERY BENCHMARK ({dialect}, {args.rows:,} rows)")
+    if not args.reuse:
+        load(engine, args.rows)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+        end_time = conn.execute(select(func.max(Telemetry.timestamp_sim))).scalar()
+        if isinstance(end_time, str):
+            end_time = datetime.fromisoformat(end_time)
+
+    failures = []
+    with engine.connect() as conn:
+        for name, stmt, index_name in hot_queries(end_time):
+            plan = explain(conn, stmt)
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                conn.execute(stmt).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            ok = uses_index(dialect, plan, index_name)
+            if not ok:
+                failures.append((name, plan))
+            print(f"   {'✅' if ok else '❌'} {name:<30} {statistics.median(timings):>9.2f} ms   "
+                  f"({index_name if dialect == 'sqlite' else 'index scan'})")
+
+    for name, plan in failures:
+        print(f"\n❌ {name} did not use its index. Plan:\n{plan}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
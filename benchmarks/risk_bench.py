@@ -0,0 +1,135 @@
+"""
+Benchmark: online risk scorer (backend/ai/risk.py).
+
+1. Latency: per-update cost of RiskScorer.update (p50 / p99) against a budget.
+2. Overhead: MachineState ticks/sec with the scorer on vs off.
+3. Early warning: healthy running (false alarms), then the slow hydraulic leak
+   demo (start_slow_leak); reports when WARNING / CRITICAL were first raised
+   relative to the first NG part and the quench pressure crossing its safety
+   limit (and DOWN, if the E-stop fires).
+
+Usage (from the repo root):
+    python benchmarks/risk_bench.py [--updates 200000] [--budget-us 20] [--seed 7]
+
+Exits non-zero if p99 latency is over budget or the leak isn't flagged
+before the safety limit.
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from backend.ai.risk import RiskScorer
+from backend.simulation.machine import MachineState
+
+TICK_SECONDS = 0.2  # Live scheduler period
+
+
+def bench_latency(updates: int):
+    scorer = RiskScorer()
+    rng = random.Random(1)
+    samples = []
+    for i in range(updates):
+        state = 'QUENCH' if i % 10 < 6 else 'HEATING'
+        values = {
+            'pressure': rng.uniform(3.4, 3.6) - 0.0025 * (i // 2),
+            'flow': rng.uniform(118, 122),
+            'quench_water_temp': 26.5,
+            'power': 50.0,
+            'scan_speed': 10.0 if state == 'HEATING' else 8.0,
+        }
+        start = time.perf_counter_ns()
+        scorer.update(state, values)
+        samples.append(time.perf_counter_ns() - start)
+        if scorer.status == 'CRITICAL':
+            scorer.reset_trends()
+    samples.sort()
+    return samples[len(samples) // 2] / 1000, samples[int(len(samples) * 0.99)] / 1000
+
+
+def ticks_per_sec(ticks: int, scoring: bool) -> float:
+    machine = MachineState()
+    if not scoring:
+        machine.risk.update = lambda state, values: None
+    machine.start_cycle()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        machine.update()
+        if machine.state == MachineState.DOWN:
+            machine.repair()
+            machine.start_cycle()
+    return ticks / (time.perf_counter() - start)
+
+
+def leak_scenario(healthy_ticks: int, max_ticks: int = 5000):
+    """Returns (false alarms, {event: first tick after the leak started})."""
+    machine = MachineState()
+    machine.start_cycle()
+    false_alarms = 0
+    for _ in range(healthy_ticks):
+        machine.update()
+        if machine.risk.status != 'OK':
+            false_alarms += 1
+        if machine.state == MachineState.DOWN:
+            machine.repair()
+            machine.start_cycle()
+
+    pressure_min = machine.failure_manager.SAFETY_LIMITS['pressure_min']
+    ng_before = machine.ng_count
+    machine.start_slow_leak()
+    first = {}
+    for tick in range(1, max_ticks + 1):
+        machine.update()
+        first.setdefault(machine.risk.status, tick)
+        if machine.ng_count > ng_before:
+            first.setdefault('NG part', tick)
+        if machine.state == MachineState.QUENCH and machine.current_pressure < pressure_min:
+            first.setdefault('Safety limit', tick)
+        if machine.state == MachineState.DOWN:
+            first.setdefault('DOWN', tick)
+            break
+    return false_alarms, first
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=200_000)
+    parser.add_argument("--ticks", type=int, default=50_000, help="Ticks for the overhead comparison")
+    parser.add_argument("--healthy-ticks", type=int, default=5_000, help="Healthy ticks before the leak")
+    parser.add_argument("--budget-us", type=float, default=20.0, help="p99 budget per update (microseconds)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    random.seed(args.seed)
+
+    p50, p99 = bench_latency(args.updates)
+    on = statistics.median(ticks_per_sec(args.ticks, True) for _ in range(3))
+    off = statistics.median(ticks_per_sec(args.ticks, False) for _ in range(3))
+    false_alarms, first = leak_scenario(args.healthy_ticks)
+
+    print(f"\n📊 RISK SCORER BENCHMARK")
+    print(f"   ├─ update():   p50 {p50:.2f} µs | p99 {p99:.2f} µs (budget {args.budget_us:.0f} µs)")
+    print(f"   ├─ Machine:    {on:,.0f} ticks/s scored vs {off:,.0f} unscored ({(off / on - 1) * 100:+.1f}% cost)")
+    print(f"   ├─ Healthy:    {false_alarms} non-OK ticks in {args.healthy_ticks:,}")
+    print(f"   └─ Slow leak:  first occurrence after the leak starts")
+    for event in ('WARNING', 'CRITICAL', 'NG part', 'Safety limit', 'DOWN'):
+        when = f"{first[event] * TICK_SECONDS:6.1f}s" if event in first else "     -"
+        print(f"      ├─ {event:<12} {when}")
+
+    # The warning must come before the process leaves its safety limits
+    limit = first.get('Safety limit', first.get('DOWN'))
+    warned = limit is not None and first.get('WARNING', limit) < limit
+    if warned:
+        print(f"      └─ Lead time:   {(limit - first['WARNING']) * TICK_SECONDS:.1f}s of warning before the limit")
+    sys.exit(0 if p99 <= args.budget_us and warned else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: closed-form ThermalModel phases (backend/simulation/physics.py).
+
+1. Exactness: cycle_profile vs noise-free update() stepping on random
+   power / flow / water temperature (phase lengths, peak and end temps).
+2. Speed: one HEATING -> QUENCH cycle, stepped vs closed form, and a long
+   held phase (advance(n) vs n update() calls).
+
+Usage (from the repo root):
+    python benchmarks/thermal_bench.py [--cycles 2000] [--long-ticks 100000] [--seed 7]
+
+Exits non-zero if any cycle differs from stepping.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+from backend.simulation.physics import ThermalModel
+
+
+def stepped_cycle(model: ThermalModel, power: float, flow: float, water_temp: float):
+    heating = quench = 0
+    while model.temp < 850.0:
+        model.update(power, 0.0, water_temp=water_temp)
+        heating += 1
+    peak = model.temp
+    while model.temp > 50.0:
+        model.update(0.0, flow, water_temp=water_temp)
+        quench += 1
+    return heating, peak, quench, model.temp
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=2_000)
+    parser.add_argument("--long-ticks", type=int, default=100_000, help="Length of the held phase")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    inputs = [(rng.uniform(40.0, 60.0), rng.uniform(80.0, 150.0), rng.uniform(20.0, 35.0)) for _ in range(args.cycles)]
+    model = ThermalModel()
+    model.noise_enabled = False
+
+    # 1. Exactness + stepped timing
+    mismatches = 0
+    profiles = []
+    start = time.perf_counter()
+    for power, flow, water_temp in inputs:
+        model.temp = model.ambient_temp
+        profiles.append(stepped_cycle(model, power, flow, water_temp))
+    stepped = (time.perf_counter() - start) / args.cycles
+
+    start = time.perf_counter()
+    closed = [model.cycle_profile(power, flow, water_temp, start=model.ambient_temp) for power, flow, water_temp in inputs]
+    closed_time = (time.perf_counter() - start) / args.cycles
+
+    for (heating, peak, quench, end), profile in zip(profiles, closed):
+        if (heating, quench) != (profile['heating_ticks'], profile['quench_ticks']) \
+                or abs(peak - profile['peak_temp']) > 1e-6 or abs(end - profile['end_temp']) > 1e-6:
+            mismatches += 1
+    avg_ticks = sum(h + q for h, _, q, _ in profiles) / args.cycles
+
+    # 2. Long held phase (e.g. a part soaking at low power)
+    model.temp = model.ambient_temp
+    start = time.perf_counter()
+    for _ in range(args.long_ticks):
+        model.update(5.0, 0.0)
+    long_stepped = time.perf_counter() - start
+    stepped_temp = model.temp
+
+    model.temp = model.ambient_temp
+    start = time.perf_counter()
+    model.advance(args.long_ticks, 5.0, 0.0)
+    long_closed = time.perf_counter() - start
+
+    print(f"\n📊 THERMAL CLOSED-FORM BENCHMARK")
+    print(f"   ├─ Exactness:  {mismatches} mismatches in {args.cycles:,} cycles (avg {avg_ticks:.1f} ticks/cycle)")
+    print(f"   ├─ Cycle:      {stepped * 1e6:.1f} µs stepped vs {closed_time * 1e6:.1f} µs closed form ({stepped / closed_time:.1f}x)")
+    print(f"   └─ Held phase: {args.long_ticks:,} ticks in {long_stepped * 1e3:.1f} ms stepped vs "
+          f"{long_closed * 1e6:.1f} µs advance() ({long_stepped / long_closed:,.0f}x, "
+          f"{stepped_temp:.3f} vs {model.temp:.3f} °C)")
+    sys.exit(0 if mismatches == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
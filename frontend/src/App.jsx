@@ -16,28 +16,31 @@ function App() {
   const [chartData, setChartData] = useState([]);
   const [dbStats, setDbStats] = useState({ total: 0, ok_count: 0, ng_count: 0, down_count: 0 });
 
-  // Polling Interval Ref to clear on unmount
+  // Polling Interval Ref to clear on unmount (only used if the stream is unavailable)
   const timerRef = useRef(null);
+  const streamRef = useRef(null);
+
+  const applyStatus = (data) => {
+    setStatus(data.state);
+    setTelemetry(data.telemetry);
+    // setEventLog(data.event_log || []); // Removed to prevent overwriting DB logs
+
+    // Update Chart Data (keep last 60 points)
+    if (data.telemetry) {
+      setChartData(prev => {
+        const newData = [...prev, {
+          time: new Date().toLocaleTimeString([], { hour12: false, minute: '2-digit', second: '2-digit' }),
+          temp: data.telemetry.temp
+        }];
+        return newData.slice(-60);
+      });
+    }
+  };
 
   const fetchStatus = async () => {
     try {
       const res = await axios.get(`${API_URL}/simulation/status`);
-      const data = res.data;
-
-      setStatus(data.state);
-      setTelemetry(data.telemetry);
-      // setEventLog(data.event_log || []); // Removed to prevent overwriting DB logs
-
-      // Update Chart Data (keep last 60 points)
-      if (data.telemetry) {
-        setChartData(prev => {
-          const newData = [...prev, {
-            time: new Date().toLocaleTimeString([], { hour12: false, minute: '2-digit', second: '2-digit' }),
-            temp: data.telemetry.temp
-          }];
-          return newData.slice(-60);
-        });
-      }
+      applyStatus(res.data);
     } catch (error) {
       // Silent fail on polling to avoid console spam
     }
@@ -67,14 +70,37 @@ function App() {
   };
 
   useEffect(() => {
-    // Poll telemetry every 200ms (High Speed Sync)
-    timerRef.current = setInterval(fetchStatus, 200);
+    // Live telemetry is pushed by the server (SSE); fall back to 200ms polling while it is down
+    const startPolling = () => {
+      if (!timerRef.current) {
+        timerRef.current = setInterval(fetchStatus, 200);
+      }
+    };
+    const stopPolling = () => {
+      clearInterval(timerRef.current);
+      timerRef.current = null;
+    };
+
+    if (window.EventSource) {
+      const stream = new EventSource(`${API_URL}/simulation/stream`);
+      stream.onopen = stopPolling; // (Re)connected: the stream takes over again
+      stream.onmessage = (e) => applyStatus(JSON.parse(e.data));
+      stream.onerror = () => {
+        // Network blip / backend restart: the browser reconnects on its own (readyState CONNECTING).
+        // CLOSED means it gave up (e.g. non-SSE response), so polling stays on for good.
+        startPolling();
+      };
+      streamRef.current = stream;
+    } else {
+      startPolling();
+    }
 
     // Poll DB stats every 2 seconds
     fetchDbStats(); // Initial fetch
     const statsTimer = setInterval(fetchDbStats, 2000);
 
     return () => {
+      if (streamRef.current) streamRef.current.close();
       clearInterval(timerRef.current);
       clearInterval(statsTimer);
     };
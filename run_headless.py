@@ -0,0 +1,83 @@
+import sys
+import os
+import asyncio
+import argparse
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+try:
+    from backend.logging_config import setup_logging
+    from backend.database import engine
+    from backend.migrations import migrate
+    from backend.simulation.headless import FleetRunner, HeadlessRunner, DEFAULT_BATCH_TICKS
+except ImportError as e:
+    print(f"❌ Error: Could not import backend modules. Make sure you are in the 'Machine-Simulator' root directory.")
+    print(f"Details: {e}")
+    sys.exit(1)
+
+
+async def main(args):
+    if not args.dry_run:
+        async with engine.begin() as conn:
+            await migrate(conn)
+
+    if args.machines > 1:
+        # Machine k writes under run id (run_id + k)
+        runner = FleetRunner(
+            args.machines,
+            sim_run_id=args.run_id,
+            speed=args.speed,
+            auto_repair=not args.no_repair,
+            seed=args.seed,
+        )
+    else:
+        runner = HeadlessRunner(
+            sim_run_id=args.run_id,
+            speed=args.speed,
+            auto_repair=not args.no_repair,
+            seed=args.seed,
+            fault_every=args.fault_every,
+        )
+    ticks = args.ticks if args.ticks else int(args.hours * 3600)
+
+    print(f"🏎️ HEADLESS SIMULATION: {ticks:,} ticks ({ticks / 3600:.1f} sim hours) x {args.machines} machine(s)")
+    report = await runner.run(ticks, batch_ticks=args.batch_ticks, persist=not args.dry_run)
+    await engine.dispose()
+
+    print("\n✅ HEADLESS RUN COMPLETE")
+    print(f"   ├─ Speed:    {report['ticks_per_sec']:,.0f} ticks/sec ({report['compression']:,.0f}x real time)")
+    print(f"   ├─ Wall:     {report['wall_seconds']:.2f}s for {report['sim_seconds'] / 3600:.1f} sim hours")
+    print(f"   ├─ Parts:    {report['cycles']:,} (OK={report['ok_count']:,} | NG={report['ng_count']:,})")
+    print(f"   ├─ Repairs:  {report['repairs']} ({report['down_ticks']:,} ticks DOWN, {report['skipped_ticks']:,} skipped)")
+    print(f"   ├─ Events:   {report['events']:,} ({report['faults']} faults injected)")
+    print(f"   └─ DB Rows:  {report['rows_written']:,} in {report['write_seconds']:.2f}s"
+          + (" (dry run)" if args.dry_run else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the physics simulation without sleeping between ticks.")
+    parser.add_argument("--hours", type=float, default=24.0, help="Simulated hours to run (1 tick = 1 s)")
+    parser.add_argument("--ticks", type=int, default=None, help="Exact tick count (overrides --hours)")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="Time compression in sim seconds per wall second (default: as fast as possible)")
+    parser.add_argument("--batch-ticks", type=int, default=DEFAULT_BATCH_TICKS)
+    parser.add_argument("--run-id", type=int, default=1, help="sim_run_id for the generated rows")
+    parser.add_argument("--machines", type=int, default=1,
+                        help="Simulate N machines together (array-backed fleet; run ids run-id .. run-id+N-1)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-repair", action="store_true", help="Stay DOWN after a breakdown")
+    parser.add_argument("--fault-every", type=float, default=None,
+                        help="Inject a random fault every N sim seconds on average (downtime-heavy runs)")
+    parser.add_argument("--dry-run", action="store_true", help="Simulate only, don't write to the DB")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "WARNING"),
+                        help="Per-cycle INFO logs slow the loop down; defaults to WARNING")
+    args = parser.parse_args()
+    if args.machines > 1 and args.fault_every:
+        parser.error("--fault-every is only supported for a single machine")
+
+    setup_logging(level=args.log_level)
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
@@ -2,7 +2,6 @@
 import sys
 import os
 import asyncio
-import threading
 import signal
 
 # Add current directory to path
@@ -11,8 +10,9 @@ sys.path.append(os.getcwd())
 print("🚀 INITIALIZING STANDALONE SIMULATOR...")
 
 try:
-    from backend.state import active_machine, persistence_layer
-    from backend.routers.simulation import run_live_simulation_thread
+    from backend.logging_config import setup_logging
+    setup_logging()
+    from backend.state import active_machine, persistence_layer, registry, scheduler
 except ImportError as e:
     print(f"❌ Error: Could not import backend modules. Make sure you are in the 'Machine-Simulator' root directory.")
     print(f"Details: {e}")
@@ -23,21 +23,20 @@ async def main():
     # Start the background worker that writes to SQLite
     worker_task = asyncio.create_task(persistence_layer.start_worker())
     
-    print("🚦 STARTING MACHINE CYCLE...")
-    active_machine.start_cycle()
+    print(f"🚦 STARTING {len(registry)} MACHINE CYCLE(S)...")
+    for _, machine in registry.items():
+        machine.start_cycle()
     
-    print("⚙️ LAUNCHING SIMULATION THREAD...")
-    # Run the physics loop in a separate thread (Non-Blocking to Event Loop)
-    sim_thread = threading.Thread(target=run_live_simulation_thread, daemon=True)
-    sim_thread.start()
+    print("⚙️ LAUNCHING SCHEDULER...")
+    # One periodic task ticks every machine on this loop
+    scheduler.ensure_running()
     
     print("\n✅ SIMULATOR RUNNING! (Ctrl+C to Stop)")
     print(f"   Machine State: {active_machine.state}")
-    print(f"   Writing to:    {persistence_layer.db_path or 'Default DB'}")
     
     try:
-        # Keep the main async loop alive to handle DB writes
-        while sim_thread.is_alive():
+        # Keep the main async loop alive while any machine is still producing
+        while any(m.state not in ("IDLE", "DOWN") for _, m in registry.items()):
             await asyncio.sleep(1)
             
     except asyncio.CancelledError:
@@ -45,7 +44,9 @@ async def main():
         
     finally:
         print("\n🛑 SHUTTING DOWN...")
-        active_machine.stop()
+        await scheduler.stop()
+        for _, machine in registry.items():
+            machine.stop()
         await persistence_layer.stop_worker()
         print("✅ Shutdown Complete.")
 
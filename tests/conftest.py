@@ -0,0 +1,41 @@
+"""
+Shared fixtures. Tests run from the repo root (`python -m pytest`); anything
+that needs a database gets its own throwaway SQLite file, never the dev DB.
+"""
+
+import asyncio
+import logging
+import random
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.migrations import migrate
+
+logging.disable(logging.WARNING)
+
+
+def run(coro):
+    """Runs a coroutine to completion (the suite has no async test plugin)."""
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """Async engine on a fresh, migrated SQLite file."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await migrate(conn)
+
+    run(setup())
+    yield engine
+    run(engine.dispose())
+
+
+@pytest.fixture
+def seeded():
+    """Seeds the module-level RNG MachineState / ThermalModel draw from."""
+    random.seed(1234)
+    yield
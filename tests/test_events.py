@@ -0,0 +1,75 @@
+import math
+import random
+
+from backend.simulation.events import FAULT, REPAIR_DONE, SAMPLE, Event, EventQueue
+
+
+def drain(queue, now):
+    fired = []
+    while (event := queue.pop_due(now)) is not None:
+        fired.append(event)
+    return fired
+
+
+def test_events_fire_in_time_order_and_ties_in_schedule_order():
+    queue = EventQueue()
+    queue.schedule(30, SAMPLE, 'c')
+    queue.schedule(10, FAULT, 'a')
+    queue.schedule(30, REPAIR_DONE, 'd')
+    queue.schedule(10, SAMPLE, 'b')
+    queue.schedule(30, FAULT, 'e')
+
+    assert queue.next_time() == 10
+    assert queue.pop_due(9) is None
+    assert [e.payload for e in drain(queue, 10)] == ['a', 'b']
+    assert queue.next_time() == 30
+    assert [e.payload for e in drain(queue, 100)] == ['c', 'd', 'e']
+    assert queue.next_time() == math.inf and len(queue) == 0
+
+
+def test_cancel_drops_only_pending_events_of_that_kind():
+    queue = EventQueue()
+    queue.schedule(5, REPAIR_DONE, 'old repair')
+    queue.schedule(8, FAULT)
+    queue.schedule(12, REPAIR_DONE, 'older repair')
+    queue.cancel(REPAIR_DONE)
+
+    assert not queue.pending(REPAIR_DONE) and queue.pending(FAULT)
+    assert len(queue) == 1
+    assert queue.next_time() == 8
+
+    # Scheduled after the cancel -> still fires
+    queue.schedule(6, REPAIR_DONE, 'new repair')
+    assert queue.pending(REPAIR_DONE)
+    assert drain(queue, 20) == [Event(6, REPAIR_DONE, 'new repair'), Event(8, FAULT)]
+
+    queue.cancel(SAMPLE)  # Nothing pending: no effect
+    queue.schedule(25, SAMPLE)
+    assert len(queue) == 1 and queue.pop_due(25) == Event(25, SAMPLE)
+
+
+def test_queue_matches_a_sorted_list():
+    rng = random.Random(24)
+    queue, model, seq, now = EventQueue(), [], 0, 0
+    kinds = (REPAIR_DONE, FAULT, SAMPLE)
+    for _ in range(5000):
+        op = rng.random()
+        if op < 0.5:
+            time, kind = now + rng.randint(0, 40), rng.choice(kinds)
+            queue.schedule(time, kind, seq)
+            model.append((time, seq, Event(time, kind, seq)))
+            seq += 1
+        elif op < 0.6:
+            kind = rng.choice(kinds)
+            queue.cancel(kind)
+            model = [m for m in model if m[2].kind != kind]
+        else:
+            now += rng.randint(0, 10)
+            model.sort()
+            due = [m[2] for m in model if m[0] <= now]
+            model = [m for m in model if m[0] > now]
+            assert drain(queue, now) == due
+        assert len(queue) == len(model)
+        assert queue.next_time() == min((m[0] for m in model), default=math.inf)
+        for kind in kinds:
+            assert queue.pending(kind) == any(m[2].kind == kind for m in model)
@@ -0,0 +1,124 @@
+import random
+
+import numpy as np
+import pytest
+
+from backend.simulation.failure_manager import FailureManager
+from backend.simulation.rules import MAX_NG_RULES, RuleSet, get_active_rules
+
+STATES = ("IDLE", "LOADING", "HEATING", "QUENCH", "UNLOADING", "DOWN", "COMPLETED")
+PARAMS = sorted({r.param for r in get_active_rules().down + get_active_rules().ng})
+
+
+def edge_values(param):
+    """Every limit / active_above of `param`, exactly and one ulp either side."""
+    edges = set()
+    for rule in get_active_rules().down + get_active_rules().ng:
+        if rule.param == param:
+            for x in (rule.lo, rule.hi, rule.floor):
+                if np.isfinite(x):
+                    edges.update((x, np.nextafter(x, -np.inf), np.nextafter(x, np.inf)))
+    return sorted(edges)
+
+
+def make_rows(n, rng):
+    rows = []
+    for _ in range(n):
+        row = {"state": rng.choice(STATES), "timer": rng.choice((0, 1, 2, 3, 4, rng.randint(0, 60)))}
+        for param in PARAMS:
+            edges = edge_values(param)
+            if rng.random() < 0.5:
+                row[param] = float(rng.choice(edges))
+            else:
+                row[param] = rng.uniform(min(edges) - 10, max(edges) + 10)
+        rows.append(row)
+    return rows
+
+
+def columns(rows):
+    cols = {"state": np.array([r["state"] for r in rows]), "timer": np.array([r["timer"] for r in rows])}
+    for param in PARAMS:
+        if all(param in r for r in rows):
+            cols[param] = np.array([r[param] for r in rows])
+    return cols
+
+
+def test_batch_matches_check_health_row_by_row():
+    rng = random.Random(21)
+    rows = make_rows(3000, rng)
+    # Missing keys fall back to the rule default (a whole column for the batch)
+    missing = [{k: v for k, v in r.items() if k not in ("coil_life", "quench_water_temp")} for r in rows[:200]]
+    batch_rows = [missing, rows[200:]]
+    statuses = set()
+    for chunk in batch_rows:
+        batch = FailureManager().check_health_batch(columns(chunk))
+        for i, row in enumerate(chunk):
+            want = FailureManager().check_health(row)
+            got = batch.report(i)
+            assert (got["status"], got["reason"]) == (want["status"], want["reason"]), row
+            if want["status"] == "DOWN":
+                assert (got["code"], got["repair_time"]) == (want["code"], want["repair_time"])
+            statuses.add((row["state"], want["status"]))
+    # Every state was exercised, and both failure kinds came up
+    assert {s for s, _ in statuses} == set(STATES)
+    assert {st for _, st in statuses} == {"OK", "NG", "DOWN"}
+
+
+@pytest.mark.parametrize("param, state, timer, value, expected", [
+    # min_timer: pump failure only counts from the 3rd QUENCH tick
+    ("flow", "QUENCH", 2, 10.0, "OK"),
+    ("flow", "QUENCH", 3, 10.0, "DOWN"),
+    # active_above: NG flow limits ignore an idle sensor, exactly at the floor too
+    ("flow", "UNLOADING", 0, 10.0, "OK"),
+    ("flow", "UNLOADING", 0, float(np.nextafter(10.0, np.inf)), "NG"),
+    ("flow", "UNLOADING", 0, 80.0, "OK"),
+    ("flow", "UNLOADING", 0, 150.0, "OK"),
+    ("flow", "UNLOADING", 0, 150.01, "NG"),
+    ("pressure", "QUENCH", 5, 6.0, "NG"),
+    ("pressure", "QUENCH", 5, 6.01, "DOWN"),
+])
+def test_batch_matches_check_health_at_the_edges(param, state, timer, value, expected):
+    row = {"state": state, "timer": timer, "flow": 120.0, "pressure": 3.5, "peak_part_temp": 850.0,
+           "quench_water_temp": 26.5, "coil_scan_speed": 8.0, "coil_life": 1000, "temp": 40.0, "power": 0.0}
+    row[param] = value
+    want = FailureManager().check_health(row)
+    got = FailureManager().check_health_batch(columns([row])).report(0)
+    assert want["status"] == expected
+    assert (got["status"], got["reason"]) == (want["status"], want["reason"])
+
+
+def test_commit_mode_leaves_the_same_counters():
+    rng = random.Random(5)
+    rows = [dict(r, state="UNLOADING") for r in make_rows(400, rng)]
+    for start, stop in ((0, 400), (0, 1), (10, 60), (100, 400)):
+        serial, batched = FailureManager(), FailureManager()
+        serial.consecutive_ng_counter = batched.consecutive_ng_counter = 2
+        for row in rows[start:stop]:
+            serial.check_health(row, commit=True)
+        batched.check_health_batch(columns(rows[start:stop]), commit=True)
+        assert batched.consecutive_ng_counter == serial.consecutive_ng_counter
+        assert batched.active_fault == serial.active_fault
+
+    # A run of NG parts with no OK part keeps counting from the previous value
+    ng_rows = [{"state": "UNLOADING", "timer": 0, "peak_part_temp": 700.0}] * 4
+    manager = FailureManager()
+    manager.consecutive_ng_counter = 3
+    manager.check_health_batch(columns(ng_rows), commit=True)
+    assert manager.consecutive_ng_counter == 7
+
+
+def ng_rule(k):
+    return {"name": f"r{k}", "param": f"p{k}", "max": 1.0, "severity": "NG", "reason": f"R{k} {{value:.1f}}"}
+
+
+def test_ruleset_rejects_more_ng_rules_than_the_bitmask_holds():
+    with pytest.raises(ValueError):
+        RuleSet([ng_rule(k) for k in range(MAX_NG_RULES + 1)])
+
+    # At the limit, the top bit still reports
+    rules = RuleSet([ng_rule(k) for k in range(MAX_NG_RULES)])
+    row = {"state": "UNLOADING", "timer": 0, **{f"p{k}": 2.0 for k in range(MAX_NG_RULES)}}
+    manager = FailureManager(rules)
+    batch = manager.check_health_batch({k: np.array([v]) for k, v in row.items()})
+    assert batch.reason(0) == manager.check_health(row)["reason"]
+    assert batch.reason(0).endswith(f"R{MAX_NG_RULES - 1} 2.0")
@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from backend.simulation import fast_forward as ff
+from tests.conftest import run
+
+START = datetime(2025, 1, 1)
+
+
+def relative_day(coil_values, absolute_from=None, ok=0, ng=0):
+    """A generate_day_relative()-style day with the given coil_life_counter column."""
+    rows = []
+    for k, coil in enumerate(coil_values):
+        rows.append({
+            'ok_count': k, 'ng_count': 0, 'coil_life_counter': coil,
+            '_coil_absolute': absolute_from is not None and k >= absolute_from,
+        })
+    return {'rows': rows, 'ok': ok, 'ng': ng}
+
+
+def test_merge_day_rows_applies_counter_offsets():
+    day = relative_day([ff.COIL_LIFE_MAX - 1, ff.COIL_LIFE_MAX - 2])
+    rows, coil = ff.merge_day_rows(day, ok_offset=100, ng_offset=7, coil_start=5000)
+    assert [r['ok_count'] for r in rows] == [100, 101]
+    assert [r['ng_count'] for r in rows] == [7, 7]
+    assert [r['coil_life_counter'] for r in rows] == [4999, 4998]
+    assert coil == 4998
+    assert all('_coil_absolute' not in r for r in rows)
+
+
+def test_merge_day_rows_wraps_to_a_fresh_coil_at_zero():
+    # 3 parts used on a coil with 2 left: the third part starts a new coil
+    day = relative_day([ff.COIL_LIFE_MAX - 1, ff.COIL_LIFE_MAX - 2, ff.COIL_LIFE_MAX - 3])
+    rows, coil = ff.merge_day_rows(day, 0, 0, coil_start=2)
+    assert [r['coil_life_counter'] for r in rows] == [1, ff.COIL_LIFE_MAX, ff.COIL_LIFE_MAX - 1]
+    assert coil == ff.COIL_LIFE_MAX - 1
+
+
+def test_merge_day_rows_keeps_values_after_a_proactive_replacement():
+    # From the replacement on, the worker's values are already absolute
+    day = relative_day([ff.COIL_LIFE_MAX - 1, ff.COIL_LIFE_MAX, ff.COIL_LIFE_MAX - 1], absolute_from=1)
+    rows, coil = ff.merge_day_rows(day, 0, 0, coil_start=900)
+    assert [r['coil_life_counter'] for r in rows] == [899, ff.COIL_LIFE_MAX, ff.COIL_LIFE_MAX - 1]
+    assert coil == ff.COIL_LIFE_MAX - 1
+
+
+def test_merged_days_match_one_serial_run():
+    """Days merged from relative workers continue each other's counters."""
+    days = [ff.generate_day_relative((d, START, 3)) for d in range(2)]
+    first, coil = ff.merge_day_rows(days[0], 10, 20, 150_000)
+    second, _ = ff.merge_day_rows(days[1], 10 + days[0]['ok'], 20 + days[0]['ng'], coil)
+    assert second[0]['ok_count'] >= first[-1]['ok_count']
+    assert second[0]['ng_count'] >= first[-1]['ng_count']
+    assert second[0]['coil_life_counter'] in (first[-1]['coil_life_counter'] - 1, first[-1]['coil_life_counter'])
+
+
+def count_rows(engine):
+    async def q():
+        async with engine.connect() as conn:
+            return (await conn.execute(text("SELECT COUNT(*) FROM telemetry"))).scalar()
+    return run(q())
+
+
+def test_simulate_days_commits_each_day(db_engine, monkeypatch):
+    monkeypatch.setattr(ff, "engine", db_engine)
+    result = run(ff.simulate_days(3, workers=1, start_time=START, seed=1))
+    assert count_rows(db_engine) == result['total_records'] > 0
+
+    # A failure while writing day 3 keeps days 1-2
+    inserted = []
+    real_insert = ff.insert_telemetry_rows
+
+    async def failing_insert(conn, rows, **kwargs):
+        if len(inserted) == 2:
+            raise RuntimeError("disk full")
+        inserted.append(len(rows))
+        return await real_insert(conn, rows, **kwargs)
+
+    monkeypatch.setattr(ff, "insert_telemetry_rows", failing_insert)
+    before = count_rows(db_engine)
+    with pytest.raises(RuntimeError):
+        run(ff.simulate_days(3, workers=1, start_time=START, seed=2))
+    assert count_rows(db_engine) == before + sum(inserted)
+
+
+def test_simulate_days_bounds_days_in_flight(db_engine, monkeypatch):
+    """Never more than IN_FLIGHT_PER_WORKER * workers days submitted ahead of the insert."""
+    monkeypatch.setattr(ff, "engine", db_engine)
+
+    class InlineExecutor:
+        def __init__(self, *args, **kwargs):
+            self.outstanding = 0
+            self.peak = 0
+
+        def submit(self, fn, *args):
+            from concurrent.futures import Future
+            self.outstanding += 1
+            self.peak = max(self.peak, self.outstanding)
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+        def shutdown(self, **kwargs):
+            pass
+
+    pool = InlineExecutor()
+    monkeypatch.setattr(ff, "ProcessPoolExecutor", lambda *a, **k: pool)
+    real_merge = ff.merge_day_rows
+
+    def merge(day, *args):
+        pool.peak = max(pool.peak, pool.outstanding)
+        pool.outstanding -= 1  # inserted next, then released
+        return real_merge(day, *args)
+
+    monkeypatch.setattr(ff, "merge_day_rows", merge)
+    workers = 2
+    result = run(ff.simulate_days(8, workers=workers, start_time=START, seed=5))
+    assert result['days'] == 8
+    assert pool.peak <= ff.IN_FLIGHT_PER_WORKER * workers
+
+    # Same days as generating them one by one
+    day_span = timedelta(seconds=ff.PARTS_PER_DAY * ff.CYCLE_TIME_SECONDS)
+    serial = [ff.generate_day_relative((d, START + d * day_span, 5)) for d in range(8)]
+    assert result['ok'] == sum(d['ok'] for d in serial)
+    assert result['total_records'] == sum(len(d['rows']) for d in serial)
+
+
+def test_single_day_matches_one_day_of_simulate_days(db_engine, monkeypatch):
+    """/fast-forward/day and /fast-forward?days=1 write the same rows for the same seed and counters."""
+    monkeypatch.setattr(ff, "engine", db_engine)
+    written = []
+    real_insert = ff.insert_telemetry_rows
+
+    async def capture(conn, rows, **kwargs):
+        rows = [dict(r) for r in rows]
+        written[-1].extend(rows)
+        return await real_insert(conn, rows, **kwargs)
+
+    monkeypatch.setattr(ff, "insert_telemetry_rows", capture)
+    # A machine already past the daily NG quota still gets the day's NG parts
+    counters = dict(start_time=START, initial_ok=5000, initial_ng=10_000, initial_coil_life=1200, seed=8)
+
+    written.append([])
+    single = run(ff.simulate_day(**counters))
+    written.append([])
+    multi = run(ff.simulate_days(1, workers=1, **counters))
+
+    assert written[0] == written[1]
+    assert {k: multi[k] for k in single} == single
+    assert single['ng'] - 10_000 == sum(r['ng_reason'] is not None for r in written[0]) > 0
+    assert written[0][0]['ng_count'] >= 10_000 and written[0][0]['coil_life_counter'] == 1199
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from backend.simulation import machine as machine_module
+from backend.simulation.headless import FleetRunner, HeadlessRunner
+
+START = datetime(2025, 1, 1, 6, 0, 0)
+TICKS = 4000
+# Random per row / compared elsewhere (no risk scorer on the fleet)
+SKIP = {'part_id', 'ai_risk_score', 'ai_status'}
+
+
+class MidpointRandom:
+    """Stands in for MachineState's `random` module: every draw is its mean."""
+    @staticmethod
+    def uniform(lo, hi):
+        return (lo + hi) / 2
+
+    @staticmethod
+    def gauss(mu, sigma):
+        return mu
+
+
+class MidpointRng:
+    """Same for the FleetEngine's numpy Generator."""
+    @staticmethod
+    def uniform(lo, hi, size):
+        return np.full(size, (lo + hi) / 2)
+
+    @staticmethod
+    def normal(mu, sigma, size):
+        return np.full(size, mu)
+
+
+def headless_rows(sim_run_id, fault=None):
+    runner = HeadlessRunner(sim_run_id=sim_run_id, start_time=START)
+    runner.machine.physics.noise_enabled = False
+    if fault:
+        runner.machine.inject_fault(fault)
+    rows = runner.run_ticks(TICKS)
+    return runner, rows
+
+
+def assert_same_rows(fleet_rows, machine_rows):
+    assert len(fleet_rows) == len(machine_rows) > 0
+    for got, want in zip(fleet_rows, machine_rows):
+        assert got['part_id'].startswith("PART-")
+        assert got.keys() == want.keys()
+        for key in want.keys() - SKIP:
+            if isinstance(want[key], float):
+                assert got[key] == pytest.approx(want[key], abs=0.011), key
+            else:
+                assert got[key] == want[key], key
+
+
+def test_fleet_rows_match_machine_state(monkeypatch):
+    """Noise pinned to its mean: each fleet machine writes the rows a HeadlessRunner would."""
+    monkeypatch.setattr(machine_module, "random", MidpointRandom())
+    # Machine 0 clean, machine 1 with a hose burst (NG parts, E-Stop, repair, restart)
+    clean_runner, clean = headless_rows(7)
+    faulty_runner, faulty = headless_rows(8, fault='hose_burst')
+
+    runner = FleetRunner(2, sim_run_id=7, start_time=START)
+    runner.fleet.noise_enabled = False
+    runner.fleet.rng = MidpointRng()
+    runner.fleet.set_drift(1, 'pressure', 0.02, offset=0.7)
+    rows = runner.run_ticks(TICKS)
+
+    assert_same_rows([r for r in rows if r['sim_run_id'] == 7], clean)
+    assert_same_rows([r for r in rows if r['sim_run_id'] == 8], faulty)
+    assert any(r['state'] == 'DOWN' and r['repair_time'] == 45.0 for r in faulty)
+    assert runner.repairs == faulty_runner.repairs == 1
+    assert runner.down_ticks == faulty_runner.down_ticks
+
+    fleet = runner.fleet
+    for i, m in enumerate((clean_runner.machine, faulty_runner.machine)):
+        assert fleet.state_names()[i] == m.state
+        assert (fleet.ok_count[i], fleet.ng_count[i], fleet.cycle_count[i], fleet.coil_life[i]) == \
+            (m.ok_count, m.ng_count, m.cycle_count, m.coil_life_counter)
+        assert fleet.temp[i] == pytest.approx(m.physics.temp, abs=1e-6)
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.ai.markov import MarkovModel, sample_chain
+from backend.models import Telemetry
+from backend.simulation.persistence import telemetry_row
+from tests.conftest import run
+
+START = datetime(2025, 1, 1)
+
+
+def test_sample_chain_matches_a_sequential_walk():
+    rng = np.random.default_rng(11)
+    for n, start in ((1, 0), (2, 2), (7, 1), (1000, 0), (1025, 2)):
+        probs = rng.dirichlet(np.ones(3), size=(n, 3))
+        step_cdf = np.cumsum(probs, axis=-1)
+        u = rng.random(n)
+
+        expected, state = [], start
+        for t in range(n):
+            state = int(np.searchsorted(step_cdf[t, state], u[t], side='left'))
+            expected.append(min(state, 2))
+        assert sample_chain(step_cdf, u, start).tolist() == expected
+
+    assert sample_chain(np.empty((0, 3, 3)), np.empty(0), 0).size == 0
+
+
+def test_sample_chain_follows_the_transition_matrix():
+    matrix = np.array([[0.9, 0.08, 0.02], [0.5, 0.4, 0.1], [0.95, 0.04, 0.01]])
+    n = 200_000
+    rng = np.random.default_rng(2)
+    x = sample_chain(np.broadcast_to(np.cumsum(matrix, axis=1), (n, 3, 3)), rng.random(n), 0)
+    counts = np.zeros((3, 3))
+    np.add.at(counts, (x[:-1], x[1:]), 1)
+    assert np.allclose(counts / counts.sum(axis=1, keepdims=True), matrix, atol=0.01)
+
+
+def make_rows(rng, n_runs=3, per_run=400):
+    """Interleaved parts of several runs, each run in time order, with streaks."""
+    rows, clock = [], {r: START for r in range(1, n_runs + 1)}
+    outcome = {r: 0 for r in clock}
+    for _ in range(n_runs * per_run):
+        run_id = int(rng.integers(1, n_runs + 1))
+        if rng.random() < 0.3:
+            outcome[run_id] = int(rng.choice(3, p=[0.6, 0.3, 0.1]))
+        clock[run_id] += timedelta(seconds=12)
+        data = {
+            'state': 'COMPLETED',
+            'shift_id': 'Shift_A' if clock[run_id].hour in range(8, 20) else 'Shift_B',
+            'coil_life': int(rng.integers(0, 200_000)),
+            'ng_reason': "NG" if outcome[run_id] == 1 else None,
+            'downtime_reason': "DOWN" if outcome[run_id] == 2 else None,
+        }
+        rows.append(telemetry_row(data, run_id, timestamp=clock[run_id]))
+    return [dict(r, id=i + 1) for i, r in enumerate(rows)]
+
+
+async def insert(session, rows):
+    await session.execute(Telemetry.__table__.insert(), rows)
+    await session.commit()
+
+
+def assert_same_model(a, b):
+    assert np.array_equal(a.counts, b.counts)
+    assert np.array_equal(a.initial, b.initial)
+    assert a.run_lengths == b.run_lengths
+    assert a.tails == b.tails
+
+
+def test_incremental_update_equals_a_full_fit(db_engine):
+    rows = make_rows(np.random.default_rng(7))
+    model = MarkovModel()
+    cuts = [0, 1, 2, 50, 51, 300, 301, 302, 700, len(rows)]
+
+    async def go():
+        async with AsyncSession(db_engine) as session:
+            for lo, hi in zip(cuts, cuts[1:]):
+                await insert(session, rows[lo:hi])
+                await model.update(session, upto_id=hi)
+                # Round trip through the checkpoint each time
+                await model.save(session)
+                await session.commit()
+                loaded = await MarkovModel.load(session)
+                assert_same_model(loaded, model)
+                assert loaded.last_id == hi
+
+            full = await MarkovModel().fit(session)
+            assert_same_model(model, full)
+            assert model.total_transitions == len(rows) - 3
+
+            # Rows past upto_id wait for the next update
+            late = make_rows(np.random.default_rng(8), per_run=5)
+            await insert(session, [dict(r, id=r['id'] + len(rows), timestamp_sim=r['timestamp_sim'] + timedelta(days=2))
+                               for r in late])
+            await model.update(session, upto_id=len(rows) + 4)
+            await model.update(session)
+            assert model.last_id == len(rows) + len(late)
+            assert_same_model(model, await MarkovModel().fit(session))
+
+    run(go())
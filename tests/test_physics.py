@@ -0,0 +1,97 @@
+import random
+import statistics
+
+import numpy as np
+import pytest
+
+from backend.simulation.physics import ThermalModel
+
+
+def quiet_model(temp=None):
+    model = ThermalModel()
+    model.noise_enabled = False
+    if temp is not None:
+        model.temp = temp
+    return model
+
+
+def stepped(model, ticks, power, flow, water_temp=25.0):
+    temps = []
+    for _ in range(ticks):
+        temps.append(model.update(power, flow, water_temp=water_temp))
+    return temps
+
+
+@pytest.mark.parametrize("start, power, flow, water_temp", [
+    (25.0, 50.0, 0.0, 26.5),      # HEATING from ambient
+    (860.0, 0.0, 120.0, 26.5),    # QUENCH from the peak
+    (860.0, 0.0, 80.0, 34.0),     # Weak pump, warm water
+    (400.0, 5.0, 0.0, 25.0),      # Held low power
+    (700.0, 0.0, 0.0, 25.0),      # Cooling in air (IDLE / DOWN)
+])
+def test_temp_after_matches_update_steps(start, power, flow, water_temp):
+    model = quiet_model(start)
+    loop = stepped(quiet_model(start), 199, power, flow, water_temp)
+    # With water flowing the closed form holds while every step starts above the water temperature
+    floor = water_temp if flow > 0 else float('-inf')
+    valid = next((k for k, t in enumerate([start] + loop) if t <= floor), len(loop))
+    assert valid >= 5
+    closed = model.temp_after(np.arange(1, valid + 1), power, flow, water_temp)
+    assert closed == pytest.approx(loop[:valid], abs=1e-9)
+    mid = valid // 2
+    assert model.temp_after(mid, power, flow, water_temp) == pytest.approx(loop[mid - 1], abs=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_cycle_profile_matches_the_tick_loop(seed):
+    rng = random.Random(seed)
+    power, flow, water_temp = rng.uniform(40, 60), rng.uniform(80, 150), rng.uniform(20, 35)
+    model = quiet_model()
+
+    heating = 0
+    while model.temp < 850.0:
+        model.update(power, 0.0, water_temp=water_temp)
+        heating += 1
+    peak = model.temp
+    quench = 0
+    while model.temp > 50.0:
+        model.update(0.0, flow, water_temp=water_temp)
+        quench += 1
+
+    profile = quiet_model().cycle_profile(power, flow, water_temp)
+    assert (profile['heating_ticks'], profile['quench_ticks']) == (heating, quench)
+    assert profile['peak_temp'] == pytest.approx(peak, abs=1e-9)
+    assert profile['end_temp'] == pytest.approx(model.temp, abs=1e-9)
+
+
+def test_ticks_to_is_none_when_the_target_is_out_of_reach():
+    model = quiet_model()
+    assert model.ticks_to(850.0, 10.0, 0.0) is None       # T_eq = 285 °C
+    assert model.ticks_to(25.0, 0.0, 0.0, start=25.0) == 0
+    assert quiet_model(860.0).ticks_to(50.0, 0.0, 100.0, water_temp=60.0) is None  # Water hotter than the target
+    assert quiet_model().cycle_profile(10.0, 120.0) is None
+
+
+def test_advance_matches_steps_and_clamps_at_ambient():
+    model = quiet_model(600.0)
+    loop = stepped(quiet_model(600.0), 5000, 0.0, 0.0)
+    assert model.advance(5000, 0.0, 0.0) == pytest.approx(loop[-1], abs=1e-9)
+    assert model.temp == model.ambient_temp
+    assert model.advance(0, 50.0, 0.0) == model.temp
+
+
+def test_advance_noise_has_the_stepped_spread():
+    # Held power: noise accumulates as sum(r**k * U(-0.5, 0.5)) over the steps
+    random.seed(3)
+    ticks, runs = 40, 4000
+    stepped_end, jumped_end = [], []
+    for _ in range(runs):
+        model = ThermalModel()
+        model.temp = 500.0
+        stepped(model, ticks, 20.0, 0.0)
+        stepped_end.append(model.temp)
+        model = ThermalModel()
+        model.temp = 500.0
+        jumped_end.append(model.advance(ticks, 20.0, 0.0))
+    assert statistics.mean(jumped_end) == pytest.approx(statistics.mean(stepped_end), abs=0.05)
+    assert statistics.stdev(jumped_end) == pytest.approx(statistics.stdev(stepped_end), rel=0.1)
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from backend.ai.risk import RiskScorer
+from backend.simulation.machine import MachineState
+
+# One machine cycle: sampled HEATING / QUENCH ticks, then unsampled ones (incl. a pause between parts)
+CYCLE = ('LOADING',) + ('HEATING',) * 17 + ('QUENCH',) * 12 + ('UNLOADING',) + ('IDLE',) * 30
+RATE = -0.0025  # bar per machine tick
+
+
+def feed(scorer, state, pressure, rng):
+    if state in ('HEATING', 'QUENCH'):
+        scorer.update(state, {
+            'pressure': pressure + rng.gauss(0, 0.03) if state == 'QUENCH' else 0.0,
+            'flow': 120.0 + rng.gauss(0, 1.0),
+            'quench_water_temp': 26.5,
+            'power': 50.0,
+            'scan_speed': 10.0 if state == 'HEATING' else 8.0,
+        })
+    else:
+        scorer.advance()
+
+
+def test_drifting_pressure_escalates_before_the_limit():
+    rng = random.Random(4)
+    scorer = RiskScorer(tick_seconds=0.2)
+    lower = scorer.trackers['pressure'].lower
+    for t in range(3000):
+        feed(scorer, CYCLE[t % len(CYCLE)], 3.5, rng)
+    assert scorer.status == 'OK'
+
+    first, pressure, t = {}, 3.5, 0
+    while pressure > lower:
+        t += 1
+        pressure += RATE
+        feed(scorer, CYCLE[t % len(CYCLE)], pressure, rng)
+        if scorer.status not in first:
+            first[scorer.status] = (t, pressure, scorer.snapshot())
+
+    assert 'WARNING' in first and 'CRITICAL' in first
+    assert first['WARNING'][0] < first['CRITICAL'][0] < t
+
+    # Time to limit is in machine ticks, not sampled ticks
+    _, pressure_at, snap = first['CRITICAL']
+    true_seconds = (pressure_at - lower) / -RATE * 0.2
+    assert snap['seconds_to_limit'] == pytest.approx(true_seconds, rel=0.35)
+    assert snap['slope_per_second'] == pytest.approx(RATE / 0.2, rel=0.35)
+
+
+def test_machine_ticks_advance_the_scorer_clock(seeded):
+    machine = MachineState()
+    machine.start_cycle()
+    for _ in range(500):
+        machine.update()
+    assert machine.risk.tick == 500
+
+    machine.stop()
+    machine.skip_ticks(250)
+    assert machine.risk.tick == 750
@@ -0,0 +1,53 @@
+import math
+
+import numpy as np
+import pytest
+
+from backend.analytics.rollup import lttb
+
+
+def reference_lttb(x, y, threshold):
+    """Textbook LTTB (Steinarsson, 2013), one point at a time."""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    kept, a = [0], 0
+    for i in range(threshold - 2):
+        avg_start = math.floor((i + 1) * every) + 1
+        avg_end = min(math.floor((i + 2) * every) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+
+        best, best_area = None, -1.0
+        for j in range(math.floor(i * every) + 1, math.floor((i + 1) * every) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+@pytest.mark.parametrize("n, threshold", [(10, 3), (100, 10), (1000, 37), (5000, 500), (1001, 1000)])
+def test_lttb_matches_the_reference(n, threshold):
+    rng = np.random.default_rng(n + threshold)
+    x = np.sort(rng.uniform(0, 1e4, n))
+    y = np.cumsum(rng.normal(0, 1, n))
+    kept = lttb(x, y, threshold)
+    assert kept.tolist() == reference_lttb(x.tolist(), y.tolist(), threshold)
+    assert len(kept) == threshold
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_lttb_keeps_spikes_and_endpoints():
+    x = np.arange(10_000, dtype=float)
+    y = np.zeros_like(x)
+    y[[1234, 7777]] = [50.0, -80.0]
+    kept = lttb(x, y, 100)
+    assert {0, 1234, 7777, 9999} <= set(kept.tolist())
+
+
+@pytest.mark.parametrize("threshold", [0, 2, 50, 51])
+def test_lttb_returns_everything_when_there_is_nothing_to_drop(threshold):
+    x = np.arange(50, dtype=float)
+    assert lttb(x, x, threshold).tolist() == list(range(50))
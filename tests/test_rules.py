@@ -0,0 +1,167 @@
+import json
+import random
+
+import pytest
+
+from backend.simulation import rules as rules_module
+from backend.simulation.failure_manager import FailureManager
+from backend.simulation.rules import STATES, RuleSet, load_rules
+
+
+def legacy_check_health(t):
+    """The hand-written checks the shipped failure_rules.json replaced (status, reason, code, repair_time)."""
+    state, timer = t['state'], t.get('timer', 0)
+    if t.get('coil_life', 200000) <= 0:
+        return "DOWN", "Coil Failure (Life Exceeded)", "BD", 60
+    pt = t.get('temp', 0)
+    if pt > 1200.0:
+        return "DOWN", f"Coil Damage (Part Melted: {pt:.1f}°C)", "BD", 60
+    power = t.get('power', 0)
+    if power > 80.0:
+        return "DOWN", f"Inverter Overcurrent ({power:.1f} kW)", "BD", 45
+    p = t.get('pressure', 0)
+    if state == 'QUENCH':
+        if p > 6.0:
+            return "DOWN", f"Hose Burst (Pressure {p:.1f})", "BD", 45
+        if p < 1.0 and timer > 2:
+            return "DOWN", f"Severe Pressure Drop ({p:.1f})", "MS", 15
+        f = t.get('flow', 0)
+        if f < 50.0 and timer > 2:
+            return "DOWN", f"Pump Failure (Flow {f:.1f})", "MS", 30
+        qt = t.get('quench_water_temp', 25.0)
+        if qt > 50.0:
+            return "DOWN", f"Scalding Risk (Temp {qt:.1f})", "BD", 45
+    if state in ('HEATING', 'QUENCH'):
+        s = t.get('coil_scan_speed', 0)
+        if s < 5.0 and timer > 2:
+            return "DOWN", f"Servo Overload (Speed {s:.1f})", "MS", 20
+
+    reasons = []
+    if state in ('HEATING', 'QUENCH', 'UNLOADING', 'COMPLETED'):
+        pt = t.get('peak_part_temp', 0.0)
+        if pt > 100 or state in ('UNLOADING', 'COMPLETED'):
+            if pt < 800.0:
+                reasons.append(f"NG: UNDERHEATED Part ({pt:.1f}°C) -> SOFTNESS")
+            elif pt > 880.0:
+                reasons.append(f"NG: OVERHEATED Part ({pt:.1f}°C) -> BRITTLENESS")
+        qt = t.get('quench_water_temp', 25.0)
+        if qt < 25.0:
+            reasons.append(f"CRACKING (Water Too Cold: {qt:.1f}°C)")
+        elif qt > 32.0:
+            reasons.append(f"SOFTNESS (Water Too Hot: {qt:.1f}°C)")
+        f = t.get('flow', 0)
+        if f > 10.0:
+            if f < 80.0:
+                reasons.append(f"SOFTNESS (Low Flow: {f:.1f} lpm)")
+            elif f > 150.0:
+                reasons.append(f"CRACKING (High Flow: {f:.1f} lpm)")
+        p = t.get('pressure', 0)
+        if p > 0.1:
+            if p < 2.0:
+                reasons.append(f"SOFTNESS (Low Pressure: {p:.1f} bar)")
+            elif p > 4.0:
+                reasons.append(f"CRACKING (High Pressure: {p:.1f} bar)")
+    if reasons:
+        return "NG", ", ".join(reasons), None, None
+    return "OK", None, None, None
+
+
+# Values at and around every hand-written limit
+EDGES = {
+    'coil_life': [-1, 0, 1, 2, 150000],
+    'temp': [40.0, 1200.0, 1200.01, 1500.0],
+    'power': [0.0, 50.0, 80.0, 80.01, 95.0],
+    'pressure': [0.0, 0.1, 0.11, 0.5, 1.0, 1.99, 2.0, 3.5, 4.0, 4.01, 6.0, 6.01],
+    'flow': [0.0, 10.0, 10.01, 40.0, 50.0, 79.9, 80.0, 120.0, 150.0, 150.1],
+    'quench_water_temp': [20.0, 24.99, 25.0, 26.5, 32.0, 32.01, 50.0, 50.01],
+    'coil_scan_speed': [0.0, 4.99, 5.0, 8.0, 10.0],
+    'peak_part_temp': [0.0, 100.0, 100.01, 799.9, 800.0, 850.0, 880.0, 880.01],
+}
+
+
+def random_row(rng):
+    row = {'state': rng.choice(STATES), 'timer': rng.choice((0, 1, 2, 3, 4, 30))}
+    for key, values in EDGES.items():
+        if rng.random() < 0.1:
+            continue  # missing -> default
+        row[key] = rng.choice(values) if rng.random() < 0.6 else round(rng.uniform(min(values), max(values)), 2)
+        if key == 'coil_life':
+            row[key] = int(row[key])
+    return row
+
+
+def test_shipped_rules_reproduce_the_hand_written_checks():
+    rng = random.Random(22)
+    seen = set()
+    for _ in range(20_000):
+        row = random_row(rng)
+        status, reason, code, repair_time = legacy_check_health(row)
+        got = FailureManager().check_health(row)
+        assert (got['status'], got['reason']) == (status, reason), row
+        if status == "DOWN":
+            assert (got['code'], got['repair_time']) == (code, repair_time)
+        seen.add((row['state'], status))
+    assert {s for s, _ in seen} == set(STATES)
+    assert {st for _, st in seen} == {"OK", "NG", "DOWN"}
+
+
+def test_compiled_check_only_contains_rules_of_its_state():
+    rules = load_rules()
+    idle = rules.compiled_source('IDLE')
+    assert "'pressure'" not in idle and "'coil_life'" in idle
+    assert "ng.append" not in rules.compiled_source('QUENCH', safety_only=True)
+    assert rules.for_state('QUENCH') is rules.for_state('QUENCH')
+    assert rules.for_state('QUENCH') is not rules.for_state('QUENCH', safety_only=True)
+
+
+def test_safety_only_skips_quality_rules():
+    row = {'state': 'QUENCH', 'timer': 5, 'pressure': 4.5, 'flow': 120.0, 'coil_scan_speed': 8.0}
+    assert FailureManager().check_health(row)['status'] == "NG"
+    assert FailureManager().check_health(row, safety_only=True) == {"status": "OK", "reason": None}
+
+
+@pytest.mark.parametrize("spec", [
+    {"param": "flow", "min": 1, "severity": "NG", "reason": "x"},
+    {"name": "a", "param": "flow", "severity": "NG", "reason": "x"},
+    {"name": "a", "param": "flow", "min": 1, "max": 2, "severity": "NG", "reason": "x"},
+    {"name": "a", "param": "flow", "min": 1, "severity": "WARN", "reason": "x"},
+    {"name": "a", "param": "flow", "min": 1, "severity": "NG", "reason": "{flow}"},
+    {"name": "a", "param": "flow", "min": "-inf", "severity": "NG", "reason": "x"},
+    {"name": "a", "param": "flow", "max": float("nan"), "severity": "NG", "reason": "x"},
+    {"name": "a", "param": "flow", "max": 1e400, "severity": "NG", "reason": "x"},
+    {"name": "a", "param": "flow", "min": 1, "active_above": float("inf"), "severity": "NG", "reason": "x"},
+    {"name": "a", "param": "flow", "min": 1, "default": "nan", "severity": "NG", "reason": "x"},
+    {"name": "a", "param": "flow", "min": 1, "states": "QUENCH", "severity": "DOWN", "reason": "x"},
+    {"name": "a", "param": "flow", "min": 1, "states": ["QUENCH", 3], "severity": "DOWN", "reason": "x"},
+    {"name": "a", "param": "flow", "min": 1, "states": ["QUENCH", "QUENCHING"], "severity": "DOWN", "reason": "x"},
+])
+def test_invalid_rules_are_rejected(spec):
+    with pytest.raises(ValueError):
+        RuleSet([spec])
+
+
+def test_reload_swaps_the_shared_table(tmp_path):
+    original = rules_module.get_active_rules()
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([
+        {"name": "flow_min", "param": "flow", "states": ["QUENCH"], "min": 100.0,
+         "severity": "DOWN", "code": "MS", "repair_time": 5, "reason": "Low ({value:.0f})"},
+    ]))
+    try:
+        rules_module.reload_rules(path)
+        manager = FailureManager()
+        assert manager.check_health({'state': 'QUENCH', 'flow': 90.0})['reason'] == "Low (90)"
+        assert manager.SAFETY_LIMITS == {"flow_min": 100.0}
+        # A per-machine table is not affected by the shared one
+        pinned = FailureManager(original)
+        assert pinned.check_health({'state': 'QUENCH', 'flow': 90.0})['status'] == "OK"
+    finally:
+        rules_module.set_active_rules(original)
+
+
+def test_every_state_is_compiled_when_the_table_is_built():
+    rules = RuleSet([{"name": "a", "param": "pressure", "states": ["QUENCH"], "max": 6.0,
+                      "severity": "DOWN", "reason": "x"}])
+    assert rules.for_state('QUENCH')(lambda k, d: 9.0, 0) == (0, 9.0)
+    assert rules.for_state('IDLE')(lambda k, d: 9.0, 0) == (-1, [])
+    assert all((state, True) in rules._by_state for state in STATES)
@@ -0,0 +1,91 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from backend.simulation.machine import MachineState
+from backend.simulation.telemetry import FIELDS, TelemetryRecord
+
+
+def legacy_telemetry_dict(m):
+    """MachineState.get_telemetry_dict as it was before the record was reused."""
+    shift_info = m.time_manager.get_shift_info()
+    noise_p = random.gauss(0, 0.05) if m.current_pressure > 0 else 0
+    noise_f = random.gauss(0, 2.0) if m.current_flow > 0 else 0
+    noise_w = random.gauss(0, 0.5) if m.current_power > 0 else 0
+    q_temp = m.quench_water_temp_base
+    if m.active_drift['param'] == 'quench_water_temp':
+        q_temp += m.accumulated_drift
+    if m.override_quench_temp is not None:
+        q_temp = m.override_quench_temp
+    else:
+        q_temp += random.uniform(-0.2, 0.2)
+    is_down = m.state == m.DOWN
+    return {
+        "timer": m.timer, "temp": round(m.physics.temp, 2), "quench_water_temp": round(q_temp, 2),
+        "peak_part_temp": m.peak_part_temp, "power": round(m.current_power + noise_w, 1),
+        "flow": round(m.current_flow + noise_f, 1), "pressure": round(m.current_pressure + noise_p, 2),
+        "coil_scan_speed": m.current_scan_speed, "tempering_speed": m.current_temp_speed,
+        "state": m.state, "sim_run_id": "LIVE-VIEW", "timestamp_sim": m.time_manager.get_clock(),
+        "timestamp_sim_raw": m.time_manager.current_time, "shift_id": shift_info["shift_id"],
+        "operator_id": shift_info["operator_id"], "part_id": m.current_part_id,
+        "ok_count": m.ok_count, "ng_count": m.ng_count, "coil_life": int(m.coil_life_counter),
+        "downtime_reason": m.downtime_reason if is_down else None,
+        "repair_time": m.repair_time_remaining if is_down else 0.0, "ng_reason": m.ng_reason,
+        "ai_risk_score": round(m.risk.score, 4), "ai_status": m.risk.status,
+    }
+
+
+def test_record_matches_the_old_telemetry_dict(seeded):
+    machine = MachineState()
+    machine.start_cycle()
+    states = set()
+    for tick in range(1500):
+        machine.update()
+        if tick % 7:
+            continue
+        random.seed(tick)
+        expected = legacy_telemetry_dict(machine)
+        random.seed(tick)
+        assert machine.get_telemetry_dict() == expected
+        states.add(machine.state)
+    assert {'HEATING', 'QUENCH'} <= states
+
+
+def test_reads_reuse_one_record_and_copies_are_independent(seeded):
+    machine = MachineState()
+    machine.start_cycle()
+    first = machine.read_telemetry()
+    kept = first.copy()
+    before = first.to_dict()
+    for _ in range(40):
+        machine.update()
+    again = machine.read_telemetry()
+
+    assert again is first is machine.telemetry
+    assert kept is not first and kept.to_dict() == before
+    assert again.to_dict() != before
+
+
+def test_record_behaves_like_the_dict_it_replaced():
+    record = TelemetryRecord()
+    assert record.get('flow') is None and record.get('flow', 0.0) == 0.0
+    with pytest.raises(KeyError):
+        record['flow']
+    with pytest.raises(AttributeError):
+        record.not_a_field = 1
+
+    record.flow = 120.0
+    record.timestamp_sim_raw = datetime(2025, 1, 1, 21, 5, 9)
+    record.day_count = 3
+    assert record['flow'] == record.get('flow', 0.0) == 120.0
+    assert record['timestamp_sim'] == "Day 3, 21:05:09"
+
+    data = record.to_dict()
+    assert tuple(data) == FIELDS
+    assert data['sim_run_id'] == "LIVE-VIEW" and data['pressure'] is None
+    assert 'day_count' not in data
+
+    copied = record.copy()
+    record.flow, record.day_count = 0.0, 4
+    assert copied.to_dict() == data and copied.day_count == 3
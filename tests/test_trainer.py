@@ -0,0 +1,100 @@
+import statistics
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.ai import trainer as trainer_module
+from backend.ai.trainer import OnlineTrainer, Welford
+from backend.models import Telemetry
+from backend.simulation.persistence import telemetry_row
+from tests.conftest import run
+
+
+def test_welford_chunk_merge_equals_a_single_pass():
+    rng = np.random.default_rng(3)
+    values = rng.normal(50.0, 4.0, 10_000)
+    merged = Welford()
+    cuts = np.sort(rng.choice(np.arange(1, len(values)), size=40, replace=False))
+    for chunk in np.split(values, cuts):
+        merged.update(chunk)
+    merged.update(np.array([]))
+
+    assert merged.n == len(values)
+    assert merged.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert merged.stdev == pytest.approx(statistics.stdev(values.tolist()), rel=1e-9)
+    assert merged.m2 == pytest.approx(((values - values.mean()) ** 2).sum(), rel=1e-9)
+
+    one = Welford()
+    one.update(values[:1])
+    assert (one.n, one.mean, one.stdev) == (1, values[0], 0.0)
+
+
+def row(i, status="OK"):
+    data = {'power': 40.0 + i, 'flow': 100.0 + i % 7, 'pressure': 3.5, 'peak_part_temp': 850.0,
+            'coil_scan_speed': 10.0, 'state': 'COMPLETED'}
+    if status == "NG":
+        data['ng_reason'] = "NG: test"
+    elif status == "DOWN":
+        data['downtime_reason'] = "Hose Burst (Pressure 6.1)"
+    return {**telemetry_row(data, 1), 'id': i}
+
+
+def insert(engine, ids, status="OK"):
+    async def go():
+        async with engine.begin() as conn:
+            await conn.execute(Telemetry.__table__.insert(), [row(i, status) for i in ids])
+    run(go())
+
+
+def train(engine, trainer, **kwargs):
+    async def go():
+        async with AsyncSession(engine) as session:
+            return await trainer.update(session, **kwargs)
+    return run(go())
+
+
+def test_update_folds_late_committed_ids(db_engine):
+    trainer = OnlineTrainer()
+    insert(db_engine, range(1, 11))
+    assert train(db_engine, trainer) == 10
+
+    # 11 and 12 are still in flight when 13..20 are read
+    insert(db_engine, range(13, 21))
+    insert(db_engine, [21], status="NG")
+    assert train(db_engine, trainer, chunk_size=3) == 9
+    assert (trainer.last_id, trainer.gaps) == (21, [11, 12])
+
+    insert(db_engine, [11], status="DOWN")
+    insert(db_engine, [12])
+    assert train(db_engine, trainer) == 2
+    assert 11 not in trainer.gaps and 12 not in trainer.gaps
+
+    # Same model as one pass over everything, and nothing folded twice
+    fresh = OnlineTrainer()
+    train(db_engine, fresh)
+    assert trainer.outcomes == fresh.outcomes == [19, 1, 1]
+    for key, w in fresh.params.items():
+        assert (trainer.params[key].n, trainer.params[key].mean) == pytest.approx((w.n, w.mean))
+        assert trainer.params[key].stdev == pytest.approx(w.stdev)
+
+    # Gaps survive a checkpoint round trip
+    state = type("Row", (), {"last_id": trainer.last_id, "updated_at": None, "state": trainer.to_json()})
+    assert OnlineTrainer.from_row(state).gaps == trainer.gaps
+
+
+def test_gaps_age_out_of_the_window(db_engine, monkeypatch):
+    monkeypatch.setattr(trainer_module, "LATE_ID_WINDOW", 5)
+    trainer = OnlineTrainer()
+    insert(db_engine, [1, 3, 4])
+    train(db_engine, trainer)
+    assert trainer.gaps == [2]
+
+    insert(db_engine, range(5, 10))
+    train(db_engine, trainer)
+    assert trainer.gaps == []
+
+    # Too late: outside the window, never counted
+    insert(db_engine, [2])
+    assert train(db_engine, trainer) == 0
+    assert trainer.total == 8